@@ -23,14 +23,26 @@ from typing import Dict, Any
 
 
 # Import your existing Python-level orchestrator
-from src.task_advisor import run_task_advisor
-
-
-def log_debug(msg: str) -> None:
-    """Lightweight debug logger for the root agent."""
-    print(f"==== [root_agent] {msg}")
-
-def run_task_assign_tool(
+from src.advisor_logging import log_debug
+from src.genai_clients import start_warm_up
+from src.plan_explainer_agent import MODEL_NAME as PLAN_MODEL_NAME
+from src.task_advisor import WhatIfTables, run_task_advisor_async
+
+# Shortlist tables for recently seen task lists, so "what about 45 minutes?"
+# follow-ups skip parsing and re-planning. A table is only built once a
+# follow-up for the same list arrives, inside that request's latency budget
+# and metrics (see task_advisor.WhatIfTables).
+WHAT_IF_CACHE_SIZE = 16
+_what_if_tables = WhatIfTables(max_entries=WHAT_IF_CACHE_SIZE)
+
+
+# Async tool: model latency does not hold a thread while awaiting, so one
+# `adk web` process can serve many concurrent sessions.
+#
+# The plan is not streamed here: an ADK function tool returns one result,
+# so per-entry events would have nowhere to go. The non-streamed planner
+# call also gets the deadline, retry and hedging of PLAN_CALL_POLICY.
+async def run_task_assign_tool(
     raw_tasks_str: str,
     available_minutes: int = 60,
     energy_level: str = "medium",
@@ -49,17 +61,24 @@ def run_task_assign_tool(
         - nice_to_have
         - summary
     """
+    # The tool's model calls use the serving loop's aio client. The first
+    # call on a loop builds it and opens its connection in the background,
+    # overlapping the handshake with parsing and scoring.
+    start_warm_up(model=PLAN_MODEL_NAME)
+
     log_debug(
-        f"Calling run_task_advisor with available_minutes={available_minutes}, "
-        f"energy_level={energy_level}"
+        "[root_agent] Calling run_task_advisor_async with available_minutes=%s, energy_level=%s",
+        available_minutes,
+        energy_level,
     )
-    plan_json = run_task_advisor(
-        tasks=None,
+    plan_json = await run_task_advisor_async(
         raw_tasks_str=raw_tasks_str,
         available_minutes=available_minutes,
         energy_level=energy_level,
+        what_if_tables=_what_if_tables,
+        print_plan=False,
     )
-    log_debug("Received plan_json from run_task_advisor.")
+    log_debug("[root_agent] Received plan_json from run_task_advisor_async.")
     return plan_json
 
 
@@ -0,0 +1,118 @@
+"""
+Advisor Logging
+
+One leveled logging facility for the whole pipeline, replacing the
+per-module print-based log_debug helpers.
+
+- Messages go to the standard `logging` logger "task_advisor", which only
+  has a NullHandler: nothing reaches stdout or stderr unless the
+  application configures a handler (configure_logging() adds a stderr one).
+- Disabled calls are cheap. Use %-style arguments instead of f-strings so
+  formatting only happens when a record is emitted, wrap large payloads in
+  lazy_json() so they are only serialized then, and guard hot loops with
+  debug_enabled().
+- Verbosity can be raised or lowered for a single request with
+  request_log_level() (a ContextVar, so concurrent requests do not see
+  each other's level); otherwise the logger's own level applies.
+"""
+
+import json
+import logging
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LOGGER_NAME = "task_advisor"
+
+logger = logging.getLogger(LOGGER_NAME)
+logger.addHandler(logging.NullHandler())
+
+_request_level = ContextVar("advisor_log_level", default=None)
+_console_handler = None
+
+
+def _to_level(level):
+    """Accept logging levels as ints or names ("debug", "INFO", ...)."""
+    if isinstance(level, str):
+        value = logging.getLevelName(level.upper())
+        if not isinstance(value, int):
+            raise ValueError(f"Unknown log level {level!r}.")
+        return value
+    return level
+
+
+def is_enabled(level) -> bool:
+    """Would a record at `level` be emitted for the current request?"""
+    override = _request_level.get()
+    if override is not None:
+        return level >= override
+    return logger.isEnabledFor(level)
+
+
+def debug_enabled() -> bool:
+    return is_enabled(logging.DEBUG)
+
+
+def _log(level, msg, args):
+    if not is_enabled(level):
+        return
+    # Build the record directly: a per-request level may be more verbose
+    # than the logger's own, which logger.log() would filter out.
+    record = logger.makeRecord(logger.name, level, "(task_advisor)", 0, msg, args, None)
+    logger.handle(record)
+
+
+def log_debug(msg, *args):
+    _log(logging.DEBUG, msg, args)
+
+
+def log_info(msg, *args):
+    _log(logging.INFO, msg, args)
+
+
+def log_warning(msg, *args):
+    _log(logging.WARNING, msg, args)
+
+
+class lazy_json:
+    """Log argument that is serialized (indented JSON) only when emitted."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __str__(self):
+        return json.dumps(self.value, indent=2, default=str)
+
+
+@contextmanager
+def request_log_level(level=None):
+    """
+    Use `level` (int or name) as the log level inside the block, for the
+    current request only. None keeps the logger's level.
+    """
+    if level is None:
+        yield
+        return
+    token = _request_level.set(_to_level(level))
+    try:
+        yield
+    finally:
+        _request_level.reset(token)
+
+
+def configure_logging(level=logging.DEBUG, stream=None):
+    """
+    Send task_advisor logs to `stream` (stderr by default) at `level`.
+    Meant for CLI entry points; applications can configure the
+    "task_advisor" logger themselves instead.
+    """
+    global _console_handler
+    if _console_handler is None:
+        _console_handler = logging.StreamHandler(stream or sys.stderr)
+        _console_handler.setFormatter(logging.Formatter("==== %(message)s"))
+        logger.addHandler(_console_handler)
+    elif stream is not None:
+        _console_handler.setStream(stream)
+    logger.setLevel(_to_level(level))
@@ -0,0 +1,178 @@
+"""
+Advisor Metrics
+
+Per-request instrumentation for run_task_advisor: wall time for each
+pipeline stage (parse, score, shortlist, assemble, plan, render) and, for
+every model call, the prompt/response token counts reported by the genai
+response (usage_metadata) or a cache hit, plus counters for events such as
+retried or hedged model calls.
+
+run_task_advisor creates one RequestMetrics per request and makes it the
+current one (a ContextVar, so concurrent asyncio requests and worker
+threads started with asyncio.to_thread each see their own). The pipeline
+reports into it through stage() and the agents through record_model_call();
+both do nothing when no request is being measured, e.g. when an agent is
+called directly. Reports that arrive after the request has finished (e.g.
+from a planner thread abandoned at the latency budget) are dropped, so
+metrics do not change after they were returned or emitted.
+
+Finished metrics are returned to the caller on request (return_metrics=True)
+and handed to a sink: any callable taking a RequestMetrics, passed per
+request or installed process-wide with set_metrics_sink().
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+try:
+    from advisor_logging import log_warning
+except ImportError:
+    from src.advisor_logging import log_warning
+
+# Stage names, in pipeline order.
+STAGES = ("parse", "score", "shortlist", "assemble", "plan", "render")
+
+# usage_metadata attribute -> key in RequestMetrics.model_calls entries.
+_USAGE_FIELDS = {
+    "prompt_token_count": "prompt_tokens",
+    "candidates_token_count": "response_tokens",
+    "cached_content_token_count": "cached_tokens",
+    "total_token_count": "total_tokens",
+}
+
+_current = ContextVar("advisor_metrics", default=None)
+_default_sink = None
+
+
+class RequestMetrics:
+    """Timings and model usage for one run_task_advisor request."""
+
+    def __init__(self):
+        self.stages = {}
+        self.model_calls = []
+        self.events = {}
+        self.parse_path = None
+        self._started = time.perf_counter()
+        self.total_seconds = None
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; repeated stages accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    def record_model_call(self, agent, response=None, cache_hit=False):
+        """Record one model request (or a response cache hit) by `agent`."""
+        call = {"agent": agent, "cache_hit": cache_hit}
+        usage = getattr(response, "usage_metadata", None)
+        for attr, key in _USAGE_FIELDS.items():
+            call[key] = getattr(usage, attr, None) or 0
+        self.model_calls.append(call)
+
+    def record_event(self, name, count=1):
+        """Count a named event (e.g. "planning.retry", see call_policy.py)."""
+        self.events[name] = self.events.get(name, 0) + count
+
+    def finish(self):
+        self.total_seconds = time.perf_counter() - self._started
+        return self
+
+    @property
+    def finished(self) -> bool:
+        return self.total_seconds is not None
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for call in self.model_calls if call["cache_hit"])
+
+    def token_totals(self) -> dict:
+        """Token counts summed over all model calls."""
+        return {
+            key: sum(call[key] for call in self.model_calls) for key in _USAGE_FIELDS.values()
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "total_seconds": self.total_seconds,
+            "stages": dict(self.stages),
+            "parse_path": self.parse_path,
+            "model_calls": [dict(call) for call in self.model_calls],
+            "events": dict(self.events),
+            "cache_hits": self.cache_hits,
+            "tokens": self.token_totals(),
+        }
+
+    def __repr__(self):
+        timings = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.stages.items())
+        return f"RequestMetrics({timings}, model_calls={len(self.model_calls)})"
+
+
+def current_metrics():
+    """The RequestMetrics of the request being measured, or None."""
+    return _current.get()
+
+
+def _open_metrics():
+    """The current RequestMetrics if it is still collecting, else None."""
+    metrics = _current.get()
+    if metrics is None or metrics.finished:
+        return None
+    return metrics
+
+
+@contextmanager
+def measure_request(metrics=None):
+    """Make `metrics` (a new RequestMetrics by default) current for a block."""
+    metrics = metrics or RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        metrics.finish()
+
+
+@contextmanager
+def stage(name):
+    """Time a block as stage `name` of the current request (no-op without one)."""
+    metrics = _open_metrics()
+    if metrics is None:
+        yield
+    else:
+        with metrics.stage(name):
+            yield
+
+
+def record_model_call(agent, response=None, cache_hit=False):
+    """Record a model call on the current request (no-op without one)."""
+    metrics = _open_metrics()
+    if metrics is not None:
+        metrics.record_model_call(agent, response, cache_hit)
+
+
+def record_event(name, count=1):
+    """Count an event on the current request (no-op without one)."""
+    metrics = _open_metrics()
+    if metrics is not None:
+        metrics.record_event(name, count)
+
+
+def set_metrics_sink(sink):
+    """Install a process-wide sink for finished RequestMetrics (None to remove)."""
+    global _default_sink
+    _default_sink = sink
+
+
+def emit_metrics(metrics, sink=None):
+    """Hand finished metrics to `sink` or the process-wide one; sink errors are swallowed."""
+    sink = sink or _default_sink
+    if sink is None:
+        return
+    try:
+        sink(metrics)
+    except Exception as e:
+        log_warning("Metrics sink failed: %r", e)
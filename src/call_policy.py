@@ -0,0 +1,416 @@
+"""
+Call Policy
+
+Tail-latency controls for model calls: a per-attempt deadline, an overall
+deadline shared by all attempts and backoff sleeps, jittered exponential
+retry of transient failures, and optional hedging.
+
+No retry is started once the overall deadline (total_timeout_seconds) has
+passed, or when the backoff sleep would end after it; the last error is
+raised instead.
+
+Hedging: if an attempt has not answered after a delay, a second identical
+request is fired and the first good answer wins (the other is cancelled,
+or, for blocking calls, ignored). The delay is a percentile of recently
+observed latencies for that call (hedge_percentile), or the fixed
+hedge_delay_seconds until enough samples exist. Attempts that time out are
+recorded at their timeout, so a slow backend pushes the percentile up.
+
+A call is a zero-argument function (or coroutine function) that performs
+the request *and* parses/validates the answer, so a malformed response
+counts as a failed attempt and can be retried or beaten by a hedge.
+
+How often retries, hedges and deadlines fired is counted process-wide in
+call_policy_stats() and on the current request's metrics (advisor_metrics
+events such as "planning.retry"). Token usage is recorded by the call
+itself, so request metrics count every attempt that got a response,
+including retries and losing hedges: they are all billed.
+
+Blocking calls run on a pool of MODEL_CALL_WORKERS threads. A request that
+misses its deadline cannot be interrupted and keeps its thread until the
+HTTP call returns, so under a slow backend the pool can fill with abandoned
+requests. Submissions are therefore admitted by a semaphore sized to the
+pool instead of queueing invisibly behind it: a first attempt waits for a
+free worker only until its deadline (then fails with CallDeadlineExceeded),
+and a hedge is skipped (counted as "hedges_skipped") when no worker is free.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+from google.genai import errors as genai_errors
+
+try:
+    from advisor_logging import log_warning
+    from advisor_metrics import record_event
+    from response_schemas import ModelResponseError
+except ImportError:
+    from src.advisor_logging import log_warning
+    from src.advisor_metrics import record_event
+    from src.response_schemas import ModelResponseError
+
+# HTTP status codes worth retrying: timeouts, rate limits and server errors.
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Samples kept per call name for the hedge percentile.
+LATENCY_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20
+
+# Blocking calls run on these threads so they can be hedged and timed out.
+# _slots admits at most one submission per worker (see the module docstring).
+MODEL_CALL_WORKERS = 16
+_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=MODEL_CALL_WORKERS, thread_name_prefix="model-call"
+)
+_slots = threading.BoundedSemaphore(MODEL_CALL_WORKERS)
+# Separate pool for call_with_deadline(), whose functions usually submit
+# model calls to _executor themselves and hold their deadline worker until
+# those return. It is sized like the model-call pool: with more workers the
+# extra calls would only wait on _slots, with fewer they would queue here
+# before reaching it. Either way a queued call still fails at its deadline.
+DEADLINE_WORKERS = MODEL_CALL_WORKERS
+_deadline_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=DEADLINE_WORKERS, thread_name_prefix="deadline"
+)
+
+_stats_lock = threading.Lock()
+_stats = {}
+_latencies = {}
+
+
+class CallDeadlineExceeded(TimeoutError):
+    """No attempt of a model call answered within the policy deadline."""
+
+
+# Network failures below the HTTP layer, as raised by the genai client's
+# transport (connect/read timeouts, dropped connections, protocol errors).
+TRANSPORT_ERRORS = (TimeoutError, ConnectionError, httpx.TransportError)
+
+
+def is_retryable(exc) -> bool:
+    """Transient failures: timeouts, transport errors, bad output, 408/429/5xx."""
+    if isinstance(exc, genai_errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, TRANSPORT_ERRORS + (ModelResponseError, json.JSONDecodeError))
+
+
+class CallPolicy:
+    """
+    How a model call is attempted.
+
+    Parameters:
+        timeout_seconds: deadline for one attempt, hedge included (None = none)
+        total_timeout_seconds: deadline for the whole call, shared by all
+            attempts and backoff sleeps (None = none)
+        max_attempts: total attempts, including the first
+        backoff_base / backoff_max: retry n sleeps a uniformly random time in
+            [0, min(backoff_max, backoff_base * 2**n)] ("full jitter")
+        hedge_percentile: fire a hedge after this latency percentile
+            (e.g. 0.95) of recent calls; None disables percentile hedging
+        hedge_delay_seconds: hedge delay to use until HEDGE_MIN_SAMPLES
+            latencies are known (or always, without hedge_percentile);
+            None with no percentile means no hedging
+        retryable: predicate deciding which exceptions are retried
+    """
+
+    def __init__(
+        self,
+        timeout_seconds=30.0,
+        total_timeout_seconds=60.0,
+        max_attempts=3,
+        backoff_base=0.5,
+        backoff_max=8.0,
+        hedge_percentile=None,
+        hedge_delay_seconds=None,
+        retryable=is_retryable,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 1:
+            raise ValueError("hedge_percentile must be between 0 and 1.")
+        self.timeout_seconds = timeout_seconds
+        self.total_timeout_seconds = total_timeout_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.retryable = retryable
+
+    def backoff(self, retry_number) -> float:
+        """Sleep before retry `retry_number` (0-based), with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry_number))
+
+    def hedge_delay(self, name):
+        """Seconds to wait before hedging a call named `name`, or None."""
+        if self.hedge_percentile is not None:
+            with _stats_lock:
+                samples = sorted(_latencies.get(name, ()))
+            if len(samples) >= HEDGE_MIN_SAMPLES:
+                return samples[min(len(samples) - 1, int(self.hedge_percentile * len(samples)))]
+        return self.hedge_delay_seconds
+
+    def __repr__(self):
+        return (
+            f"CallPolicy(timeout_seconds={self.timeout_seconds}, "
+            f"total_timeout_seconds={self.total_timeout_seconds}, "
+            f"max_attempts={self.max_attempts}, hedge_percentile={self.hedge_percentile}, "
+            f"hedge_delay_seconds={self.hedge_delay_seconds})"
+        )
+
+
+DEFAULT_CALL_POLICY = CallPolicy()
+
+
+def _count(name, event):
+    with _stats_lock:
+        counters = _stats.setdefault(name, {})
+        counters[event] = counters.get(event, 0) + 1
+    record_event(f"{name}.{event}")
+
+
+def _observe_latency(name, seconds):
+    with _stats_lock:
+        _latencies.setdefault(name, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def call_policy_stats() -> dict:
+    """
+    Process-wide counters per call name: calls, retries, hedges, hedge_wins,
+    hedges_skipped, timeouts and failures.
+    """
+    with _stats_lock:
+        return {name: dict(counters) for name, counters in _stats.items()}
+
+
+def reset_call_policy_stats() -> None:
+    with _stats_lock:
+        _stats.clear()
+        _latencies.clear()
+
+
+def _remaining(deadline):
+    return None if deadline is None else max(0.0, deadline - time.monotonic())
+
+
+def _earliest(*deadlines):
+    deadlines = [d for d in deadlines if d is not None]
+    return min(deadlines) if deadlines else None
+
+
+def _submit(fn, executor=_executor):
+    # Run in a copy of the caller's context so request metrics and the
+    # per-request log level still apply on the worker thread.
+    return executor.submit(contextvars.copy_context().run, fn)
+
+
+def _submit_model_call(fn, deadline, block):
+    """
+    Submit fn to the model-call pool once a worker slot is free.
+
+    Waits until `deadline` if block is true, otherwise only takes a slot
+    that is free right now. Returns the future, or None if no slot was free.
+    """
+    if block:
+        acquired = _slots.acquire(timeout=_remaining(deadline))
+    else:
+        acquired = _slots.acquire(blocking=False)
+    if not acquired:
+        return None
+    future = _submit(fn)
+    future.add_done_callback(lambda _: _slots.release())
+    return future
+
+
+def call_with_deadline(fn, timeout_seconds, name="call", cancelled=None):
+    """
+    Run the blocking zero-argument `fn` and return its result, or raise
+    CallDeadlineExceeded after timeout_seconds (None = wait forever). A
+    call that misses the deadline keeps running, but its result is unused.
+
+    `cancelled` is an optional threading.Event set when the deadline
+    passes, so the abandoned `fn` can check it and stop its side effects
+    (callbacks, output) early.
+    """
+    if timeout_seconds is None:
+        return fn()
+    future = _submit(fn, _deadline_executor)
+    # wait() rather than result(timeout=...): a TimeoutError raised by fn
+    # itself must not be mistaken for this deadline.
+    done, _ = concurrent.futures.wait([future], timeout=max(0.0, timeout_seconds))
+    if not done:
+        if cancelled is not None:
+            cancelled.set()
+        future.cancel()
+        raise CallDeadlineExceeded(f"{name} did not answer within {timeout_seconds:.2f}s")
+    return future.result()
+
+
+def _attempt(fn, policy, name, call_deadline):
+    """One attempt of a blocking call: primary request plus an optional hedge."""
+    start = time.monotonic()
+    attempt_deadline = None if policy.timeout_seconds is None else start + policy.timeout_seconds
+    deadline = _earliest(attempt_deadline, call_deadline)
+
+    primary = _submit_model_call(fn, deadline, block=True)
+    if primary is None:
+        _count(name, "timeouts")
+        raise CallDeadlineExceeded(f"{name}: no free model-call worker before the deadline")
+    pending = {primary}
+
+    hedge_delay = policy.hedge_delay(name)
+    if hedge_delay is not None:
+        wait = hedge_delay if deadline is None else min(hedge_delay, _remaining(deadline))
+        done, _ = concurrent.futures.wait(pending, timeout=wait)
+        if not done and (deadline is None or _remaining(deadline) > 0):
+            hedge = _submit_model_call(fn, deadline, block=False)
+            if hedge is None:
+                _count(name, "hedges_skipped")
+            else:
+                _count(name, "hedges")
+                pending.add(hedge)
+
+    error = None
+    while pending:
+        done, pending = concurrent.futures.wait(
+            pending, timeout=_remaining(deadline), return_when=concurrent.futures.FIRST_COMPLETED
+        )
+        if not done:
+            break
+        for future in done:
+            if future.exception() is None:
+                if future is not primary:
+                    _count(name, "hedge_wins")
+                _observe_latency(name, time.monotonic() - start)
+                # Blocking requests cannot be interrupted; a losing one just finishes unused.
+                for other in pending:
+                    other.cancel()
+                return future.result()
+            error = future.exception()
+
+    if pending or error is None:
+        for other in pending:
+            other.cancel()
+        _count(name, "timeouts")
+        # Censored sample: the real latency is at least this long.
+        _observe_latency(name, time.monotonic() - start)
+        raise CallDeadlineExceeded(
+            f"{name} did not answer within {time.monotonic() - start:.2f}s"
+        )
+    raise error
+
+
+def _retry_delay(policy, attempt, error, call_deadline):
+    """
+    Backoff before the next attempt, or None if the call must stop here:
+    attempts used up, error not retryable, or no time left before the
+    overall deadline.
+    """
+    if attempt + 1 >= policy.max_attempts or not policy.retryable(error):
+        return None
+    delay = policy.backoff(attempt)
+    if call_deadline is not None and time.monotonic() + delay >= call_deadline:
+        return None
+    return delay
+
+
+def call_with_policy(fn, policy=None, name="model"):
+    """
+    Run the blocking zero-argument call `fn` under `policy`
+    (DEFAULT_CALL_POLICY by default) and return its result.
+    """
+    policy = policy or DEFAULT_CALL_POLICY
+    call_deadline = (
+        None
+        if policy.total_timeout_seconds is None
+        else time.monotonic() + policy.total_timeout_seconds
+    )
+    _count(name, "calls")
+    for attempt in range(policy.max_attempts):
+        try:
+            return _attempt(fn, policy, name, call_deadline)
+        except Exception as e:
+            delay = _retry_delay(policy, attempt, e, call_deadline)
+            if delay is None:
+                _count(name, "failures")
+                raise
+            log_warning("%s attempt %d failed (%r); retrying in %.2fs.", name, attempt + 1, e, delay)
+            _count(name, "retries")
+            time.sleep(delay)
+
+
+async def _attempt_async(fn, policy, name, call_deadline):
+    """One attempt of an async call: primary request plus an optional hedge."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    attempt_deadline = None if policy.timeout_seconds is None else start + policy.timeout_seconds
+    # call_deadline is on the time.monotonic() clock, which loop.time() uses too.
+    deadline = _earliest(attempt_deadline, call_deadline)
+
+    def remaining():
+        return None if deadline is None else max(0.0, deadline - loop.time())
+
+    primary = asyncio.ensure_future(fn())
+    pending = {primary}
+    try:
+        hedge_delay = policy.hedge_delay(name)
+        if hedge_delay is not None:
+            wait = hedge_delay if deadline is None else min(hedge_delay, remaining())
+            done, _ = await asyncio.wait(pending, timeout=wait)
+            if not done and (deadline is None or remaining() > 0):
+                _count(name, "hedges")
+                pending.add(asyncio.ensure_future(fn()))
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        _count(name, "hedge_wins")
+                    _observe_latency(name, loop.time() - start)
+                    return task.result()
+                error = task.exception()
+
+        if pending or error is None:
+            _count(name, "timeouts")
+            # Censored sample: the real latency is at least this long.
+            _observe_latency(name, loop.time() - start)
+            raise CallDeadlineExceeded(f"{name} did not answer within {loop.time() - start:.2f}s")
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def call_with_policy_async(fn, policy=None, name="model"):
+    """Async version of call_with_policy; `fn` is a coroutine function."""
+    policy = policy or DEFAULT_CALL_POLICY
+    call_deadline = (
+        None
+        if policy.total_timeout_seconds is None
+        else time.monotonic() + policy.total_timeout_seconds
+    )
+    _count(name, "calls")
+    for attempt in range(policy.max_attempts):
+        try:
+            return await _attempt_async(fn, policy, name, call_deadline)
+        except Exception as e:
+            delay = _retry_delay(policy, attempt, e, call_deadline)
+            if delay is None:
+                _count(name, "failures")
+                raise
+            log_warning("%s attempt %d failed (%r); retrying in %.2fs.", name, attempt + 1, e, delay)
+            _count(name, "retries")
+            await asyncio.sleep(delay)
@@ -0,0 +1,87 @@
+"""
+Fallback Plan
+
+Deterministic stand-in for the planning agent's answer.
+
+When the planner is too slow for the request's latency budget, or fails,
+run_task_advisor still has a valid plan: the suggested shortlist from
+choose_shortlist(). build_fallback_plan() turns plan_data into the same
+shortlist / nice_to_have / summary schema the planner returns, with
+reasons generated locally from each task's ratings, and marks it with
+"degraded": True (plus "degraded_reason") so callers can tell.
+"""
+
+RATING_FIELDS = ("importance", "urgency", "desire")
+
+# Up to this many nice-to-have tasks, like the planner instruction asks.
+FALLBACK_NICE_TO_HAVE = 2
+
+
+def _format_number(value):
+    return f"{value:g}" if isinstance(value, (int, float)) else str(value)
+
+
+def local_reason(task: dict, available_minutes) -> str:
+    """A short, rating-based explanation for why a task was picked."""
+    high = [field for field in RATING_FIELDS if task.get(field) == 3]
+    if high:
+        reason = "High " + " and ".join(high)
+    else:
+        reason = "Best remaining priority"
+    return (
+        f"{reason} (score {_format_number(task.get('score'))}); takes "
+        f"{_format_number(task.get('est_minutes'))} of your {available_minutes} minutes."
+    )
+
+
+def _entry(task, reason):
+    return {
+        "title": task.get("title"),
+        "reason": reason,
+        "est_minutes": task.get("est_minutes"),
+        "score": task.get("score"),
+    }
+
+
+def build_fallback_plan(plan_data: dict, degraded_reason: str) -> dict:
+    """
+    Build a plan from plan_data alone (no model call).
+
+    The shortlist is plan_data's suggested_shortlist; nice_to_have holds
+    the best-scored remaining tasks from all_tasks.
+    """
+    available = plan_data.get("available_minutes")
+    shortlist = list(plan_data.get("suggested_shortlist") or [])
+
+    taken = {id(t) for t in shortlist}
+    titles = [t.get("title") for t in shortlist]
+    remaining = [
+        t for t in plan_data.get("all_tasks") or []
+        if id(t) not in taken and t.get("title") not in titles
+    ]
+    remaining.sort(key=lambda t: t.get("score", 0), reverse=True)
+    extras = remaining[:FALLBACK_NICE_TO_HAVE]
+
+    total = sum(t.get("est_minutes", 0) for t in shortlist)
+    if shortlist:
+        summary = (
+            f"Deterministic plan ({degraded_reason}): {len(shortlist)} highest-priority "
+            f"tasks that fit in {available} minutes, using {_format_number(total)} of them."
+        )
+    else:
+        summary = f"Deterministic plan ({degraded_reason}): no task fits in {available} minutes."
+
+    return {
+        "shortlist": [_entry(t, local_reason(t, available)) for t in shortlist],
+        "nice_to_have": [
+            _entry(
+                t,
+                f"Next in priority (score {_format_number(t.get('score'))}); "
+                "pick it up if you have extra time or energy.",
+            )
+            for t in extras
+        ],
+        "summary": summary,
+        "degraded": True,
+        "degraded_reason": degraded_reason,
+    }
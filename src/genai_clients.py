@@ -0,0 +1,160 @@
+"""
+GenAI Client Registry
+
+One shared google-genai client per API key for the whole process.
+
+Previously each module built its own client: parse_tasks_agent created a
+new genai.Client() (and re-read .env) on every call, and
+plan_explainer_agent cached one in an unlocked global. Here:
+- .env is loaded once,
+- clients are created under a lock (safe under concurrent tool calls) and
+  reused, so their HTTP connection pools are reused too, and
+- warm_up() can be called at process start so client construction (and,
+  optionally, the first TLS handshake) is not paid by the first request.
+
+Async clients are kept per event loop: an aio client's connection pool is
+bound to the loop that first used it, and batch runs call asyncio.run(),
+which creates a new loop each time. get_async_client() returns the client
+for the running loop and drops clients whose loop has closed. For the same
+reason async servers warm up on their serving loop: start_warm_up() (e.g.
+at the top of a tool call) warms that loop's aio client in the background,
+once per loop. Nothing here does network I/O at import time.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+
+from dotenv import load_dotenv
+from google import genai
+
+try:
+    from advisor_logging import log_warning
+except ImportError:
+    from src.advisor_logging import log_warning
+
+_lock = threading.Lock()
+_clients: dict = {}
+_async_clients: dict = {}  # event loop -> {api_key: genai.Client}
+_warmed_loops = weakref.WeakSet()
+_warm_up_tasks: set = set()  # strong refs so pending warm-ups are not collected
+_env_loaded = False
+
+
+def load_env() -> None:
+    """Load .env into the environment once per process."""
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _lock:
+        if not _env_loaded:
+            load_dotenv()
+            _env_loaded = True
+
+
+def _api_key(api_key: str | None) -> str:
+    load_env()
+    api_key = api_key or os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        raise RuntimeError(
+            "GOOGLE_API_KEY is not set. Please add it to your .env or environment."
+        )
+    return api_key
+
+
+def get_client(api_key: str | None = None) -> genai.Client:
+    """
+    Return the shared client for api_key (default: GOOGLE_API_KEY).
+
+    Use get_async_client() for async calls.
+
+    Raises RuntimeError if no API key is configured.
+    """
+    api_key = _api_key(api_key)
+
+    client = _clients.get(api_key)
+    if client is None:
+        with _lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = genai.Client(api_key=api_key)
+                _clients[api_key] = client
+    return client
+
+
+def get_async_client(api_key: str | None = None):
+    """
+    Return the async (aio) client for api_key bound to the running event loop.
+
+    Must be called from a coroutine. Raises RuntimeError if no API key is
+    configured.
+    """
+    api_key = _api_key(api_key)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        for stale in [l for l in _async_clients if l.is_closed()]:
+            del _async_clients[stale]
+        per_loop = _async_clients.setdefault(loop, {})
+        client = per_loop.get(api_key)
+        if client is None:
+            client = genai.Client(api_key=api_key)
+            per_loop[api_key] = client
+    return client.aio
+
+
+def warm_up(model: str | None = None) -> bool:
+    """
+    Create the shared sync client ahead of the first request.
+
+    If `model` is given, also fetch its metadata once so the HTTP connection
+    is already open; that is a blocking network call, so pass it from a
+    startup step rather than at import. Returns False (instead of raising)
+    when no API key is configured or the warm-up request fails.
+    """
+    try:
+        client = get_client()
+        if model:
+            client.models.get(model=model)
+    except Exception as e:
+        log_warning("[genai_clients] Warm-up skipped: %s", e)
+        return False
+    return True
+
+
+async def warm_up_async(model: str | None = None) -> bool:
+    """Async warm_up(): prepares the running loop's aio client instead."""
+    try:
+        client = get_async_client()
+        if model:
+            await client.models.get(model=model)
+    except Exception as e:
+        log_warning("[genai_clients] Warm-up skipped: %s", e)
+        return False
+    return True
+
+
+def start_warm_up(model: str | None = None):
+    """
+    Run warm_up_async(model) as a background task on the running loop, the
+    first time this is called on that loop; the caller does not wait for it.
+
+    Returns the task, or None if the loop was already warmed.
+    """
+    loop = asyncio.get_running_loop()
+    with _lock:
+        if loop in _warmed_loops:
+            return None
+        _warmed_loops.add(loop)
+    task = loop.create_task(warm_up_async(model))
+    _warm_up_tasks.add(task)
+    task.add_done_callback(_warm_up_tasks.discard)
+    return task
+
+
+def reset_clients() -> None:
+    """Drop all cached clients (e.g. after rotating the API key)."""
+    with _lock:
+        _clients.clear()
+        _async_clients.clear()
+        _warmed_loops.clear()
@@ -0,0 +1,291 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for model results, so identical requests skip the
+Gemini round trip.
+
+Two tiers:
+- an in-memory LRU (bounded by entry count), and
+- an optional on-disk tier: one JSON file per key in a directory, evicted
+  oldest-first once the directory grows past a byte budget.
+
+Both tiers honour an optional TTL. Keys are SHA-256 digests built with
+make_cache_key() from everything that influences the answer (normalized
+input, model name, prompt version). Values must be JSON-serializable; a
+copy is returned on every hit so callers cannot corrupt the cache.
+
+Hit/miss counters are available via ResponseCache.stats().
+
+Disk reads and writes happen outside the cache lock, so a slow disk never
+blocks memory hits from other threads. The disk tier keeps an in-process
+index of its files (key -> size, oldest first) and a running byte total,
+built by one directory scan when the cache is created; eviction uses that
+index instead of listing the directory on every put. Files written by other
+processes sharing the directory are only seen by the next process to start.
+
+cache_from_env() builds a cache configured from the environment (.env):
+    TASK_ADVISOR_CACHE_DIR        enable the disk tier under this directory
+    TASK_ADVISOR_CACHE_MAX_BYTES  disk budget per cache (default 50 MB)
+    TASK_ADVISOR_CACHE_TTL        TTL in seconds (default 86400, 0 = no expiry)
+    TASK_ADVISOR_CACHE_ENTRIES    in-memory LRU size (default 256)
+
+get_cache(namespace) returns the shared cache for a namespace, building it
+from the environment on first use, so importing a module never reads .env
+or fails on a malformed setting.
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+
+def make_cache_key(*parts) -> str:
+    """Hash the given string parts into a stable hex key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + optional disk) cache for JSON-able model results.
+
+    Args:
+        max_entries: capacity of the in-memory LRU tier.
+        disk_dir: directory for the on-disk tier, or None to disable it.
+        disk_max_bytes: total size budget of the on-disk tier.
+        ttl_seconds: entries older than this are treated as misses (None = no expiry).
+    """
+
+    def __init__(
+        self,
+        max_entries=256,
+        disk_dir=None,
+        disk_max_bytes=50 * 1024 * 1024,
+        ttl_seconds=None,
+    ):
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self._memory = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        self._disk_index = OrderedDict()  # key -> file size, oldest first
+        self._disk_bytes = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_scan()
+
+    # ---- Public API ----
+
+    def get(self, key):
+        """Return a copy of the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[0]):
+                self._memory.move_to_end(key)
+                self._counters["hits"] += 1
+                self._counters["memory_hits"] += 1
+                return copy.deepcopy(entry[1])
+            if entry is not None:
+                del self._memory[key]
+
+        stored_at, value = self._disk_get(key)
+
+        with self._lock:
+            if value is not None:
+                self._memory_put(key, value, stored_at)
+                self._counters["hits"] += 1
+                self._counters["disk_hits"] += 1
+                return copy.deepcopy(value)
+            self._counters["misses"] += 1
+            return None
+
+    def put(self, key, value):
+        """Store a JSON-serializable value under key in every enabled tier."""
+        value = copy.deepcopy(value)
+        now = time.time()
+        with self._lock:
+            self._memory_put(key, value, now)
+        size = self._disk_write(key, value)
+        if size is None:
+            return
+        with self._lock:
+            evicted = self._disk_account(key, size)
+        self._disk_remove(evicted)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        return stats
+
+    def clear(self):
+        """Drop every entry from both tiers (counters are kept)."""
+        with self._lock:
+            self._memory.clear()
+            self._disk_index.clear()
+            self._disk_bytes = 0
+        for path in self._disk_files():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    # ---- Internals ----
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def _memory_put(self, key, value, stored_at):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_files(self):
+        if not self.disk_dir:
+            return []
+        return [
+            os.path.join(self.disk_dir, name)
+            for name in os.listdir(self.disk_dir)
+            if name.endswith(".json")
+        ]
+
+    def _disk_scan(self):
+        """Index the files already on disk, oldest first, and total their size."""
+        files = []
+        for path in self._disk_files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = os.path.basename(path)[: -len(".json")]
+            files.append((st.st_mtime, key, st.st_size))
+        files.sort()
+        for _, key, size in files:
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+    def _disk_get(self, key):
+        """Return (stored_at, value), or (None, None) on a miss. Called without the lock."""
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if self._expired(stored_at):
+                os.remove(path)
+                with self._lock:
+                    self._disk_forget(key)
+                return None, None
+            with open(path, "r", encoding="utf-8") as f:
+                return stored_at, json.load(f)
+        except (OSError, ValueError):
+            # Missing, concurrently evicted or corrupt: treat as a miss.
+            return None, None
+
+    def _disk_write(self, key, value):
+        """Write value to its file and return the size in bytes (None if skipped or failed)."""
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(value, f, separators=(",", ":"))
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            # The disk tier is best-effort; the memory tier still has the value.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+        return size
+
+    def _disk_forget(self, key):
+        size = self._disk_index.pop(key, None)
+        if size is not None:
+            self._disk_bytes -= size
+
+    def _disk_account(self, key, size):
+        """
+        Record a written file and pick the oldest files to evict so the tier
+        fits in disk_max_bytes. Caller holds the lock; returns the paths to
+        remove once it is released.
+        """
+        self._disk_forget(key)
+        self._disk_index[key] = size
+        self._disk_bytes += size
+
+        evicted = []
+        while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+            old_key, old_size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= old_size
+            self._counters["evictions"] += 1
+            evicted.append(self._disk_path(old_key))
+        return evicted
+
+    def _disk_remove(self, paths):
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def cache_from_env(namespace: str) -> ResponseCache:
+    """Build a ResponseCache for `namespace` from TASK_ADVISOR_CACHE_* settings."""
+    load_dotenv()
+    cache_dir = os.getenv("TASK_ADVISOR_CACHE_DIR")
+    ttl = float(os.getenv("TASK_ADVISOR_CACHE_TTL", "86400"))
+    return ResponseCache(
+        max_entries=int(os.getenv("TASK_ADVISOR_CACHE_ENTRIES", "256")),
+        disk_dir=os.path.join(cache_dir, namespace) if cache_dir else None,
+        disk_max_bytes=int(os.getenv("TASK_ADVISOR_CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+        ttl_seconds=ttl if ttl > 0 else None,
+    )
+
+
+_registry_lock = threading.Lock()
+_caches: dict = {}
+
+
+def get_cache(namespace: str) -> ResponseCache:
+    """
+    Return the shared cache for `namespace`, building it with cache_from_env()
+    on first use.
+
+    Raises ValueError (on the first call, not at import) if a
+    TASK_ADVISOR_CACHE_* setting is malformed.
+    """
+    cache = _caches.get(namespace)
+    if cache is None:
+        with _registry_lock:
+            cache = _caches.get(namespace)
+            if cache is None:
+                cache = cache_from_env(namespace)
+                _caches[namespace] = cache
+    return cache
+
+
+def reset_caches() -> None:
+    """Forget every shared cache so the next get_cache() re-reads the environment."""
+    with _registry_lock:
+        _caches.clear()
@@ -0,0 +1,282 @@
+"""
+Local Task Parser
+
+Deterministic fast path in front of the ParseTasksAgent.
+
+Most raw task strings we receive are already JSON in (or very close to) the
+internal schema:
+    {"title": str, "importance": 1-3, "urgency": 1-3, "desire": 1-3, "est_minutes": int}
+
+normalize_tasks_locally() handles that case in microseconds. It only does
+deterministic clean-up, never guessing:
+- field aliases ("name"/"task" for title, "minutes"/"duration"/... for est_minutes)
+- ratings given as "3", 3.0 or "low"/"medium"/"high"
+- durations given as "30", "30 min", "1h", "1h 30m", "1.5 hours"
+- a top-level {"tasks": [...]} wrapper
+
+Anything it cannot normalize with certainty (invalid JSON, missing fields,
+out-of-range ratings) makes it return None so the caller falls back to the
+LLM, which is allowed to infer values.
+
+Besides JSON, load_task_list() understands two plain-text layouts:
+
+- bullet / numbered lists with optional `key value` parentheticals, as in
+  the README demo:
+      Tasks:
+      - email manager (importance 3, urgency 2)
+      - take a break (desire 3, 10 min)
+      write unit test case (urgency: high; est 45)
+- CSV with a header row naming the fields:
+      title,importance,urgency,desire,est_minutes
+      Email accountant,3,3,1,20
+
+The text grammar is strict: a line that is neither a bullet, a task with
+a parenthetical, nor a "Header:" line makes the whole input fall back to
+the LLM. Fields a text line leaves out get fixed defaults instead of an
+LLM guess: TEXT_DEFAULT_RATING (2, "medium") for each rating and
+TEXT_DEFAULT_EST_MINUTES (30) for the estimate. JSON and CSV input keep
+the no-guessing rule; their incomplete tasks go to the model.
+"""
+
+import csv
+import json
+import math
+import re
+
+TITLE_KEYS = ("title", "name", "task")
+RATING_KEYS = ("importance", "urgency", "desire")
+EST_KEYS = ("est_minutes", "minutes", "estimate", "est", "duration", "time")
+
+# Defaults for fields a bullet/text line leaves out (see parse_task_text).
+TEXT_DEFAULT_RATING = 2
+TEXT_DEFAULT_EST_MINUTES = 30
+
+RATING_WORDS = {
+    "low": 1,
+    "medium": 2,
+    "med": 2,
+    "normal": 2,
+    "high": 3,
+}
+
+_DURATION_RE = re.compile(
+    r"^\s*(?:(?P<hours>\d+(?:\.\d+)?)\s*(?:h|hr|hrs|hour|hours))?"
+    r"\s*(?:(?P<minutes>\d+(?:\.\d+)?)\s*(?:m|min|mins|minute|minutes)?)?\s*$",
+    re.IGNORECASE,
+)
+
+
+def _first_present(task, keys):
+    for key in keys:
+        if key in task and task[key] is not None:
+            return task[key]
+    return None
+
+
+def coerce_rating(value):
+    """Return a 1-3 integer rating, or None if value is not clearly one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in RATING_WORDS:
+            return RATING_WORDS[text]
+        try:
+            value = float(text)
+        except ValueError:
+            return None
+    if isinstance(value, (int, float)) and float(value).is_integer() and 1 <= value <= 3:
+        return int(value)
+    return None
+
+
+def coerce_minutes(value):
+    """Return a positive whole number of minutes, or None if unclear."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        match = _DURATION_RE.match(value)
+        if not match or not (match.group("hours") or match.group("minutes")):
+            return None
+        value = float(match.group("hours") or 0) * 60 + float(match.group("minutes") or 0)
+    if isinstance(value, (int, float)) and value > 0 and math.isfinite(value):
+        # Round partial minutes up, like the knapsack planner does.
+        return int(math.ceil(value))
+    return None
+
+
+def normalize_task(task):
+    """
+    Normalize one task dict into the internal schema.
+
+    Returns (normalized_task, missing_fields). missing_fields lists every
+    field that is absent or cannot be coerced; normalized_task holds the
+    fields that could be (it is complete when missing_fields is empty).
+    """
+    if not isinstance(task, dict):
+        return {}, ["title", *RATING_KEYS, "est_minutes"]
+
+    normalized = {}
+    missing = []
+
+    title = _first_present(task, TITLE_KEYS)
+    if isinstance(title, str) and title.strip():
+        normalized["title"] = title.strip()
+    else:
+        missing.append("title")
+
+    for key in RATING_KEYS:
+        rating = coerce_rating(task.get(key))
+        if rating is None:
+            missing.append(key)
+        else:
+            normalized[key] = rating
+
+    est = coerce_minutes(_first_present(task, EST_KEYS))
+    if est is None:
+        missing.append("est_minutes")
+    else:
+        normalized["est_minutes"] = est
+
+    return normalized, missing
+
+
+# Keys accepted inside a task's parenthetical, mapped to schema fields.
+PAREN_KEYS = {
+    "importance": "importance",
+    "imp": "importance",
+    "urgency": "urgency",
+    "urg": "urgency",
+    "desire": "desire",
+    "des": "desire",
+    "est_minutes": "est_minutes",
+    "est": "est_minutes",
+    "estimate": "est_minutes",
+    "minutes": "est_minutes",
+    "time": "est_minutes",
+    "duration": "est_minutes",
+}
+
+_BULLET_RE = re.compile(r"^(?:[-*+\u2022]|\d+[.)])\s+(?P<body>.+)$")
+_PAREN_RE = re.compile(r"^(?P<title>.*?)\s*\((?P<attrs>[^()]*)\)$")
+_ATTR_RE = re.compile(r"^(?P<key>[A-Za-z_]+)\s*[:=]?\s*(?P<value>\S.*)$")
+
+
+def _parse_attrs(attrs):
+    """Parse "importance 3, urgency: high; 30 min" into a field dict, or None."""
+    fields = {}
+    for part in re.split(r"[,;]", attrs):
+        part = part.strip()
+        if not part:
+            continue
+        match = _ATTR_RE.match(part)
+        if match and match.group("key").lower() in PAREN_KEYS:
+            fields[PAREN_KEYS[match.group("key").lower()]] = match.group("value").strip()
+        elif coerce_minutes(part) is not None:
+            # A bare duration such as "30 min" or "1h".
+            fields["est_minutes"] = part
+        else:
+            return None
+    return fields
+
+
+def _parse_task_line(line):
+    """Parse one task line into a raw task dict, "header", or None."""
+    bullet = _BULLET_RE.match(line)
+    body = bullet.group("body").strip() if bullet else line
+
+    task = {}
+    paren = _PAREN_RE.match(body)
+    if paren:
+        task = _parse_attrs(paren.group("attrs"))
+        if task is None:
+            return None
+        body = paren.group("title").strip()
+    elif not bullet:
+        # Plain lines are only accepted as "Tasks:"-style headers.
+        return "header" if line.endswith(":") else None
+
+    if not body:
+        return None
+    return {"title": body, **task}
+
+
+def parse_task_text(raw_tasks_str):
+    """
+    Parse the bullet-list text syntax into raw task dicts, or None.
+
+    Missing ratings default to TEXT_DEFAULT_RATING and a missing estimate
+    to TEXT_DEFAULT_EST_MINUTES, so every parsed line is a complete task.
+    """
+    tasks = []
+    for line in raw_tasks_str.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        task = _parse_task_line(line)
+        if task is None:
+            return None
+        if task != "header":
+            defaults = dict.fromkeys(RATING_KEYS, TEXT_DEFAULT_RATING)
+            defaults["est_minutes"] = TEXT_DEFAULT_EST_MINUTES
+            tasks.append({**defaults, **task})
+    return tasks or None
+
+
+def parse_task_csv(raw_tasks_str):
+    """Parse CSV with a header row into raw task dicts, or None."""
+    lines = [line for line in raw_tasks_str.strip().splitlines() if line.strip()]
+    if len(lines) < 2:
+        return None
+
+    rows = list(csv.reader(lines, skipinitialspace=True))
+    header = [h.strip().lower() for h in rows[0]]
+    if len(header) < 2 or not any(h in TITLE_KEYS for h in header):
+        return None
+
+    tasks = []
+    for row in rows[1:]:
+        if len(row) != len(header):
+            return None
+        tasks.append({key: value.strip() for key, value in zip(header, row) if value.strip()})
+    return tasks
+
+
+def load_task_list(raw_tasks_str):
+    """
+    Parse raw_tasks_str into a list of raw task dicts (not yet normalized).
+
+    Tries JSON first, then CSV, then the bullet-list text syntax. Returns
+    None if the input matches none of them.
+    """
+    try:
+        data = json.loads(raw_tasks_str)
+    except (TypeError, ValueError):
+        if not isinstance(raw_tasks_str, str):
+            return None
+        return parse_task_csv(raw_tasks_str) or parse_task_text(raw_tasks_str)
+    if isinstance(data, dict) and isinstance(data.get("tasks"), list):
+        data = data["tasks"]
+    if not isinstance(data, list):
+        return None
+    return data
+
+
+def normalize_tasks_locally(raw_tasks_str):
+    """
+    Normalize a raw task string (JSON, CSV or bullet text) without the LLM.
+
+    Returns the list of tasks in the internal schema, or None if the input
+    cannot be parsed or any task is missing a field that would need inference.
+    """
+    data = load_task_list(raw_tasks_str)
+    if data is None:
+        return None
+
+    tasks = []
+    for task in data:
+        normalized, missing = normalize_task(task)
+        if missing:
+            return None
+        tasks.append(normalized)
+    return tasks
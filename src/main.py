@@ -1,13 +1,26 @@
-# Master debug flag for the entire script.
+# Master debug flag when running this script directly (see __main__ below).
 DEBUG = False
 
-from pprint import pformat
+import heapq
 
-def log_debug(msg: str):
-    """Print debug messages only when DEBUG is True."""
-    if DEBUG:
-        print(f"[DEBUG] {msg}")
+try:
+    # Script-style import (when running: python src/main.py)
+    from advisor_logging import configure_logging, debug_enabled, lazy_json, log_debug
+    from scoring_engine import score_and_rank, score_columns
+    from ranking import PriorityIndex, RankedTasks
+    from shortlist_planner import knapsack_pick
+    from task_table import TaskTable
+except ImportError:
+    # Package-style import (when imported as src.main)
+    from src.advisor_logging import configure_logging, debug_enabled, lazy_json, log_debug
+    from src.scoring_engine import score_and_rank, score_columns
+    from src.ranking import PriorityIndex, RankedTasks
+    from src.shortlist_planner import knapsack_pick
+    from src.task_table import TaskTable
 
+# Task lists at least this long are scored with the vectorized engine in
+# scoring_engine.py. Smaller lists are not worth the NumPy setup cost.
+BATCH_SCORING_MIN_TASKS = 64
 
 # Sample tasks for testing the prioritization system.
 # Each task includes ratings (1 = low, 2 = medium, 3 = high) for:
@@ -43,45 +56,246 @@ def compute_priority_score(task):
     )
 
 
-def score_tasks(tasks):
+def score_tasks(tasks, lazy=False, policy=None):
     """
     Add a `score` to each task and return them sorted by score (descending).
+
+    policy: optional ScoringPolicy (see scoring_engine.py) replacing the
+    default compute_priority_score formula.
+
+    With lazy=True, return a RankedTasks iterator instead of a sorted list.
+    It yields the same scored tasks in the same order, but only pays for the
+    ones that are actually consumed (see ranking.py).
+
+    Large lists go through the vectorized batch engine, which produces the
+    same scores and ordering as the per-task loop below.
+
+    A TaskTable is scored column-wise and returned as a new (sorted)
+    TaskTable without building any per-task dicts.
     """
+    if lazy:
+        return RankedTasks(tasks, policy=policy)
+
+    if isinstance(tasks, TaskTable):
+        scores, order = score_and_rank(
+            tasks.importance, tasks.urgency, tasks.desire, policy
+        )
+        return tasks.take(order).with_score(scores[order])
+
+    tasks = list(tasks)
+    if len(tasks) >= BATCH_SCORING_MIN_TASKS:
+        return _score_tasks_batch(tasks, policy)
+
+    score_fn = compute_priority_score if policy is None else policy.score
     scored = []
     for t in tasks:
         t_copy = dict(t)
-        t_copy["score"] = compute_priority_score(t_copy)
+        t_copy["score"] = score_fn(t_copy)
         scored.append(t_copy)
 
     scored.sort(key=lambda x: x["score"], reverse=True)
     return scored
 
 
-def choose_shortlist(scored_tasks, available_minutes=60):
+def _score_tasks_batch(tasks, policy=None):
+    """Vectorized path for score_tasks (see scoring_engine.py)."""
+    scores, order = score_columns(tasks, policy)
+    scores = scores.tolist()
+
+    scored = []
+    for i in order.tolist():
+        t_copy = dict(tasks[i])
+        t_copy["score"] = scores[i]
+        scored.append(t_copy)
+    return scored
+
+
+SHORTLIST_MODES = ("greedy", "optimal")
+
+
+def choose_shortlist(scored_tasks, available_minutes=60, mode="greedy"):
     """
     Choose a shortlist of tasks that fit within the given time budget.
     Full debug prints an explaination of each decision.
+
+    Accepts either a list of scored task dicts or a scored TaskTable, and
+    returns the shortlist in the same form. A RankedTasks iterator from
+    score_tasks(lazy=True) or a PriorityIndex is read in score order only
+    until nothing else can fit, and yields a list of dicts.
+
+    mode:
+    - "greedy": take tasks in score order while they still fit (default).
+    - "optimal": maximize the total score within the budget (0/1 knapsack,
+      see shortlist_planner.py for time and memory bounds).
+    """
+    if mode not in SHORTLIST_MODES:
+        raise ValueError(f"Unknown shortlist mode {mode!r}; expected one of {SHORTLIST_MODES}.")
+
+    if isinstance(scored_tasks, (RankedTasks, PriorityIndex)):
+        min_est = scored_tasks.min_est_minutes
+        if isinstance(scored_tasks, PriorityIndex):
+            scored_tasks = scored_tasks.ranked()
+
+        if mode == "greedy":
+            pulled = []
+
+            def rows():
+                for t in scored_tasks:
+                    pulled.append(t)
+                    yield (t['title'], t['est_minutes'], t['score'])
+
+            picked = _greedy_pick(rows(), available_minutes, min_est=min_est)
+            return [pulled[i] for i in picked]
+
+    if isinstance(scored_tasks, TaskTable):
+        if mode == "optimal":
+            picked = _optimal_pick(
+                scored_tasks.est_minutes, scored_tasks.score, available_minutes
+            )
+        else:
+            rows = zip(
+                scored_tasks.title,
+                scored_tasks.est_minutes.tolist(),
+                scored_tasks.score.tolist(),
+            )
+            picked = _greedy_pick(rows, available_minutes)
+        return scored_tasks.take(picked)
+
+    scored_tasks = list(scored_tasks)
+    if mode == "optimal":
+        picked = _optimal_pick(
+            [t['est_minutes'] for t in scored_tasks],
+            [t['score'] for t in scored_tasks],
+            available_minutes,
+        )
+    else:
+        rows = ((t['title'], t['est_minutes'], t['score']) for t in scored_tasks)
+        picked = _greedy_pick(rows, available_minutes)
+    return [scored_tasks[i] for i in picked]
+
+
+def _optimal_pick(est_minutes, scores, available_minutes):
+    """Knapsack selection with the same debug trail as the greedy pass."""
+    log_debug("Starting optimal shortlist selection with %s minutes.", available_minutes)
+    picked = knapsack_pick(est_minutes, scores, available_minutes)
+    log_debug("Selection complete. Picked %d tasks.", len(picked))
+    return picked
+
+
+def _greedy_pick(rows, available_minutes, min_est=None):
+    """
+    Walk (title, est_minutes, score) rows in score order and return the
+    indices of the tasks that still fit in the remaining time.
+
+    If min_est (the smallest estimate among all rows) is given, stop pulling
+    rows as soon as the remaining time drops below it.
+    """
+    remaining = available_minutes
+    picked = []
+    # Checked once: the per-task trace costs nothing when debug logging is off.
+    debug = debug_enabled()
+
+    log_debug("Starting shortlist selection with %s minutes.", available_minutes)
+    for i, (title, est, score) in enumerate(rows):
+        if min_est is not None and remaining < min_est:
+            log_debug("Stopping early: no task fits in %s minutes.", remaining)
+            break
+
+        if debug:
+            log_debug("Considering: %s (score=%s, est=%s min)", title, score, est)
+
+        if est <= remaining:
+            picked.append(i)
+            remaining -= est
+            if debug:
+                log_debug("-> SELECTED. %s minutes remaining.", remaining)
+        elif debug:
+            log_debug("-> SKIPPED (not enough time). Still %s minutes left.", remaining)
+
+    log_debug("Selection complete. Final remaining minutes: %s.", remaining)
+    return picked
+
+
+def iter_scored_tasks(tasks, policy=None):
+    """
+    Streaming counterpart of score_tasks: lazily yield a scored copy of each
+    task in arrival order. Nothing is sorted or kept, so the result can only
+    be fed to stream_shortlist() if the source is already in score order
+    (see run_task_advisor(stream=True, presorted=True)).
+    """
+    score_fn = compute_priority_score if policy is None else policy.score
+    for t in tasks:
+        t_copy = dict(t)
+        t_copy["score"] = score_fn(t_copy)
+        yield t_copy
+
+
+def stream_shortlist(scored_tasks, available_minutes=60, runners_up=0, min_est_minutes=1):
+    """
+    Streaming counterpart of choose_shortlist.
+
+    Pulls scored tasks from any iterable and takes each one that still
+    fits, stopping as soon as the budget is exhausted, i.e. the remaining
+    time drops below `min_est_minutes` (a lower bound on any task's
+    estimate; raise it if the source guarantees longer tasks). Only the shortlist
+    and at most `runners_up` of the best skipped tasks are kept, so this
+    step adds memory proportional to the shortlist, not the backlog; whether
+    the whole pipeline is bounded depends on the source (iter_scored_tasks
+    over a pre-sorted feed is; RankedTasks and PriorityIndex hold the
+    backlog).
+
+    The source must yield tasks in descending score order (e.g.
+    score_tasks(lazy=True), PriorityIndex.ranked() or a pre-sorted feed);
+    the result then equals the greedy choose_shortlist(). Taking tasks in
+    any other order would be first-fit selection, so an out-of-order task
+    raises ValueError. Tasks after the early stop are never read, so the
+    ordering is still the caller's contract.
+
+    Returns:
+        (shortlist, runners_up) where runners_up is sorted by score (descending).
     """
     remaining = available_minutes
     shortlist = []
+    skipped = []  # min-heap of (score, -position, task), capped at runners_up
+    previous_score = None
+    debug = debug_enabled()
+
+    log_debug("Starting streaming shortlist selection with %s minutes.", available_minutes)
+    for position, t in enumerate(scored_tasks):
+        if remaining < min_est_minutes:
+            log_debug("Budget exhausted; no longer pulling tasks.")
+            break
 
-    log_debug(f"Starting shortlist selection with {available_minutes} minutes.")
-    for t in scored_tasks:
         title = t['title']
         est = t['est_minutes']
         score = t['score']
+        if previous_score is not None and score > previous_score:
+            raise ValueError(
+                f"stream_shortlist needs tasks in descending score order, but "
+                f"{title!r} (score={score}) came after a task scored {previous_score}. "
+                "Use score_tasks(lazy=True) or PriorityIndex.ranked() as the source."
+            )
+        previous_score = score
+        if debug:
+            log_debug("Considering: %s (score=%s, est=%s min)", title, score, est)
 
-        log_debug(f"Considering: {title} (score={score}, est={est} min)")
-        
         if est <= remaining:
             shortlist.append(t)
             remaining -= est
-            log_debug(f"-> SELECTED. {remaining} minutes remaining.")
+            if debug:
+                log_debug("-> SELECTED. %s minutes remaining.", remaining)
         else:
-            log_debug(f"-> SKIPPED (not enough time). Still {remaining} minutes left.")
+            if debug:
+                log_debug("-> SKIPPED (not enough time). Still %s minutes left.", remaining)
+            if runners_up:
+                entry = (score, -position, t)
+                if len(skipped) < runners_up:
+                    heapq.heappush(skipped, entry)
+                else:
+                    heapq.heappushpop(skipped, entry)
 
-    log_debug(f"Selection complete. Final remaining minutes: {remaining}.")
-    return shortlist
+    log_debug("Selection complete. Final remaining minutes: %s.", remaining)
+    return shortlist, [entry[2] for entry in sorted(skipped, reverse=True)]
 
 
 def assemble_plan_data(
@@ -98,7 +312,15 @@ def assemble_plan_data(
     - energy_level: string like "low", "medium", "high"
     - suggested_shortlist: optional shortlist chosen by the deterministic planner
       (the agent may use this as a hint, but it's not authoritative)
+
+    TaskTable inputs are converted to plain dicts here, since plan_data is
+    serialized to JSON for the planning agent.
     """
+    if isinstance(all_tasks, TaskTable):
+        all_tasks = all_tasks.to_dicts()
+    if isinstance(suggested_shortlist, TaskTable):
+        suggested_shortlist = suggested_shortlist.to_dicts()
+
     plan_data = {
         "available_minutes": available_minutes,
         "energy_level": energy_level,
@@ -108,7 +330,7 @@ def assemble_plan_data(
     if suggested_shortlist is not None:
         plan_data["suggested_shortlist"] = suggested_shortlist
         log_debug(
-            f"Constructed plan data with {len(suggested_shortlist)} suggested shortlist tasks."
+            "Constructed plan data with %d suggested shortlist tasks.", len(suggested_shortlist)
         )
     else:
         log_debug("Constructed plan data with no suggested shortlist.")
@@ -117,6 +339,9 @@ def assemble_plan_data(
 
 # Main function
 if __name__ == "__main__":
+    if DEBUG:
+        configure_logging()
+
     print("=== Raw Tasks ===")
     for t in SAMPLE_TASKS:
         print("-", t["title"])
@@ -138,7 +363,7 @@ if __name__ == "__main__":
     for t in shortlist:
         print(f"- {t['title']} ({t['est_minutes']} min, score={t['score']})")
     
-    log_debug(f"Final list: {[t['title'] for t in shortlist]}")
+    log_debug("Final list: %s", [t['title'] for t in shortlist])
 
     print("\n=== Working on Plan Data (debug) ===")
     plan_data = assemble_plan_data(
@@ -147,4 +372,4 @@ if __name__ == "__main__":
         available_minutes=60,
         energy_level="medium",
     )
-    log_debug("Plan data:\n" + pformat(plan_data, indent=2))
\ No newline at end of file
+    log_debug("Plan data:\n%s", lazy_json(plan_data))
\ No newline at end of file
@@ -12,66 +12,301 @@ JSON-only MVP:
       "est_minutes": int
     }
 - Returns a Python list[dict] of normalized tasks.
+
+Results are cached (see llm_cache.py) under a hash of the normalized input,
+MODEL_NAME, PARSE_PROMPT_VERSION and the output mode (structured or free
+text), so pasting the same list again skips the model. Set
+TASK_ADVISOR_CACHE_DIR to also keep results on disk.
+
+With structured=True (STRUCTURED_OUTPUT, the default) the model is
+constrained to TASK_LIST_SCHEMA (see response_schemas.py) and each response
+is validated on arrival; a bad response raises ModelResponseError.
+
+Model requests run under PARSE_CALL_POLICY (call_policy.py): a deadline,
+jittered retry of transient failures and bad output, and optional hedging.
+
+parse_tasks() is the preferred entrypoint: it first tries the deterministic
+local normalizer (local_parser.py) and only calls the model when the input
+needs inference. It reports which path was taken.
 """
 
+import asyncio
 import json
-import os
-
-from dotenv import load_dotenv
-from google import genai
+import re
+import threading
 
-def log_debug(msg: str):
-    print(f"==== {msg}")
+try:
+    from advisor_logging import configure_logging, lazy_json, log_debug
+    from advisor_metrics import record_model_call
+    from call_policy import CallPolicy, call_with_policy, call_with_policy_async
+    from genai_clients import get_async_client, get_client
+    from llm_cache import get_cache, make_cache_key
+    from local_parser import load_task_list, normalize_task, normalize_tasks_locally
+    from response_schemas import (
+        INDEXED_TASK_LIST_SCHEMA,
+        STRUCTURED_OUTPUT,
+        TASK_INDEX_KEY,
+        TASK_LIST_SCHEMA,
+        TASK_SCHEMA,
+        json_output_config,
+        validate,
+        validate_response,
+    )
+except ImportError:
+    from src.advisor_logging import configure_logging, lazy_json, log_debug
+    from src.advisor_metrics import record_model_call
+    from src.call_policy import CallPolicy, call_with_policy, call_with_policy_async
+    from src.genai_clients import get_async_client, get_client
+    from src.llm_cache import get_cache, make_cache_key
+    from src.local_parser import load_task_list, normalize_task, normalize_tasks_locally
+    from src.response_schemas import (
+        INDEXED_TASK_LIST_SCHEMA,
+        STRUCTURED_OUTPUT,
+        TASK_INDEX_KEY,
+        TASK_LIST_SCHEMA,
+        TASK_SCHEMA,
+        json_output_config,
+        validate,
+        validate_response,
+    )
 
 MODEL_NAME = "gemini-2.5-flash-lite"
 
+# Bump whenever PARSE_AGENT_INSTRUCTION changes so cached results are not reused.
+PARSE_PROMPT_VERSION = "3"
+
+PARSE_AGENT_INSTRUCTION = (
+    "You are a Task List Normalizer.\n"
+    "You receive a JSON-like representation of tasks.\n"
+    "You MUST return ONLY a clean JSON array of task objects, each with:\n"
+    "  - title (string)\n"
+    "  - importance (integer 1-3)\n"
+    "  - urgency (integer 1-3)\n"
+    "  - desire (integer 1-3)\n"
+    "  - est_minutes (integer, estimated minutes to complete)\n"
+    "If any fields are missing, infer reasonable defaults.\n"
+    "Respond ONLY with the JSON array, no extra text, no explanations,\n"
+    "and do NOT wrap it in Markdown code fences.\n"
+)
+
+# Used in partial mode, where only the incomplete tasks are sent.
+PARTIAL_PARSE_AGENT_INSTRUCTION = PARSE_AGENT_INSTRUCTION + (
+    f"Each input task has an integer '{TASK_INDEX_KEY}' field. Copy it unchanged\n"
+    "into the matching output object, and return exactly one object per input task.\n"
+)
+
+# Parser response cache namespace; the cache is built on first use
+# (see llm_cache.get_cache).
+PARSE_CACHE_NAMESPACE = "parse_tasks"
+
+# Deadline, retry and hedging for model requests (see call_policy.py).
+PARSE_CALL_POLICY = CallPolicy()
 
-def call_parse_tasks_agent(raw_tasks_str: str):
+
+def normalize_raw_tasks(raw_tasks_str: str) -> str:
+    """
+    Canonical form of the raw input used for cache keys.
+
+    Valid JSON is re-serialized with sorted keys and no whitespace;
+    anything else has its whitespace runs collapsed.
+    """
+    try:
+        return json.dumps(json.loads(raw_tasks_str), sort_keys=True, separators=(",", ":"))
+    except ValueError:
+        return re.sub(r"\s+", " ", raw_tasks_str).strip()
+
+
+def parse_cache_key(
+    raw_tasks_str: str, kind: str = "full", structured: bool = STRUCTURED_OUTPUT
+) -> str:
+    """Cache key for a parse request: kind, output mode, model, prompt version and input."""
+    return make_cache_key(
+        "parse_tasks",
+        kind,
+        "structured" if structured else "text",
+        MODEL_NAME,
+        PARSE_PROMPT_VERSION,
+        normalize_raw_tasks(raw_tasks_str),
+    )
+
+
+def call_parse_tasks_agent(
+    raw_tasks_str: str,
+    use_cache: bool = True,
+    partial: bool = False,
+    structured: bool = STRUCTURED_OUTPUT,
+    return_path: bool = False,
+):
     """
     Call the LLM-based parse/normalize agent on a raw JSON task string.
 
+    With use_cache=True (default), a previously parsed identical input is
+    returned from the parse cache without calling the model.
+
+    With partial=True and a task list local_parser can read (JSON, CSV or
+    the bullet-text syntax), tasks that are already complete are normalized
+    locally and only the incomplete ones are sent to the model (tagged with
+    their list index), then merged back in the original order and checked
+    against TASK_SCHEMA. Falls back to a full call if the input cannot be
+    read as a list, the model drops an index or a merged task is invalid.
+
+    With structured=True the response is schema-constrained JSON, validated
+    on arrival (raises response_schemas.ModelResponseError if it is not).
+
     Returns:
-        list of task dicts in the internal schema.
+        list of task dicts in the internal schema, or with return_path=True
+        (tasks, path) where path is the route actually taken: "local" (every
+        task was complete), "partial" or "llm" (a full call, including the
+        fallback from a failed partial merge).
     """
-    load_dotenv()
-    api_key = os.getenv("GOOGLE_API_KEY")
-    client = genai.Client()
-
-    system_instruction = (
-        "You are a Task List Normalizer.\n"
-        "You receive a JSON-like representation of tasks.\n"
-        "You MUST return ONLY a clean JSON array of task objects, each with:\n"
-        "  - title (string)\n"
-        "  - importance (integer 1-3)\n"
-        "  - urgency (integer 1-3)\n"
-        "  - desire (integer 1-3)\n"
-        "  - est_minutes (integer, estimated minutes to complete)\n"
-        "If any fields are missing, infer reasonable defaults.\n"
-        "Respond ONLY with the JSON array, no extra text, no explanations,\n"
-        "and do NOT wrap it in Markdown code fences.\n"
+    if partial:
+        prepared = _prepare_partial(raw_tasks_str)
+        if prepared is not None:
+            tasks, incomplete, sub_input = prepared
+            if not incomplete:
+                return _with_path(tasks, "local", return_path)
+            model_tasks = _normalize_with_model(
+                sub_input, PARTIAL_PARSE_AGENT_INSTRUCTION, use_cache, "partial", structured
+            )
+            merged = _merge_partial(tasks, incomplete, model_tasks)
+            if merged is not None:
+                return _with_path(merged, "partial", return_path)
+    tasks = _normalize_with_model(
+        raw_tasks_str, PARSE_AGENT_INSTRUCTION, use_cache, "full", structured
+    )
+    return _with_path(tasks, "llm", return_path)
+
+
+async def call_parse_tasks_agent_async(
+    raw_tasks_str: str,
+    use_cache: bool = True,
+    partial: bool = False,
+    structured: bool = STRUCTURED_OUTPUT,
+    return_path: bool = False,
+):
+    """Async version of call_parse_tasks_agent (uses the genai aio client)."""
+    if partial:
+        prepared = _prepare_partial(raw_tasks_str)
+        if prepared is not None:
+            tasks, incomplete, sub_input = prepared
+            if not incomplete:
+                return _with_path(tasks, "local", return_path)
+            model_tasks = await _normalize_with_model_async(
+                sub_input, PARTIAL_PARSE_AGENT_INSTRUCTION, use_cache, "partial", structured
+            )
+            merged = _merge_partial(tasks, incomplete, model_tasks)
+            if merged is not None:
+                return _with_path(merged, "partial", return_path)
+    tasks = await _normalize_with_model_async(
+        raw_tasks_str, PARSE_AGENT_INSTRUCTION, use_cache, "full", structured
     )
+    return _with_path(tasks, "llm", return_path)
+
+
+def _with_path(tasks, path, return_path):
+    return (tasks, path) if return_path else tasks
+
+
+def _prepare_partial(raw_tasks_str: str):
+    """
+    Split a readable task list into locally complete and incomplete tasks.
+
+    Returns (tasks, incomplete, sub_input), or None if the input cannot be
+    read as a list. `tasks` has None at every incomplete position,
+    `incomplete` holds (index, locally known fields) pairs and `sub_input`
+    is the JSON sent to the model for them.
+    """
+    data = load_task_list(raw_tasks_str)
+    if data is None:
+        return None
+
+    tasks = [None] * len(data)
+    incomplete = []
+    originals = []
+    for i, task in enumerate(data):
+        normalized, missing = normalize_task(task)
+        if missing:
+            incomplete.append((i, normalized))
+            original = dict(task) if isinstance(task, dict) else {"raw": task}
+            original[TASK_INDEX_KEY] = i
+            originals.append(original)
+        else:
+            tasks[i] = normalized
+
+    if incomplete:
+        log_debug(
+            "[ParseTasksAgent] Normalized %d tasks locally; "
+            "sending %d incomplete tasks to the model.",
+            len(data) - len(incomplete),
+            len(incomplete),
+        )
+    return tasks, incomplete, json.dumps(originals)
+
+
+def _merge_partial(tasks, incomplete, model_tasks):
+    """
+    Merge model answers for the incomplete tasks back by index.
+
+    Returns None if the model dropped an index or a merged task does not
+    match TASK_SCHEMA (with or without structured output).
+    """
+    tasks = list(tasks)
+    by_index = {t.get(TASK_INDEX_KEY): t for t in model_tasks if isinstance(t, dict)}
+
+    for i, known in incomplete:
+        model_task = by_index.get(i)
+        if model_task is None:
+            log_debug("[ParseTasksAgent] Model dropped task index %d; retrying with the full list.", i)
+            return None
+        merged = {k: v for k, v in model_task.items() if k != TASK_INDEX_KEY}
+        # Values the user gave explicitly win over the model's guesses.
+        merged.update(known)
+        errors = validate(merged, TASK_SCHEMA, f"$[{i}]")
+        if errors:
+            log_debug(
+                "[ParseTasksAgent] Merged task %d is invalid (%s); retrying with the full list.",
+                i,
+                "; ".join(errors[:5]),
+            )
+            return None
+        tasks[i] = merged
+
+    return tasks
+
+
+def _build_contents(raw_input: str, instruction: str):
+    """Prompt contents for a normalize request."""
+    system_instruction = instruction
 
     user_prompt = (
         "Here is the raw task input:\n\n"
-        + raw_tasks_str
+        + raw_input
     )
 
-    log_debug("[ParseTasksAgent → Model]")
-    log_debug(user_prompt)
-
-    response = client.models.generate_content(
-        model=MODEL_NAME,
-        contents=[
-            {
-                "role": "user",
-                "parts": [{"text": system_instruction + "\n\n" + user_prompt}],
-            }
-        ],
-    )
+    log_debug("[ParseTasksAgent → Model]\n%s", user_prompt)
+
+    return [
+        {
+            "role": "user",
+            "parts": [{"text": system_instruction + "\n\n" + user_prompt}],
+        }
+    ]
 
-    raw_text = response.text.strip()
-    log_debug("[ParseTasksAgent ← Raw Model Response]")
-    log_debug(raw_text)
+
+def _parse_model_tasks(response, schema=None):
+    """
+    Turn the model response into a list of task dicts.
+
+    With `schema` (structured output) the text is plain JSON and is
+    validated against it; otherwise fences are stripped first.
+    """
+    raw_text = (response.text or "").strip()
+    log_debug("[ParseTasksAgent ← Raw Model Response]\n%s", raw_text)
+
+    if schema is not None:
+        tasks = validate_response(raw_text, schema)
+        log_debug("[ParseTasksAgent → Parsed Tasks]\n%s", lazy_json(tasks))
+        return tasks
 
     # If the model still uses ``` fences, strip them
     if raw_text.startswith("```"):
@@ -83,13 +318,146 @@ def call_parse_tasks_agent(raw_tasks_str: str):
 
     tasks = json.loads(raw_text)
 
-    log_debug("[ParseTasksAgent → Parsed Tasks]")
-    log_debug(json.dumps(tasks, indent=2))
+    log_debug("[ParseTasksAgent → Parsed Tasks]\n%s", lazy_json(tasks))
+    return tasks
+
+
+def _cached_tasks(raw_input: str, use_cache: bool, kind: str, structured: bool):
+    """Return (cache_key, cached_tasks_or_None)."""
+    cache_key = parse_cache_key(raw_input, kind, structured) if use_cache else None
+    if cache_key is None:
+        return None, None
+    cached = get_cache(PARSE_CACHE_NAMESPACE).get(cache_key)
+    if cached is not None:
+        log_debug("[ParseTasksAgent] Cache hit; skipping model call.")
+        record_model_call("parse_tasks", cache_hit=True)
+    return cache_key, cached
+
+
+def _task_schema(kind: str, structured: bool):
+    """Response schema for a normalize request, or None without structured output."""
+    if not structured:
+        return None
+    return INDEXED_TASK_LIST_SCHEMA if kind == "partial" else TASK_LIST_SCHEMA
+
+
+def _normalize_with_model(
+    raw_input: str, instruction: str, use_cache: bool, kind: str, structured: bool
+):
+    """Send raw_input to the model with `instruction` and parse the JSON array."""
+    cache_key, cached = _cached_tasks(raw_input, use_cache, kind, structured)
+    if cached is not None:
+        return cached
 
+    client = get_client()
+    schema = _task_schema(kind, structured)
+    contents = _build_contents(raw_input, instruction)
+
+    def request():
+        response = client.models.generate_content(
+            model=MODEL_NAME,
+            contents=contents,
+            config=json_output_config(schema) if schema else None,
+        )
+        record_model_call("parse_tasks", response)
+        return _parse_model_tasks(response, schema)
+
+    tasks = call_with_policy(request, PARSE_CALL_POLICY, "parse_tasks")
+
+    if cache_key is not None:
+        get_cache(PARSE_CACHE_NAMESPACE).put(cache_key, tasks)
     return tasks
 
 
+async def _normalize_with_model_async(
+    raw_input: str, instruction: str, use_cache: bool, kind: str, structured: bool
+):
+    """Async version of _normalize_with_model."""
+    # Cache access may touch the disk tier; keep it off the event loop.
+    cache_key, cached = await asyncio.to_thread(
+        _cached_tasks, raw_input, use_cache, kind, structured
+    )
+    if cached is not None:
+        return cached
+
+    client = get_async_client()
+    schema = _task_schema(kind, structured)
+    contents = _build_contents(raw_input, instruction)
+
+    async def request():
+        response = await client.models.generate_content(
+            model=MODEL_NAME,
+            contents=contents,
+            config=json_output_config(schema) if schema else None,
+        )
+        record_model_call("parse_tasks", response)
+        return _parse_model_tasks(response, schema)
+
+    tasks = await call_with_policy_async(request, PARSE_CALL_POLICY, "parse_tasks")
+
+    if cache_key is not None:
+        await asyncio.to_thread(get_cache(PARSE_CACHE_NAMESPACE).put, cache_key, tasks)
+    return tasks
+
+
+# How many parse requests took each path since process start (updated
+# under _parse_path_lock; requests run on many threads).
+PARSE_PATH_COUNTS = {"local": 0, "partial": 0, "llm": 0}
+_parse_path_lock = threading.Lock()
+
+
+def parse_tasks(raw_tasks_str: str, use_cache: bool = True):
+    """
+    Normalize raw task input, using the LLM only when necessary.
+
+    Returns:
+        (tasks, path) where path is "local" (deterministic fast path),
+        "partial" (a JSON, CSV or bullet-text list where only the incomplete
+        tasks went to the model)
+        or "llm" (ParseTasksAgent on the whole input, also when a partial
+        merge had to fall back to it). Model results may be served from the
+        parse cache.
+    """
+    tasks = normalize_tasks_locally(raw_tasks_str)
+    if tasks is not None:
+        path = "local"
+    else:
+        tasks, path = call_parse_tasks_agent(
+            raw_tasks_str,
+            use_cache=use_cache,
+            partial=load_task_list(raw_tasks_str) is not None,
+            return_path=True,
+        )
+
+    return _record_parse_path(tasks, path)
+
+
+async def parse_tasks_async(raw_tasks_str: str, use_cache: bool = True):
+    """Async version of parse_tasks; the local paths never await."""
+    tasks = normalize_tasks_locally(raw_tasks_str)
+    if tasks is not None:
+        path = "local"
+    else:
+        tasks, path = await call_parse_tasks_agent_async(
+            raw_tasks_str,
+            use_cache=use_cache,
+            partial=load_task_list(raw_tasks_str) is not None,
+            return_path=True,
+        )
+
+    return _record_parse_path(tasks, path)
+
+
+def _record_parse_path(tasks, path):
+    with _parse_path_lock:
+        PARSE_PATH_COUNTS[path] += 1
+    log_debug("[ParseTasks] Parsed %d tasks via the %s path.", len(tasks), path)
+    return tasks, path
+
+
 def main():
+    configure_logging()
+
     raw_tasks_str = """
     [
       {"title": "Email accountant", "importance": 3, "urgency": 3, "est_minutes": 20},
@@ -101,7 +469,7 @@ def main():
     tasks = call_parse_tasks_agent(raw_tasks_str)
     log_debug("Final normalized tasks (Python list):")
     for t in tasks:
-        log_debug(f"- {t}")
+        log_debug("- %s", t)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+Plan Context Selection
+
+Keeps the planning prompt bounded no matter how large the backlog is.
+
+assemble_plan_data() used to put every scored task into plan_data, so the
+prompt (and planner latency) grew linearly with the backlog, even though
+only a handful of tasks can fit in the time budget. select_plan_context()
+picks what the planner actually needs:
+
+1. the suggested shortlist (capped, highest score first, if it alone
+   would exceed the token budget; a warning is logged when that happens),
+2. the most relevant other candidates: tasks that fit in
+   available_minutes first, then the rest, each group in score order,
+   added until the token budget is reached, and
+3. a compact statistical summary of everything left out.
+
+Token counts are estimated from the JSON size (CHARS_PER_TOKEN characters
+per token), which is close enough for budgeting. They assume the indented
+JSON prompt, so for the compact wire format (plan_wire.py) they err on
+the safe side.
+"""
+
+import json
+from collections import Counter
+
+import numpy as np
+
+try:
+    from advisor_logging import log_warning
+    from task_table import TaskTable
+except ImportError:
+    from src.advisor_logging import log_warning
+    from src.task_table import TaskTable
+
+# Default budget for the plan data part of the planning prompt.
+PLAN_CONTEXT_TOKEN_BUDGET = 2000
+
+CHARS_PER_TOKEN = 4
+
+# Rough token cost of the plan_data envelope and the omitted-tasks summary.
+_ENVELOPE_TOKENS = 30
+_SUMMARY_TOKENS = 80
+
+
+def estimate_tokens(obj) -> int:
+    """Estimate the prompt tokens of obj serialized as indented JSON."""
+    text = obj if isinstance(obj, str) else json.dumps(obj, indent=2)
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def _list_item_tokens(obj) -> int:
+    """Tokens for obj as an item of a task list inside plan_data (two levels deep)."""
+    text = json.dumps(obj, indent=2)
+    # Every line gets 4 more spaces of indentation, plus ",\n" between items.
+    return (len(text) + 4 * (text.count("\n") + 1) + 2) // CHARS_PER_TOKEN + 1
+
+
+def _columns(scored):
+    """Return (titles, est_minutes array, score array, row getter) for scored tasks."""
+    if isinstance(scored, TaskTable):
+        return scored.title, np.asarray(scored.est_minutes), np.asarray(scored.score), scored.row
+    scored = list(scored)
+    titles = [t["title"] for t in scored]
+    est = np.array([t["est_minutes"] for t in scored], dtype=np.float64)
+    score = np.array([t["score"] for t in scored], dtype=np.float64)
+    return titles, est, score, scored.__getitem__
+
+
+def _shortlist_mask(titles, est, score, shortlist_rows):
+    """Mark the positions of the shortlist tasks within the scored tasks."""
+    mask = np.zeros(len(titles), dtype=bool)
+    pending = Counter((t["title"], t["est_minutes"], t["score"]) for t in shortlist_rows)
+    if not pending:
+        return mask
+
+    maybe = np.zeros(len(titles), dtype=bool)
+    for _, e, s in pending:
+        maybe |= (est == e) & (score == s)
+    for i in np.flatnonzero(maybe).tolist():
+        key = (titles[i], est[i].item(), score[i].item())
+        if pending[key] > 0:
+            pending[key] -= 1
+            mask[i] = True
+    return mask
+
+
+def summarize_tasks(est, score, available_minutes) -> dict:
+    """Compact statistics for a group of tasks."""
+    if len(score) == 0:
+        return {"count": 0}
+    return {
+        "count": int(len(score)),
+        "score": {
+            "min": round(float(score.min()), 2),
+            "max": round(float(score.max()), 2),
+            "mean": round(float(score.mean()), 2),
+        },
+        "est_minutes": {
+            "min": round(float(est.min()), 2),
+            "max": round(float(est.max()), 2),
+            "total": round(float(est.sum()), 2),
+        },
+        "fit_in_available_time": int((est <= available_minutes).sum()),
+    }
+
+
+def _cap_shortlist(shortlist_rows, budget):
+    """
+    Keep the best-scoring shortlist tasks whose cost fits in budget.
+
+    Returns (kept rows in their original order, tokens used).
+    """
+    # The shortlist appears twice in plan_data (all_tasks and suggested_shortlist).
+    costs = [2 * _list_item_tokens(t) for t in shortlist_rows]
+    if sum(costs) <= budget:
+        return shortlist_rows, sum(costs)
+
+    order = sorted(range(len(shortlist_rows)), key=lambda j: -shortlist_rows[j]["score"])
+    keep = set()
+    used = 0
+    for j in order:
+        if used + costs[j] > budget:
+            break
+        used += costs[j]
+        keep.add(j)
+    return [t for j, t in enumerate(shortlist_rows) if j in keep], used
+
+
+def select_plan_context(
+    scored,
+    shortlist,
+    available_minutes,
+    token_budget=PLAN_CONTEXT_TOKEN_BUDGET,
+):
+    """
+    Choose which scored tasks go into the planning prompt.
+
+    If the shortlist alone does not fit in token_budget, only its
+    best-scoring tasks that fit are kept, the rest are counted in the
+    omitted summary, and a warning is logged.
+
+    Parameters:
+        scored: score-sorted task dicts or a scored TaskTable
+        shortlist: the suggested shortlist (list or TaskTable)
+        available_minutes: time budget, used to rank candidates
+        token_budget: estimated token budget for the plan data
+
+    Returns:
+        (context_tasks, shortlist, omitted_summary) where context_tasks is a
+        score-sorted list of dicts (shortlist plus selected candidates),
+        shortlist is the (possibly capped) list of shortlist dicts to send,
+        and omitted_summary is summarize_tasks() of the rest, or None if
+        nothing was left out.
+    """
+    shortlist_rows = list(shortlist)
+    titles, est, score, get_row = _columns(scored)
+
+    used = _ENVELOPE_TOKENS + _SUMMARY_TOKENS
+    kept_rows, shortlist_tokens = _cap_shortlist(shortlist_rows, token_budget - used)
+    used += shortlist_tokens
+    if len(kept_rows) < len(shortlist_rows):
+        log_warning(
+            "[plan_context] Shortlist of %d tasks exceeds the %d-token plan context "
+            "budget; sending the top %d and summarizing the rest.",
+            len(shortlist_rows),
+            token_budget,
+            len(kept_rows),
+        )
+
+    in_shortlist = _shortlist_mask(titles, est, score, shortlist_rows)
+    fits = est <= available_minutes
+    candidates = np.concatenate(
+        [np.flatnonzero(fits & ~in_shortlist), np.flatnonzero(~fits & ~in_shortlist)]
+    )
+
+    selected = _shortlist_mask(titles, est, score, kept_rows)
+    for i in candidates.tolist():
+        cost = _list_item_tokens(get_row(i))
+        if used + cost > token_budget:
+            break
+        used += cost
+        selected[i] = True
+
+    context_tasks = [get_row(i) for i in np.flatnonzero(selected).tolist()]
+
+    omitted = ~selected
+    summary = None
+    if omitted.any():
+        summary = summarize_tasks(est[omitted], score[omitted], available_minutes)
+    return context_tasks, kept_rows, summary
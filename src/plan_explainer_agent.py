@@ -8,14 +8,27 @@ Plan Explainer Agent
  built with the google-genai client, rather than a full ADK Agent.
  The actual ADK Agent—the root orchestrator—lives in
  `agents/task_advisor_agent/agent.py` and invokes this module as one of its tools.
+
+ By default plan_data is sent in the compact wire format (see plan_wire.py):
+ task lists as a header row plus value rows, and the model answers with task
+ ids that are decoded back into the usual shortlist/nice_to_have schema.
+ Pass wire_format="json" for the original pretty-printed JSON prompt.
+
+ stream_planning_agent() / stream_planning_agent_async() use the model's
+ streaming API and yield each shortlist and nice-to-have entry as soon as
+ it is complete (see plan_wire.PlanStreamDecoder), then the full plan.
+
+ With structured=True (response_schemas.STRUCTURED_OUTPUT, the default) the
+ response is constrained to PLAN_SCHEMA / COMPACT_PLAN_SCHEMA through the
+ genai config and validated on arrival, so no fence stripping is needed.
+
+ Planner responses are cached (see llm_cache.py) under a canonical form of
+ plan_data, so requests that differ only in task order or score formatting
+ reuse an earlier answer.
 """
 
+import asyncio
 import json
-from pprint import pformat
-import os
-
-from dotenv import load_dotenv
-from google import genai
 
 # Import your existing logic
 try:
@@ -24,8 +37,27 @@ try:
         score_tasks,
         choose_shortlist,
         assemble_plan_data,
-        log_debug,
-        DEBUG,
+    )
+    from advisor_logging import configure_logging, lazy_json, log_debug, log_warning
+    from advisor_metrics import record_model_call
+    from call_policy import CallPolicy, call_with_policy, call_with_policy_async
+    from genai_clients import get_async_client, get_client
+    from response_schemas import (
+        COMPACT_PLAN_SCHEMA,
+        PLAN_SCHEMA,
+        STRUCTURED_OUTPUT,
+        json_output_config,
+        validate_response,
+    )
+    from llm_cache import get_cache, make_cache_key
+    from plan_wire import (
+        COMPACT_LEGEND,
+        COMPACT_RESPONSE_FORMAT,
+        COMPACT_STRUCTURED_RESPONSE_FORMAT,
+        PLAN_SECTIONS,
+        PlanStreamDecoder,
+        decode_plan_response,
+        encode_plan_data,
     )
 except ImportError:
     from src.main import (
@@ -33,8 +65,27 @@ except ImportError:
         score_tasks,
         choose_shortlist,
         assemble_plan_data,
-        log_debug,
-        DEBUG,
+    )
+    from src.advisor_logging import configure_logging, lazy_json, log_debug, log_warning
+    from src.advisor_metrics import record_model_call
+    from src.call_policy import CallPolicy, call_with_policy, call_with_policy_async
+    from src.genai_clients import get_async_client, get_client
+    from src.response_schemas import (
+        COMPACT_PLAN_SCHEMA,
+        PLAN_SCHEMA,
+        STRUCTURED_OUTPUT,
+        json_output_config,
+        validate_response,
+    )
+    from src.llm_cache import get_cache, make_cache_key
+    from src.plan_wire import (
+        COMPACT_LEGEND,
+        COMPACT_RESPONSE_FORMAT,
+        COMPACT_STRUCTURED_RESPONSE_FORMAT,
+        PLAN_SECTIONS,
+        PlanStreamDecoder,
+        decode_plan_response,
+        encode_plan_data,
     )
 
 MODEL_NAME = "gemini-2.5-flash-lite"
@@ -44,7 +95,9 @@ PLAN_AGENT_INSTRUCTION = (
     "You receive a JSON object describing:\n"
     "- all tasks with scores and attributes (all_tasks)\n"
     "- an optional suggested_shortlist chosen by a deterministic planner\n"
-    "- the user's available time (available_minutes) and energy level\n\n"
+    "- the user's available time (available_minutes) and energy level\n"
+    "- optionally omitted_tasks_summary: statistics about lower-priority tasks\n"
+    "  left out of all_tasks to keep this request small\n\n"
     "Your job is to:\n"
     "1) Choose the actual shortlist of tasks yourself, based primarily on\n"
     "   all_tasks, available_minutes, and energy_level.\n"
@@ -63,25 +116,43 @@ PLAN_AGENT_INSTRUCTION = (
     "  - 'summary': a short string explaining the overall plan.\n"
 )
 
-# Lazy-initialized global client so this works both when run directly
-# and when imported as a tool from the root ADK agent.
-_client: genai.Client | None = None
-
-
-def get_client() -> genai.Client:
-    """Return a cached google-genai client, loading the API key from .env."""
-    global _client
-    if _client is None:
-        load_dotenv()
-        api_key = os.getenv("GOOGLE_API_KEY")
-        log_debug(f"[plan_explainer_agent] API Key Loaded: {bool(api_key)}")
-        if not api_key:
-            raise RuntimeError(
-                "GOOGLE_API_KEY is not set. Please add it to your .env or environment."
-            )
-        _client = genai.Client(api_key=api_key)
-    return _client
+# Same task, for plan_data sent in the compact wire format (plan_wire.py).
+_COMPACT_PLAN_AGENT_TASK = (
+    "You are a Task Prioritization Advisor.\n"
+    "You receive a compact JSON object (PLAN_DATA) describing the user's tasks,\n"
+    "a suggested shortlist, the available time and energy level.\n"
+    + COMPACT_LEGEND
+    + "\nYour job is to:\n"
+    "1) Choose the actual shortlist of tasks yourself, based primarily on\n"
+    "   tasks, avail, and energy.\n"
+    "2) You may use suggested as a hint, but you are free to adjust\n"
+    "   tasks and ordering if it would clearly improve the plan.\n"
+    "3) Suggest 0–2 'nice to have' tasks if there is extra time or energy.\n\n"
+    "Constraints:\n"
+    "- The total estimated minutes of the shortlist should roughly fit within avail.\n"
+    "- You MUST respond with a single valid JSON object only.\n"
+    "- Do NOT include any text before or after the JSON.\n"
+    "- Do NOT wrap the JSON in Markdown code fences (no ```json ... ```).\n"
+)
+COMPACT_PLAN_AGENT_INSTRUCTION = _COMPACT_PLAN_AGENT_TASK + COMPACT_RESPONSE_FORMAT
+COMPACT_STRUCTURED_PLAN_AGENT_INSTRUCTION = (
+    _COMPACT_PLAN_AGENT_TASK + COMPACT_STRUCTURED_RESPONSE_FORMAT
+)
+
+PLAN_WIRE_FORMATS = ("compact", "json")
+PLAN_WIRE_FORMAT = "compact"
+
+# Bump whenever a planning instruction changes so cached plans are not reused.
+PLAN_PROMPT_VERSION = "4"
+
+# Planner response cache namespace. The cache is built on first use; configure
+# size, TTL and the on-disk backend with the TASK_ADVISOR_CACHE_* environment
+# variables (see llm_cache.cache_from_env).
+PLAN_CACHE_NAMESPACE = "planning"
 
+# Deadline, retry and hedging for planner requests (see call_policy.py).
+# Streamed calls are not retried or hedged: their entries are already out.
+PLAN_CALL_POLICY = CallPolicy()
 
 def build_demo_plan_data() -> dict:
     """
@@ -96,9 +167,7 @@ def build_demo_plan_data() -> dict:
         energy_level="medium",
         suggested_shortlist=suggested_shortlist,
     )
-    log_debug(
-        "Plan data assembled in plan_explainer_agent:\n" + pformat(plan_data, indent=2)
-    )
+    log_debug("Plan data assembled in plan_explainer_agent:\n%s", lazy_json(plan_data))
     return plan_data
 
 
@@ -120,52 +189,327 @@ def _strip_markdown_fences(raw_text: str) -> str:
     return text.strip()
 
 
-def call_planning_agent(plan_data: dict) -> dict:
+def _canonical(value, key=None):
+    """Recursively normalize a plan_data value for cache keys."""
+    if isinstance(value, dict):
+        return {k: _canonical(v, k) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        items = [_canonical(v) for v in value]
+        if all(isinstance(v, dict) for v in items):
+            # Task lists: order does not change the request.
+            items.sort(key=lambda v: json.dumps(v, sort_keys=True))
+        return items
+    if key == "score" and isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if isinstance(value, float):
+        value = round(value, 6)
+        return int(value) if value.is_integer() else value
+    if key == "energy_level" and isinstance(value, str):
+        return value.strip().lower()
+    return value
+
+
+def canonical_plan_data(plan_data: dict) -> str:
+    """
+    Canonical JSON form of plan_data: task lists sorted by content, scores
+    rounded (integral floats become ints) and energy_level lowercased.
+    available_minutes and energy_level are part of it like any other field.
+    """
+    return json.dumps(_canonical(plan_data), sort_keys=True, separators=(",", ":"))
+
+
+def plan_cache_key(
+    plan_data: dict,
+    wire_format: str = PLAN_WIRE_FORMAT,
+    structured: bool = STRUCTURED_OUTPUT,
+) -> str:
+    """Cache key for a planning request (structured and free-form answers are kept apart)."""
+    return make_cache_key(
+        "planning",
+        MODEL_NAME,
+        PLAN_PROMPT_VERSION,
+        wire_format,
+        "structured" if structured else "text",
+        canonical_plan_data(plan_data),
+    )
+
+
+def call_planning_agent(
+    plan_data: dict,
+    use_cache: bool = True,
+    wire_format: str = PLAN_WIRE_FORMAT,
+    structured: bool = STRUCTURED_OUTPUT,
+) -> dict:
     """
     Send plan_data to the planning LLM (Gemini) and return the parsed JSON result.
 
     This function is designed to be used both:
     - from the root ADK agent (as a tool), and
     - from this module's main() for direct testing.
+
+    With use_cache=True (default), an equivalent earlier request (same
+    canonical_plan_data) is answered from the planning cache without calling the model.
+
+    wire_format is "compact" (default, see plan_wire.py) or "json". The
+    result uses the same schema either way.
+
+    With structured=True the model output is constrained to the plan schema
+    and validated on arrival (raises response_schemas.ModelResponseError).
     """
-    # Build the user prompt. The system-like behavior is encoded in
-    # PLAN_AGENT_INSTRUCTION for simplicity.
-    user_prompt = (
-        PLAN_AGENT_INSTRUCTION
-        + "\n\nHere is the current plan data as JSON.\n"
-        + "Use it to construct your JSON response as described in the instructions.\n\n"
-        + "PLAN_DATA_JSON:\n"
-        + json.dumps(plan_data, indent=2)
+    cache_key, cached = _cached_plan(plan_data, use_cache, wire_format, structured)
+    if cached is not None:
+        return cached
+
+    prompt, tasks = _build_plan_prompt(plan_data, wire_format, structured)
+    schema = _plan_schema(wire_format, structured)
+    client = get_client()
+
+    def request():
+        response = client.models.generate_content(
+            model=MODEL_NAME,
+            contents=prompt,
+            config=json_output_config(schema) if schema else None,
+        )
+        record_model_call("planning", response)
+        return _parse_plan_response(response, tasks, schema)
+
+    plan_json = call_with_policy(request, PLAN_CALL_POLICY, "planning")
+    if cache_key is not None:
+        get_cache(PLAN_CACHE_NAMESPACE).put(cache_key, plan_json)
+    return plan_json
+
+
+async def call_planning_agent_async(
+    plan_data: dict,
+    use_cache: bool = True,
+    wire_format: str = PLAN_WIRE_FORMAT,
+    structured: bool = STRUCTURED_OUTPUT,
+) -> dict:
+    """
+    Async version of call_planning_agent (uses the genai aio client). Cache
+    lookups and writes, which may touch the disk tier, run in a worker
+    thread so they never block the event loop.
+    """
+    cache_key, cached = await asyncio.to_thread(
+        _cached_plan, plan_data, use_cache, wire_format, structured
     )
+    if cached is not None:
+        return cached
+
+    prompt, tasks = _build_plan_prompt(plan_data, wire_format, structured)
+    schema = _plan_schema(wire_format, structured)
+    client = get_async_client()
+
+    async def request():
+        response = await client.models.generate_content(
+            model=MODEL_NAME,
+            contents=prompt,
+            config=json_output_config(schema) if schema else None,
+        )
+        record_model_call("planning", response)
+        return _parse_plan_response(response, tasks, schema)
+
+    plan_json = await call_with_policy_async(request, PLAN_CALL_POLICY, "planning")
+    if cache_key is not None:
+        await asyncio.to_thread(get_cache(PLAN_CACHE_NAMESPACE).put, cache_key, plan_json)
+    return plan_json
 
-    log_debug("[User → Model]")
-    log_debug(user_prompt)
 
+def stream_planning_agent(
+    plan_data: dict,
+    use_cache: bool = True,
+    wire_format: str = PLAN_WIRE_FORMAT,
+    structured: bool = STRUCTURED_OUTPUT,
+):
+    """
+    Streaming version of call_planning_agent.
+
+    Yields ("shortlist", entry) and ("nice_to_have", entry) events as soon
+    as each entry has been generated, then a final ("plan", plan_json) with
+    the same result call_planning_agent would return. A cached plan is
+    replayed as events.
+    """
+    cache_key, cached = _cached_plan(plan_data, use_cache, wire_format, structured)
+    if cached is not None:
+        yield from _plan_events(cached)
+        return
+
+    prompt, tasks = _build_plan_prompt(plan_data, wire_format, structured)
+    schema = _plan_schema(wire_format, structured)
+    decoder = PlanStreamDecoder(tasks)
     client = get_client()
-    response = client.models.generate_content(
+    chunk = None
+    for chunk in client.models.generate_content_stream(
+        model=MODEL_NAME,
+        contents=prompt,
+        config=json_output_config(schema) if schema else None,
+    ):
+        yield from decoder.feed(chunk.text or "")
+
+    # Token usage is reported on the last chunk.
+    record_model_call("planning", chunk)
+    plan_json = _parse_plan_text(decoder.text, tasks, schema)
+    if cache_key is not None:
+        get_cache(PLAN_CACHE_NAMESPACE).put(cache_key, plan_json)
+    yield "plan", plan_json
+
+
+async def stream_planning_agent_async(
+    plan_data: dict,
+    use_cache: bool = True,
+    wire_format: str = PLAN_WIRE_FORMAT,
+    structured: bool = STRUCTURED_OUTPUT,
+):
+    """Async version of stream_planning_agent (an async generator)."""
+    cache_key, cached = await asyncio.to_thread(
+        _cached_plan, plan_data, use_cache, wire_format, structured
+    )
+    if cached is not None:
+        for event in _plan_events(cached):
+            yield event
+        return
+
+    prompt, tasks = _build_plan_prompt(plan_data, wire_format, structured)
+    schema = _plan_schema(wire_format, structured)
+    decoder = PlanStreamDecoder(tasks)
+    client = get_async_client()
+    chunk = None
+    stream = await client.models.generate_content_stream(
         model=MODEL_NAME,
-        contents=user_prompt,
+        contents=prompt,
+        config=json_output_config(schema) if schema else None,
     )
+    async for chunk in stream:
+        for event in decoder.feed(chunk.text or ""):
+            yield event
+
+    record_model_call("planning", chunk)
+    plan_json = _parse_plan_text(decoder.text, tasks, schema)
+    if cache_key is not None:
+        await asyncio.to_thread(get_cache(PLAN_CACHE_NAMESPACE).put, cache_key, plan_json)
+    yield "plan", plan_json
+
+
+def _plan_events(plan_json: dict):
+    """Replay a complete plan as stream_planning_agent events."""
+    for section in PLAN_SECTIONS:
+        for entry in plan_json.get(section) or []:
+            yield section, entry
+    yield "plan", plan_json
+
+
+def _cached_plan(plan_data: dict, use_cache: bool, wire_format: str, structured: bool):
+    """Return (cache_key, cached_plan_or_None)."""
+    if wire_format not in PLAN_WIRE_FORMATS:
+        raise ValueError(
+            f"Unknown wire_format {wire_format!r}; expected one of {PLAN_WIRE_FORMATS}."
+        )
+    cache_key = plan_cache_key(plan_data, wire_format, structured) if use_cache else None
+    if cache_key is None:
+        return None, None
+    cached = get_cache(PLAN_CACHE_NAMESPACE).get(cache_key)
+    if cached is not None:
+        log_debug("[Planning Agent] Cache hit; skipping model call.")
+        record_model_call("planning", cache_hit=True)
+    return cache_key, cached
+
+
+def _plan_schema(wire_format: str, structured: bool):
+    """Response schema for a planning request, or None without structured output."""
+    if not structured:
+        return None
+    return COMPACT_PLAN_SCHEMA if wire_format == "compact" else PLAN_SCHEMA
+
+
+def _build_plan_prompt(
+    plan_data: dict, wire_format: str = PLAN_WIRE_FORMAT, structured: bool = STRUCTURED_OUTPUT
+):
+    """
+    Build the user prompt for the planning model.
 
-    raw_text = (response.text or "").strip()
-    log_debug("[Model Explanation]")
-    log_debug(raw_text)
+    Returns (prompt, tasks): tasks is the id -> task list needed to decode a
+    compact response, or None for the "json" wire format.
+    """
+    # The system-like behavior is encoded in the instruction for simplicity.
+    if wire_format == "compact":
+        encoded, tasks = encode_plan_data(plan_data)
+        instruction = (
+            COMPACT_STRUCTURED_PLAN_AGENT_INSTRUCTION if structured
+            else COMPACT_PLAN_AGENT_INSTRUCTION
+        )
+        user_prompt = (
+            instruction
+            + "\n\nHere is the current plan data.\n"
+            + "Use it to construct your JSON response as described in the instructions.\n\n"
+            + "PLAN_DATA:\n"
+            + encoded
+        )
+    else:
+        tasks = None
+        user_prompt = (
+            PLAN_AGENT_INSTRUCTION
+            + "\n\nHere is the current plan data as JSON.\n"
+            + "Use it to construct your JSON response as described in the instructions.\n\n"
+            + "PLAN_DATA_JSON:\n"
+            + json.dumps(plan_data, indent=2)
+        )
+
+    log_debug("[User → Model]\n%s", user_prompt)
+    return user_prompt, tasks
+
+
+def _parse_plan_response(response, tasks=None, schema=None) -> dict:
+    """
+    Parse the plan JSON from the model response.
+
+    With `schema` (structured output) the text is validated against it;
+    otherwise accidental fences are stripped first. With `tasks` (compact
+    wire format), task ids are decoded back into
+    {title, reason, est_minutes, score} entries.
+    """
+    return _parse_plan_text(response.text or "", tasks, schema)
 
-    cleaned = _strip_markdown_fences(raw_text)
 
-    # Try to parse the JSON. If it fails, log and re-raise for visibility.
-    try:
-        plan_json = json.loads(cleaned)
-    except json.JSONDecodeError as e:
-        log_debug("ERROR: Failed to parse JSON from model response.")
-        log_debug(f"Raw cleaned text was:\n{cleaned}")
-        raise e
+def _parse_plan_text(raw_text: str, tasks=None, schema=None) -> dict:
+    """_parse_plan_response for the raw response text (also used when streaming)."""
+    raw_text = raw_text.strip()
+    log_debug("[Model Explanation]\n%s", raw_text)
 
-    log_debug("[Parsed JSON Plan]")
-    log_debug(json.dumps(plan_json, indent=2))
+    if schema is not None:
+        plan_json = validate_response(raw_text, schema)
+    else:
+        cleaned = _strip_markdown_fences(raw_text)
+
+        # Try to parse the JSON. If it fails, log and re-raise for visibility.
+        try:
+            plan_json = json.loads(cleaned)
+        except json.JSONDecodeError as e:
+            log_warning(
+                "Failed to parse JSON from model response. Raw cleaned text was:\n%s", cleaned
+            )
+            raise e
+
+    if tasks is not None:
+        plan_json = decode_plan_response(plan_json, tasks)
+
+    log_debug("[Parsed JSON Plan]\n%s", lazy_json(plan_json))
     return plan_json
 
 
+def print_plan_entry(section: str, entry: dict) -> None:
+    """Print one streamed plan entry as soon as it arrives (CLI)."""
+    label = "Shortlist" if section == "shortlist" else "Nice-to-have"
+    print(
+        f"[{label}] {entry.get('title')} "
+        f"[{entry.get('est_minutes')} min, score={entry.get('score')}]",
+        flush=True,
+    )
+    print(f"  Reason: {entry.get('reason')}", flush=True)
+
+
 def print_final_plan(plan_json: dict) -> None:
     """Pretty-print the final plan for CLI usage and debugging."""
     print("\nShortlist tasks chosen by the agent:")
@@ -220,6 +564,8 @@ def main():
 
     to see a demo explanation using SAMPLE_TASKS.
     """
+    configure_logging()
+
     # Build deterministic plan_data from SAMPLE_TASKS
     plan_data = build_demo_plan_data()
 
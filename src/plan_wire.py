@@ -0,0 +1,270 @@
+"""
+Plan Wire Format
+
+Compact encoding of plan_data for the planning prompt, and the decoder for
+the matching compact response.
+
+json.dumps(plan_data, indent=2) repeats every key name for every task and
+spends most of its characters on indentation. The compact form sends each
+task list as one header row plus value rows, with short column names:
+
+    {"avail":60,"energy":"medium",
+     "cols":["id","title","imp","urg","des","est","score"],
+     "tasks":[[0,"Email accountant",3,3,2,20,15.5],...],
+     "suggested":[0,2]}
+
+The planner answers with task ids instead of copying task fields back:
+
+    {"shortlist":[[0,"reason"],...],"nice_to_have":[[5,"reason"]],"summary":"..."}
+
+decode_plan_response() maps that back to the usual
+shortlist/nice_to_have entries of {title, reason, est_minutes, score}.
+
+PlanStreamDecoder does the same incrementally for a streamed response:
+every shortlist/nice_to_have entry is decoded as soon as its closing
+bracket arrives, long before the whole JSON object is complete.
+"""
+
+import json
+
+# Short column names for the known task fields; other fields keep their name.
+SHORT_KEYS = {
+    "title": "title",
+    "importance": "imp",
+    "urgency": "urg",
+    "desire": "des",
+    "est_minutes": "est",
+    "score": "score",
+}
+
+COMPACT_LEGEND = (
+    "PLAN_DATA fields:\n"
+    "- avail: available_minutes; energy: energy_level\n"
+    "- tasks: all tasks, one row per task, values in the order given by cols\n"
+    "  (id, title, imp=importance, urg=urgency, des=desire, est=est_minutes, score)\n"
+    "- suggested: ids of the suggested_shortlist chosen by a deterministic planner\n"
+    "- omitted (optional): statistics about lower-priority tasks left out of tasks\n"
+)
+
+COMPACT_RESPONSE_FORMAT = (
+    "- The JSON must have exactly these fields:\n"
+    "  - 'shortlist': list of [id, reason] pairs, id taken from tasks\n"
+    "  - 'nice_to_have': list of [id, reason] pairs\n"
+    "  - 'summary': a short string explaining the overall plan.\n"
+)
+
+# With schema-constrained output (response_schemas.COMPACT_PLAN_SCHEMA) the
+# entries are small objects; decode_plan_entry() accepts both forms.
+COMPACT_STRUCTURED_RESPONSE_FORMAT = (
+    "- The JSON must have exactly these fields:\n"
+    "  - 'shortlist': list of {id, reason}, id taken from tasks\n"
+    "  - 'nice_to_have': list of {id, reason}\n"
+    "  - 'summary': a short string explaining the overall plan.\n"
+)
+
+
+def _compact_value(value):
+    """Drop the '.0' from integral floats; everything else is sent as-is."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _task_key(task):
+    return json.dumps(task, sort_keys=True, default=str)
+
+
+def encode_plan_data(plan_data: dict):
+    """
+    Encode plan_data for the compact prompt.
+
+    Returns:
+        (text, tasks) where text is the compact JSON and tasks is the list of
+        task dicts indexed by the ids used in it (needed for decoding).
+    """
+    tasks = list(plan_data.get("all_tasks") or [])
+    ids = {}
+    for i, task in enumerate(tasks):
+        ids.setdefault(_task_key(task), []).append(i)
+
+    # Suggested tasks are sent by id; the shortlist is normally a subset of all_tasks.
+    suggested = []
+    taken = {}
+    for task in plan_data.get("suggested_shortlist") or []:
+        key = _task_key(task)
+        candidates = ids.get(key, [])
+        n = taken.get(key, 0)
+        if n < len(candidates):
+            suggested.append(candidates[n])
+            taken[key] = n + 1
+        else:
+            tasks.append(task)
+            suggested.append(len(tasks) - 1)
+
+    fields = []
+    for task in tasks:
+        for field in task:
+            if field not in fields:
+                fields.append(field)
+
+    encoded = {
+        "avail": plan_data.get("available_minutes"),
+        "energy": plan_data.get("energy_level"),
+        "cols": ["id"] + [SHORT_KEYS.get(f, f) for f in fields],
+        "tasks": [
+            [i] + [_compact_value(task.get(f)) for f in fields] for i, task in enumerate(tasks)
+        ],
+        "suggested": suggested,
+    }
+    if plan_data.get("omitted_tasks_summary") is not None:
+        encoded["omitted"] = plan_data["omitted_tasks_summary"]
+
+    text = json.dumps(encoded, separators=(",", ":"), ensure_ascii=False)
+    return text, tasks
+
+
+def decode_plan_entry(entry, tasks):
+    """
+    One compact [id, reason] entry -> {title, reason, est_minutes, score}.
+
+    Full-schema dicts are returned unchanged; unknown ids give None.
+    """
+    if isinstance(entry, dict):
+        if "id" not in entry:
+            # Already in the full schema.
+            return entry
+        task_id, reason = entry.get("id"), entry.get("reason")
+    elif isinstance(entry, (list, tuple)) and entry:
+        task_id = entry[0]
+        reason = entry[1] if len(entry) > 1 else None
+    else:
+        return None
+
+    if isinstance(task_id, str) and task_id.strip().isdigit():
+        task_id = int(task_id)
+    if not isinstance(task_id, int) or not 0 <= task_id < len(tasks):
+        return None
+
+    task = tasks[task_id]
+    return {
+        "title": task.get("title"),
+        "reason": reason,
+        "est_minutes": task.get("est_minutes"),
+        "score": task.get("score"),
+    }
+
+
+def decode_plan_response(plan_json: dict, tasks) -> dict:
+    """
+    Map a compact planner response back to the shortlist/nice_to_have schema.
+
+    Entries that are already full task dicts are kept as they are. Entries
+    whose id is unknown are left out and listed under 'dropped_entries'.
+    """
+    decoded = dict(plan_json)
+    dropped = []
+    for section in ("shortlist", "nice_to_have"):
+        entries = []
+        for entry in plan_json.get(section) or []:
+            task = decode_plan_entry(entry, tasks)
+            if task is None:
+                dropped.append(entry)
+            else:
+                entries.append(task)
+        decoded[section] = entries
+    if dropped:
+        decoded["dropped_entries"] = dropped
+    return decoded
+
+
+PLAN_SECTIONS = ("shortlist", "nice_to_have")
+
+
+class PlanStreamDecoder:
+    """
+    Incremental decoder for a streamed planner response.
+
+    feed() takes text chunks and returns the (section, entry) pairs
+    completed by them, in order; entries are decoded with
+    decode_plan_entry() when `tasks` (from encode_plan_data) is given.
+    Text before the opening brace (e.g. a Markdown fence) is skipped.
+    The full text is kept in `text` for the final json.loads().
+
+    It is a small scanner over the top-level object: it tracks string and
+    nesting state to find the 'shortlist' and 'nice_to_have' arrays and
+    parses each of their elements once the element is closed.
+    """
+
+    def __init__(self, tasks=None):
+        self.tasks = tasks
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._key = None
+        self._section = None
+        self._entry_start = None
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    def feed(self, chunk: str):
+        """Consume a chunk; return the list of newly completed (section, entry) pairs."""
+        if not chunk:
+            return []
+        self._text += chunk
+        events = []
+        text = self._text
+        for i in range(self._pos, len(text)):
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1 : i]
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == ":" and self._depth == 1:
+                self._key = self._last_string
+            elif c in "{[":
+                if self._depth == 1 and c == "[" and self._key in PLAN_SECTIONS:
+                    self._section = self._key
+                elif self._depth == 2 and self._section is not None:
+                    self._entry_start = i
+                self._depth += 1
+            elif c in "}]":
+                self._depth -= 1
+                if self._depth == 2 and self._entry_start is not None:
+                    events.extend(self._emit(text[self._entry_start : i + 1]))
+                    self._entry_start = None
+                elif self._depth == 1:
+                    self._section = None
+        self._pos = len(text)
+        return events
+
+    def _emit(self, entry_text):
+        try:
+            entry = json.loads(entry_text)
+        except json.JSONDecodeError:
+            return []
+        if self.tasks is not None:
+            entry = decode_plan_entry(entry, self.tasks)
+            if entry is None:
+                return []
+        return [(self._section, entry)]
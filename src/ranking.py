@@ -0,0 +1,241 @@
+"""
+Ranking
+
+Lazy alternatives to the full sort in score_tasks.
+
+RankedTasks scores every task (vectorized, see scoring_engine.py), heapifies
+the scores in O(n) and then pops tasks in descending score order only as
+they are requested. choose_shortlist stops pulling as soon as nothing else
+can fit in the remaining time, so planning k tasks out of a large backlog
+costs O(n + k log n) instead of O(n log n).
+
+Ties are broken by input position, so the order matches score_tasks().
+
+PriorityIndex is the long-lived counterpart: a heap keyed by task that
+supports add/remove/update in O(log n) (removals are lazy and the heap is
+compacted when stale entries pile up). It can be walked in score order
+without being modified, so choose_shortlist reads from it directly.
+"""
+
+import heapq
+import itertools
+
+try:
+    from scoring_engine import compute_priority_scores
+    from task_table import TaskTable
+except ImportError:
+    from src.scoring_engine import compute_priority_scores
+    from src.task_table import TaskTable
+
+
+
+class RankedTasks:
+    """
+    Iterator over scored task dicts in descending score order.
+
+    Accepts a list of task dicts or a TaskTable. Only the tasks actually
+    consumed are copied into scored dicts. `policy` is an optional
+    ScoringPolicy (default: the standard formula).
+
+    Attributes:
+        min_est_minutes: smallest est_minutes in the whole input (None if empty).
+            choose_shortlist uses it to stop early once the remaining time
+            is below every task's estimate.
+    """
+
+    def __init__(self, tasks, policy=None):
+        if isinstance(tasks, TaskTable):
+            self._table = tasks
+            self._tasks = None
+            importance, urgency, desire = tasks.importance, tasks.urgency, tasks.desire
+            est_minutes = tasks.est_minutes.tolist()
+        else:
+            self._table = None
+            self._tasks = list(tasks)
+            importance = [t["importance"] for t in self._tasks]
+            urgency = [t["urgency"] for t in self._tasks]
+            desire = [t["desire"] for t in self._tasks]
+            est_minutes = [t["est_minutes"] for t in self._tasks]
+
+        if policy is None:
+            scores = compute_priority_scores(importance, urgency, desire)
+        else:
+            scores = policy.scores(importance, urgency, desire)
+        self._scores = scores.tolist()
+        self.min_est_minutes = min(est_minutes) if est_minutes else None
+
+        # (negated score, position) keeps the max-heap stable on ties.
+        self._heap = [(-score, i) for i, score in enumerate(self._scores)]
+        heapq.heapify(self._heap)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._heap:
+            raise StopIteration
+        _, i = heapq.heappop(self._heap)
+        if self._table is not None:
+            return self._table.row(i) | {"score": self._scores[i]}
+        t_copy = dict(self._tasks[i])
+        t_copy["score"] = self._scores[i]
+        return t_copy
+
+    def __repr__(self):
+        return f"RankedTasks({len(self._heap)} tasks remaining)"
+
+
+class PriorityIndex:
+    """
+    Persistent score-ordered index over a live task backlog.
+
+    Tasks are identified by `key` (a field name, "title" by default) and
+    scored with `policy` (a ScoringPolicy, default: the standard formula).
+
+    - add(task), remove(key), update(key, task): O(log n)
+    - ranked(): iterate scored tasks in descending score order, O(log n)
+      per task pulled, without modifying the index
+    - min_est_minutes: smallest estimate in the index (amortized O(log n))
+
+    Ties keep insertion order, and update() keeps a task's original
+    position among equal scores, matching score_tasks() on the equivalent
+    list.
+    """
+
+    def __init__(self, tasks=(), key="title", policy=None):
+        self.key = key
+        self.policy = policy
+        self._heap = []      # entries: [-score, seq, uid, key, scored_task or None]
+        self._entries = {}   # key -> live heap entry
+        self._seq = itertools.count()
+        self._uids = itertools.count()
+        self._stale = 0
+        # Lazy min-heap of estimates plus live counts, for min_est_minutes.
+        self._est_heap = []
+        self._est_counts = {}
+
+        for task in tasks:
+            self._insert(task, next(self._seq))
+        heapq.heapify(self._heap)
+        heapq.heapify(self._est_heap)
+
+    # ---- Mutation ----
+
+    def _prepare(self, task, seq):
+        """Score `task` into a heap entry. Reads only; raises before any mutation."""
+        task_key = task[self.key]
+        scored = dict(task)
+        if self.policy is None:
+            scored["score"] = compute_priority_scores(
+                scored["importance"], scored["urgency"], scored["desire"]
+            ).item()
+        else:
+            scored["score"] = self.policy.score(scored)
+        if "est_minutes" not in scored:
+            raise KeyError("est_minutes")
+        # next(self._uids) keeps entries distinct when update() reuses a seq.
+        return [-scored["score"], seq, next(self._uids), task_key, scored]
+
+    def _link(self, entry, push):
+        """Make a prepared entry live."""
+        self._entries[entry[3]] = entry
+
+        est = entry[4]["est_minutes"]
+        # An estimate stays in the lazy heap while its count is 0, so only
+        # push estimates that are not already there.
+        if est not in self._est_counts:
+            if push:
+                heapq.heappush(self._est_heap, est)
+            else:
+                self._est_heap.append(est)
+            self._est_counts[est] = 0
+        self._est_counts[est] += 1
+
+        if push:
+            heapq.heappush(self._heap, entry)
+        else:
+            self._heap.append(entry)
+
+    def _insert(self, task, seq, push=False):
+        entry = self._prepare(task, seq)
+        if entry[3] in self._entries:
+            raise ValueError(f"Task {entry[3]!r} is already indexed; use update().")
+        self._link(entry, push)
+
+    def _discard(self, task_key):
+        entry = self._entries.pop(task_key)
+        self._est_counts[entry[4]["est_minutes"]] -= 1
+        entry[4] = None
+        self._stale += 1
+        return entry
+
+    def add(self, task):
+        """Index a new task. Raises ValueError if its key is already present."""
+        self._insert(task, next(self._seq), push=True)
+
+    def remove(self, task_key):
+        """Drop the task with this key. Raises KeyError if it is not indexed."""
+        self._discard(task_key)
+        self._maybe_compact()
+
+    def update(self, task_key, task):
+        """
+        Replace the task stored under task_key, keeping its tie position.
+        If `task` is invalid the index is left unchanged.
+        """
+        if task_key not in self._entries:
+            raise KeyError(task_key)
+        entry = self._prepare(task, self._entries[task_key][1])
+        if entry[3] != task_key and entry[3] in self._entries:
+            raise ValueError(f"Task {entry[3]!r} is already indexed.")
+        self._discard(task_key)
+        self._link(entry, push=True)
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        # Rebuild once stale entries outnumber live ones (amortized O(1)).
+        if self._stale > len(self._entries):
+            self._heap = [e for e in self._heap if e[4] is not None]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    # ---- Queries ----
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, task_key):
+        return task_key in self._entries
+
+    def get(self, task_key):
+        """Return the scored task stored under task_key."""
+        return self._entries[task_key][4]
+
+    @property
+    def min_est_minutes(self):
+        while self._est_heap and self._est_counts[self._est_heap[0]] == 0:
+            del self._est_counts[heapq.heappop(self._est_heap)]
+        return self._est_heap[0] if self._est_heap else None
+
+    def ranked(self):
+        """
+        Yield scored tasks in descending score order.
+
+        Walks the heap array with a second small heap of frontier
+        positions, so the index itself is never modified. Do not add,
+        remove or update tasks while iterating.
+        """
+        heap = self._heap
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            entry, pos = heapq.heappop(frontier)
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+            if entry[4] is not None:
+                yield entry[4]
+
+    def __repr__(self):
+        return f"PriorityIndex({len(self)} tasks, key={self.key!r})"
@@ -0,0 +1,157 @@
+"""
+Response Schemas
+
+JSON schemas for structured (schema-constrained) model output.
+
+With STRUCTURED_OUTPUT on, the agents pass these schemas to the model via
+the genai config (response_mime_type="application/json" and
+response_json_schema), so the model can only produce JSON of the right
+shape: no Markdown fences or prose to strip, and no malformed JSON to
+re-request. Every response is still checked on arrival with
+validate_response(), which raises ModelResponseError with the exact
+violations instead of letting a bad shape fail later in the pipeline.
+"""
+
+import json
+
+from google.genai import types
+
+# Default for the agents' `structured` parameter.
+STRUCTURED_OUTPUT = True
+
+_RATING = {"type": "integer", "minimum": 1, "maximum": 3}
+
+TASK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "importance": _RATING,
+        "urgency": _RATING,
+        "desire": _RATING,
+        "est_minutes": {"type": "integer", "minimum": 0},
+    },
+    "required": ["title", "importance", "urgency", "desire", "est_minutes"],
+}
+
+TASK_LIST_SCHEMA = {"type": "array", "items": TASK_SCHEMA}
+
+# Partial mode: every task also carries its input list index under a
+# reserved key, so a user field called "index" is not overwritten.
+TASK_INDEX_KEY = "_task_index"
+
+INDEXED_TASK_LIST_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": dict(TASK_SCHEMA["properties"], **{TASK_INDEX_KEY: {"type": "integer"}}),
+        "required": TASK_SCHEMA["required"] + [TASK_INDEX_KEY],
+    },
+}
+
+_PLAN_ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "reason": {"type": "string"},
+        "est_minutes": {"type": "number"},
+        "score": {"type": "number"},
+    },
+    "required": ["title", "reason", "est_minutes", "score"],
+}
+
+# Compact wire format (plan_wire.py): entries reference tasks by id.
+_COMPACT_PLAN_ENTRY_SCHEMA = {
+    "type": "object",
+    "properties": {"id": {"type": "integer"}, "reason": {"type": "string"}},
+    "required": ["id", "reason"],
+}
+
+
+def _plan_schema(entry_schema):
+    return {
+        "type": "object",
+        "properties": {
+            "shortlist": {"type": "array", "items": entry_schema},
+            "nice_to_have": {"type": "array", "items": entry_schema},
+            "summary": {"type": "string"},
+        },
+        "required": ["shortlist", "nice_to_have", "summary"],
+    }
+
+
+PLAN_SCHEMA = _plan_schema(_PLAN_ENTRY_SCHEMA)
+COMPACT_PLAN_SCHEMA = _plan_schema(_COMPACT_PLAN_ENTRY_SCHEMA)
+
+
+class ModelResponseError(ValueError):
+    """A model response that is not valid JSON or does not match its schema."""
+
+    def __init__(self, message, errors=(), raw_text=None):
+        super().__init__(message)
+        self.errors = list(errors)
+        self.raw_text = raw_text
+
+
+def json_output_config(schema) -> types.GenerateContentConfig:
+    """genai config that constrains the response to JSON matching `schema`."""
+    return types.GenerateContentConfig(
+        response_mime_type="application/json",
+        response_json_schema=schema,
+    )
+
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+}
+
+
+def validate(value, schema, path="$"):
+    """
+    Check `value` against the subset of JSON schema used in this module
+    (type, properties, required, items, minimum, maximum).
+
+    Returns a list of error strings; empty means valid.
+    """
+    expected = schema.get("type")
+    if expected and not _TYPE_CHECKS[expected](value):
+        return [f"{path}: expected {expected}, got {type(value).__name__}"]
+
+    errors = []
+    if expected == "object":
+        for key in schema.get("required", ()):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in value:
+                errors.extend(validate(value[key], sub_schema, f"{path}.{key}"))
+    elif expected == "array" and "items" in schema:
+        for i, item in enumerate(value):
+            errors.extend(validate(item, schema["items"], f"{path}[{i}]"))
+    elif expected in ("integer", "number"):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: {value} is below the minimum {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: {value} is above the maximum {schema['maximum']}")
+    return errors
+
+
+def validate_response(raw_text: str, schema):
+    """Parse a structured response and validate it against `schema`."""
+    try:
+        value = json.loads(raw_text)
+    except json.JSONDecodeError as e:
+        raise ModelResponseError(f"Model response is not valid JSON: {e}", raw_text=raw_text) from e
+
+    errors = validate(value, schema)
+    if errors:
+        raise ModelResponseError(
+            f"Model response does not match its schema ({len(errors)} errors): "
+            + "; ".join(errors[:5]),
+            errors=errors,
+            raw_text=raw_text,
+        )
+    return value
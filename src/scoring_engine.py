@@ -0,0 +1,210 @@
+"""
+Scoring Engine
+
+Vectorized (NumPy) version of the deterministic scoring step in main.py.
+
+`compute_priority_score` in main.py stays the reference implementation.
+This module applies the exact same formula to whole columns of ratings at
+once, so large backlogs are scored without a Python-level loop:
+
+    score = ((1.5 * importance) * (1 * urgency)) + (1 * desire)
+
+The operations are evaluated in the same order and in float64, so every
+score is bit-for-bit identical to the reference, and the ranking uses a
+stable sort so ties keep their input order (just like list.sort()).
+
+When every rating is an integer in 1..3 there are only 27 possible rating
+combinations. bucket_rank() then looks scores up in a precomputed table
+and ranks tasks with a stable counting (radix) sort on the small bucket
+number, which is O(n) instead of O(n log n). Anything else falls back to
+the general path.
+
+ScoringPolicy makes the formula configurable. A policy is a sum of terms,
+each a weight times a product of rating fields; the default policy is the
+formula above. Every policy is compiled once, at construction, into a
+vectorized kernel and its own 27-entry lookup table, so custom weights keep
+the O(n) bucket path.
+"""
+
+import numpy as np
+
+RATING_MIN = 1
+RATING_MAX = 3
+
+
+def compute_priority_scores(importance, urgency, desire) -> np.ndarray:
+    """
+    Compute priority scores for column arrays of ratings.
+
+    Each argument is a sequence (or array) of equal length. Returns a
+    float64 array where element i equals compute_priority_score() for
+    task i.
+    """
+    importance = np.asarray(importance, dtype=np.float64)
+    urgency = np.asarray(urgency, dtype=np.float64)
+    desire = np.asarray(desire, dtype=np.float64)
+    return ((1.5 * importance) * (1 * urgency)) + (1 * desire)
+
+
+def rank_by_score(scores) -> np.ndarray:
+    """
+    Return the indices that order `scores` from highest to lowest.
+
+    Ties keep their original relative order, matching
+    `list.sort(key=..., reverse=True)` in score_tasks.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    return np.argsort(-scores, kind="stable")
+
+
+RATING_FIELDS = ("importance", "urgency", "desire")
+
+# The formula from compute_priority_score(), as (weight, fields) terms.
+DEFAULT_TERMS = (
+    (1.5, ("importance", "urgency")),
+    (1.0, ("desire",)),
+)
+
+
+class ScoringPolicy:
+    """
+    A configurable priority formula:
+
+        score = sum(weight * product(task[field] for field in fields))
+
+    over `terms`, a sequence of (weight, fields) pairs whose fields are
+    taken from RATING_FIELDS. Terms are evaluated left to right as
+    ((weight * f1) * f2) + ..., which for DEFAULT_TERMS reproduces
+    compute_priority_score() exactly.
+
+    Example:
+        ScoringPolicy([(2.0, ["importance"]), (1.0, ["urgency"])], name="ops")
+    """
+
+    def __init__(self, terms=DEFAULT_TERMS, name="default"):
+        self.name = name
+        self.terms = tuple((float(weight), tuple(fields)) for weight, fields in terms)
+        if not self.terms:
+            raise ValueError("A ScoringPolicy needs at least one term.")
+        for _, fields in self.terms:
+            unknown = [f for f in fields if f not in RATING_FIELDS]
+            if unknown:
+                raise ValueError(
+                    f"Unknown rating field(s) {unknown}; expected fields from {RATING_FIELDS}."
+                )
+
+        # Compile: score and rank all 27 (importance, urgency, desire) combinations.
+        ratings = np.arange(RATING_MIN, RATING_MAX + 1)
+        imp, urg, des = np.meshgrid(ratings, ratings, ratings, indexing="ij")
+        self.table_scores = self.scores(imp.ravel(), urg.ravel(), des.ravel())
+
+        # Bucket rank 0 is the highest distinct score; equal scores share a bucket
+        # so that ties are ordered purely by input position.
+        distinct = np.unique(self.table_scores)[::-1]
+        self.table_ranks = np.searchsorted(-distinct, -self.table_scores).astype(np.uint8)
+
+    def score(self, task) -> float:
+        """Score a single task dict."""
+        total = None
+        for weight, fields in self.terms:
+            value = weight
+            for field in fields:
+                value = value * task[field]
+            total = value if total is None else total + value
+        return total
+
+    def scores(self, importance, urgency, desire) -> np.ndarray:
+        """Vectorized kernel: score column arrays of ratings."""
+        columns = {
+            "importance": np.asarray(importance, dtype=np.float64),
+            "urgency": np.asarray(urgency, dtype=np.float64),
+            "desire": np.asarray(desire, dtype=np.float64),
+        }
+        total = None
+        for weight, fields in self.terms:
+            value = weight
+            for field in fields:
+                value = value * columns[field]
+            total = value if total is None else total + value
+        return np.broadcast_to(total, columns["importance"].shape).astype(np.float64)
+
+    def __repr__(self):
+        formula = " + ".join(
+            f"{weight:g}*" + "*".join(fields) for weight, fields in self.terms
+        )
+        return f"ScoringPolicy({self.name!r}: {formula})"
+
+
+DEFAULT_POLICY = ScoringPolicy()
+
+
+def _rating_codes(column):
+    """Return column - RATING_MIN as intp, or None if not all in 1..3 integers."""
+    column = np.asarray(column)
+    if column.size == 0:
+        return np.zeros(0, dtype=np.intp)
+    if column.dtype.kind not in "iuf":
+        return None
+    if column.dtype.kind == "f" and not np.all(column == np.floor(column)):
+        return None
+    if column.min() < RATING_MIN or column.max() > RATING_MAX:
+        return None
+    return column.astype(np.intp) - RATING_MIN
+
+
+def bucket_rank(importance, urgency, desire, policy=None):
+    """
+    O(n) scoring and ranking for integer ratings in 1..3.
+
+    Returns (scores, order) like score_columns(), or None when some rating
+    is outside the 1..3 integer domain and the general path must be used.
+    """
+    policy = policy or DEFAULT_POLICY
+    codes = []
+    for column in (importance, urgency, desire):
+        code = _rating_codes(column)
+        if code is None:
+            return None
+        codes.append(code)
+
+    span = RATING_MAX - RATING_MIN + 1
+    bucket = (codes[0] * span + codes[1]) * span + codes[2]
+
+    scores = policy.table_scores[bucket]
+    # A stable sort on uint8 keys is a radix sort in NumPy: linear time.
+    order = np.argsort(policy.table_ranks[bucket], kind="stable")
+    return scores, order
+
+
+def score_and_rank(importance, urgency, desire, policy=None):
+    """
+    Score rating columns and rank them (descending, stable).
+
+    Uses bucket_rank() when the ratings allow it, else the general
+    vectorized kernel + rank_by_score() path. `policy` defaults to
+    DEFAULT_POLICY.
+    """
+    ranked = bucket_rank(importance, urgency, desire, policy)
+    if ranked is not None:
+        return ranked
+    if policy is None:
+        scores = compute_priority_scores(importance, urgency, desire)
+    else:
+        scores = policy.scores(importance, urgency, desire)
+    return scores, rank_by_score(scores)
+
+
+def score_columns(tasks, policy=None):
+    """
+    Pull the rating columns out of a list of task dicts and score them.
+
+    Returns:
+        (scores, order) where `scores` is aligned with `tasks` and `order`
+        is the descending-score ranking (see score_and_rank()).
+    """
+    n = len(tasks)
+    importance = np.fromiter((t["importance"] for t in tasks), dtype=np.float64, count=n)
+    urgency = np.fromiter((t["urgency"] for t in tasks), dtype=np.float64, count=n)
+    desire = np.fromiter((t["desire"] for t in tasks), dtype=np.float64, count=n)
+
+    return score_and_rank(importance, urgency, desire, policy)
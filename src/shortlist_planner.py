@@ -0,0 +1,245 @@
+"""
+Shortlist Planner
+
+Exact (optimal) shortlist selection for choose_shortlist(mode="optimal").
+
+The default greedy pass in main.py walks tasks in score order and takes
+whatever still fits. That is fast but can leave minutes unused and miss a
+better combination. Here we solve the 0/1 knapsack problem instead:
+
+    maximize   sum(score)    over a subset of tasks
+    subject to sum(est_minutes) <= available_minutes
+
+Bounds (n = number of tasks, W = available_minutes):
+- Time:   O(n * W), one vectorized NumPy pass of length W per task.
+- Memory: O(n * W) bytes for the choice table (one bool per task/minute)
+          plus O(W) floats for the running best scores.
+
+With a full workday (W = 480) and a few thousand tasks this is a few MB
+and tens of milliseconds. Requests above KNAPSACK_MAX_CELLS are rejected
+rather than silently allocating a huge table.
+
+Minute estimates are rounded up to whole minutes so the chosen shortlist
+never exceeds the budget.
+
+BudgetShortlistTable runs the same DP (or the greedy walk) once for every
+budget up to a maximum, so later what-if queries ("what about 45
+minutes?") are answered by lookup. It costs the same O(n * W) time. Only
+tasks picked for at least one budget get a column in the pick matrix (the
+greedy walk also stops once no budget has room left), the matrix is kept
+bit-packed (m * (W + 1) / 8 bytes for m such tasks), and the
+KNAPSACK_MAX_CELLS cap applies to both modes.
+"""
+
+import numpy as np
+
+try:
+    from task_table import TaskTable
+except ImportError:
+    from src.task_table import TaskTable
+
+# Upper bound on n * (W + 1) choice-table cells (bytes) we are willing to
+# allocate, for the knapsack DP and for BudgetShortlistTable in both modes.
+KNAPSACK_MAX_CELLS = 50_000_000
+
+
+def _check_cells(rows, budget):
+    cells = rows * (budget + 1)
+    if cells > KNAPSACK_MAX_CELLS:
+        raise ValueError(
+            f"Shortlist table of {cells} cells exceeds KNAPSACK_MAX_CELLS "
+            f"({KNAPSACK_MAX_CELLS}); reduce the task count or the time budget."
+        )
+
+
+def _weights_and_values(est_minutes, scores):
+    weights = np.ceil(np.asarray(est_minutes, dtype=np.float64)).astype(np.int64)
+    weights = np.maximum(weights, 0)
+    values = np.asarray(scores, dtype=np.float64)
+    return weights, values
+
+
+def _knapsack_table(weights, values, budget):
+    """
+    Run the knapsack DP for every capacity 0..budget.
+
+    Returns (candidates, keep, best) where `candidates` are the task
+    indices that entered the DP, keep[row, c] says whether candidates[row]
+    is taken in the best subset for capacity c (given the rows before it),
+    and best[c] is the best total score for capacity c.
+    """
+    # Tasks that can never be part of an improving subset are skipped up front.
+    candidates = np.flatnonzero((weights <= budget) & (values > 0))
+    _check_cells(len(candidates), budget)
+
+    best = np.zeros(budget + 1, dtype=np.float64)
+    keep = np.zeros((len(candidates), budget + 1), dtype=bool)
+
+    for row, i in enumerate(candidates.tolist()):
+        w = int(weights[i])
+        candidate = best[: budget + 1 - w] + values[i]
+        improved = candidate > best[w:]
+        keep[row, w:] = improved
+        best[w:] = np.where(improved, candidate, best[w:])
+
+    return candidates, keep, best
+
+
+def knapsack_pick(est_minutes, scores, available_minutes):
+    """
+    Return the indices of the subset of tasks with the highest total score
+    whose estimates fit in `available_minutes`.
+
+    `est_minutes` and `scores` are aligned sequences. The returned indices
+    are in ascending order, so for score-sorted input the shortlist stays
+    in score order. Ties between equally good subsets are broken in favour
+    of tasks that appear earlier.
+    """
+    budget = int(available_minutes)
+    if budget < 0:
+        return []
+
+    weights, values = _weights_and_values(est_minutes, scores)
+    candidates, keep, _ = _knapsack_table(weights, values, budget)
+
+    # Walk the choice table backwards to recover the chosen tasks.
+    picked = []
+    capacity = budget
+    for row in range(len(candidates) - 1, -1, -1):
+        if keep[row, capacity]:
+            i = int(candidates[row])
+            picked.append(i)
+            capacity -= int(weights[i])
+
+    picked.reverse()
+    return picked
+
+
+def _knapsack_all_budgets(est_minutes, scores, max_minutes):
+    """
+    Optimal picks for every budget 0..max_minutes.
+
+    Returns (columns, chosen, best): chosen[b, j] says whether task
+    columns[j] is picked for budget b, best[b] is that pick's total score.
+    """
+    weights, values = _weights_and_values(est_minutes, scores)
+    candidates, keep, best = _knapsack_table(weights, values, max_minutes)
+
+    # Backtrack every capacity at once: one vector step per candidate row.
+    chosen = np.zeros((max_minutes + 1, len(candidates)), dtype=bool)
+    capacity = np.arange(max_minutes + 1)
+    for row in range(len(candidates) - 1, -1, -1):
+        take = keep[row, capacity]
+        chosen[:, row] = take
+        capacity = capacity - take * weights[candidates[row]]
+    return candidates, chosen, best
+
+
+def _greedy_all_budgets(est_minutes, scores, max_minutes):
+    """
+    Greedy picks for every budget 0..max_minutes, in the same
+    (columns, chosen, best) form as _knapsack_all_budgets().
+
+    Tasks that fit in no budget get no column, and the walk stops once no
+    budget has room for any of the remaining tasks.
+    """
+    est = np.asarray(est_minutes, dtype=np.float64)
+    values = np.asarray(scores, dtype=np.float64)
+    # Smallest estimate among tasks i..n-1.
+    suffix_min = np.minimum.accumulate(est[::-1])[::-1]
+
+    # Same walk as main._greedy_pick, run for all budgets side by side.
+    columns = []
+    picks = []
+    best = np.zeros(max_minutes + 1, dtype=np.float64)
+    remaining = np.arange(max_minutes + 1, dtype=np.float64)
+    for i, e in enumerate(est.tolist()):
+        if remaining.max() < suffix_min[i]:
+            break
+        fits = e <= remaining
+        if not fits.any():
+            continue
+        _check_cells(len(columns) + 1, max_minutes)
+        columns.append(i)
+        picks.append(fits)
+        remaining = remaining - fits * e
+        best = best + fits * values[i]
+
+    chosen = np.stack(picks, axis=1) if picks else np.zeros((max_minutes + 1, 0), dtype=bool)
+    return np.asarray(columns, dtype=np.intp), chosen, best
+
+
+class BudgetShortlistTable:
+    """
+    Best shortlist for every whole-minute budget 0..max_minutes.
+
+    Built once from a scored task set (a score-sorted list of dicts or a
+    scored TaskTable) in O(n * max_minutes) time; raises ValueError when
+    the pick matrix would exceed KNAPSACK_MAX_CELLS. Afterwards
+    shortlist(available_minutes) is a table lookup, so "what about 45
+    minutes?" follow-ups need no rescoring and no re-planning.
+
+    mode matches choose_shortlist(): "greedy" or "optimal". For each budget
+    the answer is exactly what choose_shortlist(scored, budget, mode) would
+    return. Fractional budgets are rounded down to whole minutes.
+    """
+
+    def __init__(self, scored_tasks, max_minutes, mode="optimal"):
+        if mode not in ("greedy", "optimal"):
+            raise ValueError(f"Unknown shortlist mode {mode!r}.")
+        self.max_minutes = int(max_minutes)
+        if self.max_minutes < 0:
+            raise ValueError("max_minutes must be >= 0.")
+        self.mode = mode
+
+        if isinstance(scored_tasks, TaskTable):
+            # TaskTable: use the columns directly.
+            self.scored = scored_tasks
+            est_minutes = scored_tasks.est_minutes
+            scores = scored_tasks.score
+        else:
+            self.scored = list(scored_tasks)
+            est_minutes = [t["est_minutes"] for t in self.scored]
+            scores = [t["score"] for t in self.scored]
+
+        if mode == "optimal":
+            columns, chosen, best = _knapsack_all_budgets(est_minutes, scores, self.max_minutes)
+        else:
+            columns, chosen, best = _greedy_all_budgets(est_minutes, scores, self.max_minutes)
+
+        # Row b holds the picks for budget b, one bit per column.
+        self._columns = columns
+        self._packed = np.packbits(chosen, axis=1)
+        self._best_scores = best
+        self._shortlists = {}
+
+    def _budget(self, available_minutes):
+        budget = int(available_minutes)
+        if budget < 0 or budget > self.max_minutes:
+            raise ValueError(
+                f"available_minutes={available_minutes} is outside the precomputed "
+                f"range 0..{self.max_minutes}."
+            )
+        return budget
+
+    def shortlist(self, available_minutes):
+        """Return the shortlist for this budget, in the same form as the input."""
+        budget = self._budget(available_minutes)
+        if budget not in self._shortlists:
+            bits = np.unpackbits(self._packed[budget], count=len(self._columns))
+            picked = self._columns[bits.astype(bool)]
+            if isinstance(self.scored, TaskTable):
+                self._shortlists[budget] = self.scored.take(picked)
+            else:
+                self._shortlists[budget] = [self.scored[i] for i in picked.tolist()]
+        return self._shortlists[budget]
+
+    def best_score(self, available_minutes):
+        """Total score of the shortlist for this budget."""
+        return float(self._best_scores[self._budget(available_minutes)])
+
+    def __repr__(self):
+        return (
+            f"BudgetShortlistTable({len(self.scored)} tasks, "
+            f"0..{self.max_minutes} min, mode={self.mode!r})"
+        )
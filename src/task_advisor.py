@@ -4,6 +4,16 @@ Task Advisor Root Orchestrator
 This module provides a single entrypoint:
     run_task_advisor(tasks=None, raw_tasks_str=None,
                       available_minutes=60, energy_level="medium")
+and its asyncio counterpart run_task_advisor_async(...) with the same
+parameters, for serving many sessions from one process.
+run_task_advisor_batch(...) runs many requests with bounded concurrency.
+
+Progress is logged through advisor_logging (silent unless configured;
+per-request verbosity via log_level=...). Every request is timed per stage
+and its model token usage recorded (see advisor_metrics.py); pass
+return_metrics=True or a metrics_sink to get them. If the planner misses
+the request's latency budget (latency_budget_seconds) or fails, the
+deterministic shortlist is returned, flagged "degraded".
 
 Right now:
 - tasks defaults to SAMPLE_TASKS
@@ -13,83 +23,668 @@ This file will become the root orchestrator for the ADK agent system.
 """
 
 from dotenv import load_dotenv
+import asyncio
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
 
-def log_debug(msg: str):
-    print(f"==== {msg}")
+from google.genai import errors as genai_errors
 
 try:
     # Script-style import (when running: python src/task_advisor.py)
-    from main import SAMPLE_TASKS, score_tasks, choose_shortlist, assemble_plan_data
-    from plan_explainer_agent import call_planning_agent, print_final_plan
-    from parse_tasks_agent import call_parse_tasks_agent
+    from advisor_logging import configure_logging, log_debug, log_warning, request_log_level
+    from advisor_metrics import emit_metrics, measure_request, record_event, stage
+    from call_policy import TRANSPORT_ERRORS, CallDeadlineExceeded, call_with_deadline
+    from fallback_plan import build_fallback_plan
+    from main import (
+        SAMPLE_TASKS,
+        score_tasks,
+        choose_shortlist,
+        assemble_plan_data,
+        iter_scored_tasks,
+        stream_shortlist,
+    )
+    from plan_explainer_agent import (
+        call_planning_agent,
+        call_planning_agent_async,
+        print_final_plan,
+        print_plan_entry,
+        stream_planning_agent,
+        stream_planning_agent_async,
+    )
+    from parse_tasks_agent import parse_tasks, parse_tasks_async
+    from plan_context import PLAN_CONTEXT_TOKEN_BUDGET, select_plan_context
+    from ranking import PriorityIndex, RankedTasks
+    from response_schemas import ModelResponseError
+    from shortlist_planner import BudgetShortlistTable
+    from task_table import TaskTable
 except ImportError:
     # Package-style import (when imported as src.task_advisor)
-    from src.main import SAMPLE_TASKS, score_tasks, choose_shortlist, assemble_plan_data
-    from src.plan_explainer_agent import call_planning_agent, print_final_plan
-    from src.parse_tasks_agent import call_parse_tasks_agent
+    from src.advisor_logging import configure_logging, log_debug, log_warning, request_log_level
+    from src.advisor_metrics import emit_metrics, measure_request, record_event, stage
+    from src.call_policy import TRANSPORT_ERRORS, CallDeadlineExceeded, call_with_deadline
+    from src.fallback_plan import build_fallback_plan
+    from src.main import (
+        SAMPLE_TASKS,
+        score_tasks,
+        choose_shortlist,
+        assemble_plan_data,
+        iter_scored_tasks,
+        stream_shortlist,
+    )
+    from src.plan_explainer_agent import (
+        call_planning_agent,
+        call_planning_agent_async,
+        print_final_plan,
+        print_plan_entry,
+        stream_planning_agent,
+        stream_planning_agent_async,
+    )
+    from src.parse_tasks_agent import parse_tasks, parse_tasks_async
+    from src.plan_context import PLAN_CONTEXT_TOKEN_BUDGET, select_plan_context
+    from src.ranking import PriorityIndex, RankedTasks
+    from src.response_schemas import ModelResponseError
+    from src.shortlist_planner import BudgetShortlistTable
+    from src.task_table import TaskTable
+
+# Default upper budget for what-if tables: a full workday.
+WHAT_IF_MAX_MINUTES = 480
+
+# Default number of task lists a WhatIfTables cache remembers.
+WHAT_IF_CACHE_SIZE = 16
+
+# In streaming mode, how many of the best skipped tasks are kept so the
+# planning agent can still suggest nice-to-have tasks.
+STREAM_RUNNERS_UP = 5
+
+# Default end-to-end latency budget per request. If the planner has not
+# answered by then, the deterministic plan is returned instead.
+LATENCY_BUDGET_SECONDS = 45.0
+
+# Planner failures answered with the deterministic plan. Anything else (a
+# bug, a missing API key) propagates to the caller.
+PLANNER_ERRORS = (
+    CallDeadlineExceeded,
+    asyncio.TimeoutError,
+    ModelResponseError,
+    json.JSONDecodeError,
+    genai_errors.APIError,
+) + TRANSPORT_ERRORS
+
+# Defaults for run_task_advisor_batch.
+BATCH_MAX_CONCURRENCY = 8
+BATCH_TIMEOUT_SECONDS = 60.0
+
+
+def _load_tasks(tasks=None, raw_tasks_str=None, columnar=True):
+    """
+    Resolve the task input for the pipeline as a TaskTable (or, with
+    columnar=False, as given, so iterables stay lazy).
+
+    If no tasks are provided, use SAMPLE_TASKS. But if raw_tasks_str is
+    provided, normalize it locally when possible and otherwise with the
+    Parse Tasks Agent (see parse_tasks_agent.parse_tasks).
+    """
+    if tasks is None:
+        if raw_tasks_str is not None:
+            # Local fast path first, Parse Tasks Agent as the fallback
+            tasks, _ = parse_tasks(raw_tasks_str)
+        else:
+            # Fallback to built-in sample tasks
+            tasks = SAMPLE_TASKS
+
+    # Keep tasks columnar through scoring and shortlisting; plain dicts are
+    # only rebuilt by assemble_plan_data for the JSON prompt.
+    if columnar and not isinstance(tasks, TaskTable):
+        tasks = TaskTable.from_dicts(tasks)
+    return tasks
+
+
+def build_budget_table(
+    tasks=None,
+    raw_tasks_str=None,
+    max_minutes=WHAT_IF_MAX_MINUTES,
+    shortlist_mode="greedy",
+    policy=None,
+):
+    """
+    Parse and score a task set once, and precompute its shortlist for every
+    budget up to max_minutes. Pass the result to run_task_advisor(budget_table=...)
+    to answer follow-up budgets without re-planning. `policy` is passed to
+    score_tasks.
+    """
+    tasks = _load_tasks(tasks, raw_tasks_str)
+    log_debug("Precomputing shortlists for budgets 0..%s min...", max_minutes)
+    return BudgetShortlistTable(
+        score_tasks(tasks, policy=policy), max_minutes, mode=shortlist_mode
+    )
+
+
+async def build_budget_table_async(
+    tasks=None,
+    raw_tasks_str=None,
+    max_minutes=WHAT_IF_MAX_MINUTES,
+    shortlist_mode="greedy",
+    policy=None,
+):
+    """Async version of build_budget_table."""
+    if tasks is None and raw_tasks_str is not None:
+        tasks, _ = await parse_tasks_async(raw_tasks_str)
+    return await asyncio.to_thread(
+        build_budget_table,
+        tasks,
+        max_minutes=max_minutes,
+        shortlist_mode=shortlist_mode,
+        policy=policy,
+    )
+
+
+class WhatIfTables:
+    """
+    BudgetShortlistTables for recently seen task lists, keyed by the raw
+    task text, so "what about 45 minutes?" follow-ups skip parsing and
+    re-planning. Pass one to run_task_advisor(what_if_tables=...).
+
+    The first request for a task list only records it; the table is built
+    when a follow-up for the same list arrives, so one-off requests cost a
+    single shortlist pass. Lists whose table would exceed
+    KNAPSACK_MAX_CELLS are answered without one. The least recently used
+    list is evicted beyond max_entries.
+
+    Thread-safe: tables are built outside the lock and stored under it. Two
+    requests building the same table concurrently keep the wider one.
+    """
+
+    def __init__(self, max_entries=WHAT_IF_CACHE_SIZE, max_minutes=WHAT_IF_MAX_MINUTES):
+        self.max_entries = max_entries
+        self.max_minutes = max_minutes
+        # key -> BudgetShortlistTable, or None for a list seen once.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(raw_tasks_str, shortlist_mode, policy):
+        return (raw_tasks_str, shortlist_mode, repr(policy))
+
+    def _store(self, key, table):
+        self._entries[key] = table
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, raw_tasks_str, available_minutes, shortlist_mode="greedy", policy=None):
+        """Return the stored table if it covers available_minutes, else None."""
+        key = self._key(raw_tasks_str, shortlist_mode, policy)
+        with self._lock:
+            table = self._entries.get(key)
+            if table is None or available_minutes > table.max_minutes:
+                return None
+            self._entries.move_to_end(key)
+            return table
+
+    def observe(self, raw_tasks_str, tasks, available_minutes, shortlist_mode="greedy", policy=None):
+        """
+        Record a freshly parsed task list. Returns a table covering
+        available_minutes if the list was seen before, else None.
+        """
+        key = self._key(raw_tasks_str, shortlist_mode, policy)
+        with self._lock:
+            if key not in self._entries:
+                self._store(key, None)
+                return None
+
+        try:
+            table = build_budget_table(
+                tasks,
+                max_minutes=max(self.max_minutes, int(available_minutes)),
+                shortlist_mode=shortlist_mode,
+                policy=policy,
+            )
+        except ValueError as e:
+            log_warning("Not precomputing shortlists for this task list: %s", e)
+            return None
+
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current.max_minutes > table.max_minutes:
+                table = current
+            self._store(key, table)
+        return table
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
 
 
 def run_task_advisor(
     tasks=None,
     raw_tasks_str=None,
     available_minutes=60,
-    energy_level="medium"
+    energy_level="medium",
+    shortlist_mode="greedy",
+    budget_table=None,
+    what_if_tables=None,
+    policy=None,
+    stream=False,
+    presorted=False,
+    print_plan=True,
+    context_token_budget=PLAN_CONTEXT_TOKEN_BUDGET,
+    return_metrics=False,
+    metrics_sink=None,
+    log_level=None,
+    on_plan_entry=None,
+    latency_budget_seconds=LATENCY_BUDGET_SECONDS,
 ):
     """
     Root orchestrator for the Task Advisor (Python-level).
     This will later be replaced or wrapped by the ADK root agent.
 
     Parameters:
-        tasks: list of task dicts (optional)
+        tasks: list of task dicts or a TaskTable (optional); with stream=True
+            also a PriorityIndex or a score_tasks(lazy=True) iterator
         raw_tasks_str: string containing raw task input (reserved for Step 3)
         available_minutes: int
         energy_level: str
+        shortlist_mode: "greedy" or "optimal" (see main.choose_shortlist)
+        budget_table: optional BudgetShortlistTable from build_budget_table().
+            When given, tasks/raw_tasks_str/shortlist_mode are ignored and the
+            shortlist is looked up instead of recomputed.
+        what_if_tables: optional WhatIfTables. With raw_tasks_str (and not
+            stream), a follow-up request for a task list seen before is
+            answered from its precomputed table, built after parsing on the
+            first follow-up.
+        policy: optional ScoringPolicy (see scoring_engine.py) used instead of
+            the default priority formula.
+        stream: if True, pull tasks in descending score order and stop once
+            the budget is exhausted (same picks as the greedy mode; see
+            main.stream_shortlist). The planner then sees the shortlist plus
+            a few runners-up instead of the full backlog. A PriorityIndex or
+            RankedTasks is read lazily but already holds the whole backlog;
+            other inputs, including raw_tasks_str (parsed in full by
+            parse_tasks), are materialized and heapified first.
+        presorted: with stream=True, `tasks` is an iterable of task dicts
+            the caller already sorted by descending score (under `policy`).
+            It is scored one task at a time (main.iter_scored_tasks) and
+            never materialized, so memory is bounded by the shortlist and
+            runners-up rather than the backlog. Out-of-order input raises
+            ValueError.
+        print_plan: pretty-print the final plan (step E).
+        context_token_budget: estimated token budget for the plan data sent
+            to the planner. Beyond it, lower-relevance tasks are replaced by
+            a statistical summary (see plan_context.py). None sends every task.
+        return_metrics: if True, return (plan_json, RequestMetrics) instead of
+            plan_json alone.
+        metrics_sink: callable receiving the finished RequestMetrics; defaults
+            to the sink installed with advisor_metrics.set_metrics_sink().
+        log_level: log verbosity for this request only ("debug", "info",
+            logging.WARNING, ...); None keeps the "task_advisor" logger's level.
+            See advisor_logging.py.
+        on_plan_entry: optional callable(section, entry). If given, the
+            planner response is streamed and each shortlist/nice_to_have
+            entry is passed to it as soon as it is generated (see
+            plan_explainer_agent.stream_planning_agent). The returned plan
+            is the same.
+        latency_budget_seconds: time budget for the request, counted from
+            its start (None = unlimited). Parsing and scoring use it up but
+            are never cut short; only the planning step is. If the planning
+            agent cannot answer within what is left, or fails with one of
+            PLANNER_ERRORS, the deterministic shortlist is returned in the
+            same schema with local reasons and "degraded": True (see
+            fallback_plan.py). After the budget expires, on_plan_entry is
+            no longer called.
     """
+    started = time.monotonic()
+    with request_log_level(log_level), measure_request() as metrics:
+        if tasks is None and raw_tasks_str is not None and budget_table is None:
+            use_what_if = what_if_tables is not None and not stream
+            if use_what_if:
+                budget_table = what_if_tables.get(
+                    raw_tasks_str, available_minutes, shortlist_mode, policy
+                )
+            if budget_table is None:
+                # Local fast path first, Parse Tasks Agent as the fallback
+                with stage("parse"):
+                    tasks, metrics.parse_path = parse_tasks(raw_tasks_str)
+                if use_what_if:
+                    with stage("shortlist"):
+                        budget_table = what_if_tables.observe(
+                            raw_tasks_str, tasks, available_minutes, shortlist_mode, policy
+                        )
 
-    # Phase 1-Step 4: 
-    # If no tasks provided, use SAMPLE_TASKS. But if raw_tasks_str is provided, 
-    # use the Parse Tasks Agent to normalize it.
-    if tasks is None:
-        if raw_tasks_str is not None:
-            # Use the Parse Tasks Agent to normalize the raw input
-            tasks = call_parse_tasks_agent(raw_tasks_str)
-        else:
-            # Fallback to built-in sample tasks
-            tasks = SAMPLE_TASKS
+        plan_data = _build_plan_data(
+            tasks, available_minutes, energy_level, shortlist_mode, budget_table, policy, stream,
+            presorted, context_token_budget,
+        )
 
-    log_debug("Scoring tasks...")
-    # ---- Step A: Score tasks (deterministic) ----
-    scored = score_tasks(tasks)
+        log_debug("Calling planning agent...")
+        # ---- Step D: Call the planning agent ----
+        with stage("plan"):
+            # Set when the budget expires: the planner thread cannot be
+            # stopped, but it stops streaming entries to the caller.
+            cancelled = threading.Event()
+            if on_plan_entry is None:
+                request_plan = lambda: call_planning_agent(plan_data)
+            else:
+                request_plan = lambda: _consume_plan_events(
+                    stream_planning_agent(plan_data), on_plan_entry, cancelled
+                )
+            remaining = _remaining_budget(started, latency_budget_seconds)
+            if remaining is not None and remaining <= 0:
+                plan_json = _degraded_plan(plan_data, None, latency_budget_seconds)
+            else:
+                try:
+                    plan_json = call_with_deadline(request_plan, remaining, "planning", cancelled)
+                except PLANNER_ERRORS as e:
+                    plan_json = _degraded_plan(
+                        plan_data, e, latency_budget_seconds, budget_expired=cancelled.is_set()
+                    )
 
-    log_debug("Choosing shortlist...")
-    # ---- Step B: Choose shortlist (deterministic, for now) ----
-    shortlist = choose_shortlist(scored, available_minutes=available_minutes)
+        # ---- Step E: Pretty-print output ----
+        log_debug("Final plan generated:")
+        with stage("render"):
+            if print_plan:
+                print_final_plan(plan_json)
 
-    log_debug("Assembling plan data...")
-    # ---- Step C: Build plan_data ----
-    plan_data = assemble_plan_data(
-        all_tasks=scored,
-        available_minutes=available_minutes,
-        energy_level=energy_level,
-        suggested_shortlist=shortlist,
+    emit_metrics(metrics, metrics_sink)
+    return (plan_json, metrics) if return_metrics else plan_json
+
+
+async def run_task_advisor_async(
+    tasks=None,
+    raw_tasks_str=None,
+    available_minutes=60,
+    energy_level="medium",
+    shortlist_mode="greedy",
+    budget_table=None,
+    what_if_tables=None,
+    policy=None,
+    stream=False,
+    presorted=False,
+    print_plan=True,
+    context_token_budget=PLAN_CONTEXT_TOKEN_BUDGET,
+    return_metrics=False,
+    metrics_sink=None,
+    log_level=None,
+    on_plan_entry=None,
+    latency_budget_seconds=LATENCY_BUDGET_SECONDS,
+):
+    """
+    Async version of run_task_advisor with the same parameters.
+
+    Model calls use the genai aio client, and the deterministic steps run in
+    a worker thread, so one event loop can serve many concurrent requests.
+    """
+    started = time.monotonic()
+    with request_log_level(log_level), measure_request() as metrics:
+        if tasks is None and raw_tasks_str is not None and budget_table is None:
+            use_what_if = what_if_tables is not None and not stream
+            if use_what_if:
+                budget_table = what_if_tables.get(
+                    raw_tasks_str, available_minutes, shortlist_mode, policy
+                )
+            if budget_table is None:
+                with stage("parse"):
+                    tasks, metrics.parse_path = await parse_tasks_async(raw_tasks_str)
+                if use_what_if:
+                    with stage("shortlist"):
+                        budget_table = await asyncio.to_thread(
+                            what_if_tables.observe,
+                            raw_tasks_str, tasks, available_minutes, shortlist_mode, policy,
+                        )
+
+        # to_thread copies the context, so the worker reports into `metrics` too.
+        plan_data = await asyncio.to_thread(
+            _build_plan_data,
+            tasks, available_minutes, energy_level, shortlist_mode, budget_table, policy, stream,
+            presorted, context_token_budget,
+        )
+
+        log_debug("Calling planning agent...")
+        with stage("plan"):
+            if on_plan_entry is None:
+                request_plan = call_planning_agent_async(plan_data)
+            else:
+                request_plan = _consume_plan_events_async(
+                    stream_planning_agent_async(plan_data), on_plan_entry
+                )
+            remaining = _remaining_budget(started, latency_budget_seconds)
+            if remaining is not None and remaining <= 0:
+                request_plan.close()
+                plan_json = _degraded_plan(plan_data, None, latency_budget_seconds)
+            else:
+                # asyncio.wait rather than wait_for: a TimeoutError raised by
+                # the planner itself must not be mistaken for the budget.
+                planner = asyncio.ensure_future(request_plan)
+                try:
+                    done, _ = await asyncio.wait({planner}, timeout=remaining)
+                finally:
+                    if not planner.done():
+                        planner.cancel()
+                if not done:
+                    # The planner is cancelled, so nothing runs on.
+                    await asyncio.gather(planner, return_exceptions=True)
+                    plan_json = _degraded_plan(
+                        plan_data,
+                        asyncio.TimeoutError(f"no plan within {remaining:.2f}s"),
+                        latency_budget_seconds,
+                        budget_expired=True,
+                    )
+                else:
+                    try:
+                        plan_json = planner.result()
+                    except PLANNER_ERRORS as e:
+                        plan_json = _degraded_plan(plan_data, e, latency_budget_seconds)
+
+        log_debug("Final plan generated:")
+        with stage("render"):
+            if print_plan:
+                print_final_plan(plan_json)
+
+    emit_metrics(metrics, metrics_sink)
+    return (plan_json, metrics) if return_metrics else plan_json
+
+
+async def run_task_advisor_batch_async(
+    requests,
+    max_concurrency=BATCH_MAX_CONCURRENCY,
+    timeout_seconds=BATCH_TIMEOUT_SECONDS,
+):
+    """
+    Run many advisor requests concurrently (e.g. a whole team each morning).
+
+    Parameters:
+        requests: iterable of dicts with run_task_advisor keyword arguments,
+            typically tasks or raw_tasks_str, available_minutes, energy_level.
+        max_concurrency: how many requests may be in flight at once.
+        timeout_seconds: per-request deadline (None = no deadline). A request
+            that exceeds it fails on its own; the rest of the batch continues.
+
+    Returns:
+        A list in the same order as `requests`, one dict per request:
+            {"index": i, "plan": plan_json or None, "error": None or str,
+             "metrics": RequestMetrics.to_dict() output, or None on error}
+    """
+    requests = list(requests)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run_one(index, request):
+        async with semaphore:
+            try:
+                plan, metrics = await asyncio.wait_for(
+                    run_task_advisor_async(
+                        **{"print_plan": False, **request, "return_metrics": True}
+                    ),
+                    timeout=timeout_seconds,
+                )
+                return {"index": index, "plan": plan, "error": None, "metrics": metrics.to_dict()}
+            except asyncio.TimeoutError:
+                log_warning("Batch request %d timed out after %ss.", index, timeout_seconds)
+                error = f"timed out after {timeout_seconds}s"
+            except Exception as e:
+                log_warning("Batch request %d failed: %r", index, e)
+                error = f"{type(e).__name__}: {e}"
+            return {"index": index, "plan": None, "error": error, "metrics": None}
+
+    log_debug(
+        "Running batch of %d requests (max_concurrency=%d)...", len(requests), max_concurrency
     )
+    return list(await asyncio.gather(*(run_one(i, r) for i, r in enumerate(requests))))
 
-    log_debug("Calling planning agent...")
-    # ---- Step D: Call the planning agent ----
-    plan_json = call_planning_agent(plan_data)
 
-    # ---- Step E: Pretty-print output ----
-    log_debug("Final plan generated:")
-    print_final_plan(plan_json)
+def run_task_advisor_batch(
+    requests,
+    max_concurrency=BATCH_MAX_CONCURRENCY,
+    timeout_seconds=BATCH_TIMEOUT_SECONDS,
+):
+    """
+    Blocking wrapper around run_task_advisor_batch_async (same arguments and
+    results). Use the async version from code that already runs an event loop.
+    """
+    return asyncio.run(
+        run_task_advisor_batch_async(
+            requests, max_concurrency=max_concurrency, timeout_seconds=timeout_seconds
+        )
+    )
+
 
+def _consume_plan_events(events, on_plan_entry, cancelled=None):
+    """
+    Pass streamed plan entries to on_plan_entry and return the final plan.
+
+    Stops reading (and returns None) once the optional threading.Event
+    `cancelled` is set, so an abandoned stream makes no more callbacks.
+    """
+    plan_json = None
+    for section, value in events:
+        if cancelled is not None and cancelled.is_set():
+            events.close()
+            return None
+        if section == "plan":
+            plan_json = value
+        else:
+            on_plan_entry(section, value)
+    return plan_json
+
+
+async def _consume_plan_events_async(events, on_plan_entry):
+    """Async version of _consume_plan_events."""
+    plan_json = None
+    async for section, value in events:
+        if section == "plan":
+            plan_json = value
+        else:
+            on_plan_entry(section, value)
     return plan_json
 
 
+def _remaining_budget(started, latency_budget_seconds):
+    """Seconds left of the request's latency budget (None = unlimited)."""
+    if latency_budget_seconds is None:
+        return None
+    return latency_budget_seconds - (time.monotonic() - started)
+
+
+def _degraded_plan(plan_data, error, latency_budget_seconds, budget_expired=False):
+    """
+    Deterministic plan used when the planner missed the budget or failed.
+
+    error is None when the budget was used up before planning started;
+    budget_expired marks an error raised because the request budget ran out
+    (as opposed to the planner's own call deadline or a failure).
+    """
+    if error is None or budget_expired:
+        reason = f"planner did not answer within the {latency_budget_seconds}s latency budget"
+    else:
+        reason = f"planner unavailable ({type(error).__name__})"
+    log_warning("Returning the deterministic plan: %s (%r).", reason, error)
+    record_event("planning.fallback")
+    return build_fallback_plan(plan_data, reason)
+
+
+def _ranked_source(tasks, policy, presorted=False):
+    """
+    Score-ordered source for stream mode. Presorted input is scored as it
+    is read; a PriorityIndex (its own policy applies) or a RankedTasks
+    iterator is read lazily; anything else is materialized and heapified by
+    score_tasks(lazy=True).
+    """
+    if presorted:
+        return iter_scored_tasks(tasks, policy=policy)
+    if isinstance(tasks, PriorityIndex):
+        return tasks.ranked()
+    if isinstance(tasks, RankedTasks):
+        return tasks
+    return score_tasks(tasks, lazy=True, policy=policy)
+
+
+def _build_plan_data(
+    tasks, available_minutes, energy_level, shortlist_mode, budget_table, policy, stream,
+    presorted, context_token_budget,
+):
+    """Deterministic steps A-C of run_task_advisor (tasks already parsed)."""
+    if stream and shortlist_mode != "greedy":
+        raise ValueError("stream=True only supports shortlist_mode='greedy'.")
+
+    if budget_table is not None:
+        # What-if query: scoring and shortlisting were precomputed.
+        log_debug("Looking up precomputed shortlist for %s min...", available_minutes)
+        with stage("shortlist"):
+            scored = budget_table.scored
+            shortlist = budget_table.shortlist(available_minutes)
+    elif stream:
+        tasks = _load_tasks(tasks, columnar=False)
+
+        log_debug("Streaming tasks through scoring and shortlist...")
+        # ---- Steps A+B: Pull tasks in score order until the budget is used ----
+        # Scoring is interleaved with selection, so both count as "shortlist".
+        with stage("shortlist"):
+            shortlist, runners_up = stream_shortlist(
+                _ranked_source(tasks, policy, presorted),
+                available_minutes=available_minutes,
+                runners_up=STREAM_RUNNERS_UP,
+            )
+            scored = sorted(shortlist + runners_up, key=lambda t: t["score"], reverse=True)
+    else:
+        log_debug("Scoring tasks...")
+        # ---- Step A: Score tasks (deterministic) ----
+        with stage("score"):
+            tasks = _load_tasks(tasks)
+            scored = score_tasks(tasks, policy=policy)
+
+        log_debug("Choosing shortlist...")
+        # ---- Step B: Choose shortlist (deterministic, for now) ----
+        with stage("shortlist"):
+            shortlist = choose_shortlist(
+                scored, available_minutes=available_minutes, mode=shortlist_mode
+            )
+
+    log_debug("Assembling plan data...")
+    # ---- Step C: Build plan_data ----
+    with stage("assemble"):
+        omitted_summary = None
+        if context_token_budget is not None:
+            scored, shortlist, omitted_summary = select_plan_context(
+                scored, shortlist, available_minutes, token_budget=context_token_budget
+            )
+
+        plan_data = assemble_plan_data(
+            all_tasks=scored,
+            available_minutes=available_minutes,
+            energy_level=energy_level,
+            suggested_shortlist=shortlist,
+        )
+        if omitted_summary is not None:
+            plan_data["omitted_tasks_summary"] = omitted_summary
+    return plan_data
+
+
 def main():
+    configure_logging()
     load_dotenv()
     api_key = os.getenv("GOOGLE_API_KEY")
-    log_debug(f"API Key Loaded: {bool(api_key)}")
+    log_debug("API Key Loaded: %s", bool(api_key))
 
     # Demo: use raw JSON string and let the ParseTasksAgent normalize it
     raw_tasks_str = """
@@ -100,12 +695,19 @@ def main():
     ]
     """
 
-    run_task_advisor(
+    # Stream the plan: each task is printed as soon as the planner emits it.
+    print("\n=== Task Plan (streaming) ===")
+    plan_json = run_task_advisor(
         tasks=None,
         raw_tasks_str=raw_tasks_str,
         available_minutes=60,
         energy_level="medium",
+        print_plan=False,
+        on_plan_entry=print_plan_entry,
     )
+    if plan_json.get("summary"):
+        print("\nSummary:")
+        print(plan_json["summary"])
 
 
 if __name__ == "__main__":
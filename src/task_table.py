@@ -0,0 +1,191 @@
+"""
+Task Table
+
+A compact, columnar (struct-of-arrays) container for tasks.
+
+The pipeline in main.py originally passed a list of dicts between every
+stage, which costs a full dict per task. A TaskTable stores the same data
+as one NumPy array per numeric field plus a single list of interned titles:
+
+    title        list[str]      (sys.intern'd, so repeated titles share memory)
+    importance   int8/float64
+    urgency      int8/float64
+    desire       int8/float64
+    est_minutes  int32/float64
+    score        float64 or None (filled in by score_tasks)
+
+Integer columns fall back to float64 when a value is fractional, so a round
+trip through from_dicts()/to_dicts() preserves the original values. Any
+extra keys on the input dicts (e.g. "drag") are kept aside per row and only
+for the rows that have them.
+
+Dicts are only built on demand (to_dicts(), indexing, iteration), which is
+what assemble_plan_data does right before the data is turned into JSON.
+"""
+
+import sys
+
+import numpy as np
+
+TASK_FIELDS = ("title", "importance", "urgency", "desire", "est_minutes")
+
+_RATING_FIELDS = ("importance", "urgency", "desire")
+
+
+def _pack(values, int_dtype):
+    """Store a numeric column as `int_dtype` if possible, else float64."""
+    if all(isinstance(v, (int, np.integer)) and not isinstance(v, bool) for v in values):
+        info = np.iinfo(int_dtype)
+        if not values or (info.min <= min(values) and max(values) <= info.max):
+            return np.array(values, dtype=int_dtype)
+        return np.array(values, dtype=np.int64)
+    return np.array(values, dtype=np.float64)
+
+
+class TaskTable:
+    """Columnar task list. See the module docstring for the layout."""
+
+    __slots__ = ("title", "importance", "urgency", "desire", "est_minutes", "score", "extras")
+
+    def __init__(
+        self,
+        title,
+        importance,
+        urgency,
+        desire,
+        est_minutes,
+        score=None,
+        extras=None,
+    ):
+        self.title = [sys.intern(str(t)) for t in title]
+        self.importance = np.asarray(importance)
+        self.urgency = np.asarray(urgency)
+        self.desire = np.asarray(desire)
+        self.est_minutes = np.asarray(est_minutes)
+        self.score = None if score is None else np.asarray(score, dtype=np.float64)
+        # Sparse per-row extra fields: None when no row has any.
+        self.extras = extras
+
+    @classmethod
+    def _from_columns(cls, title, importance, urgency, desire, est_minutes, score, extras):
+        """Wrap already-packed columns without copying or re-interning."""
+        table = cls.__new__(cls)
+        table.title = title
+        table.importance = importance
+        table.urgency = urgency
+        table.desire = desire
+        table.est_minutes = est_minutes
+        table.score = score
+        table.extras = extras
+        return table
+
+    # ---- Construction / conversion ----
+
+    @classmethod
+    def from_dicts(cls, tasks):
+        """Build a table from task dicts in the internal schema."""
+        tasks = list(tasks)
+        columns = {name: [t[name] for t in tasks] for name in TASK_FIELDS}
+
+        has_score = bool(tasks) and all("score" in t for t in tasks)
+        known = set(TASK_FIELDS) | ({"score"} if has_score else set())
+
+        extras = [
+            {k: v for k, v in t.items() if k not in known} or None
+            for t in tasks
+        ]
+        if not any(extras):
+            extras = None
+
+        return cls(
+            title=columns["title"],
+            importance=_pack(columns["importance"], np.int8),
+            urgency=_pack(columns["urgency"], np.int8),
+            desire=_pack(columns["desire"], np.int8),
+            est_minutes=_pack(columns["est_minutes"], np.int32),
+            score=[t["score"] for t in tasks] if has_score else None,
+            extras=extras,
+        )
+
+    def to_dicts(self):
+        """Materialize the table as a list of plain dicts (JSON-ready)."""
+        importance = self.importance.tolist()
+        urgency = self.urgency.tolist()
+        desire = self.desire.tolist()
+        est_minutes = self.est_minutes.tolist()
+        score = None if self.score is None else self.score.tolist()
+
+        rows = []
+        for i, title in enumerate(self.title):
+            row = {
+                "title": title,
+                "importance": importance[i],
+                "urgency": urgency[i],
+                "desire": desire[i],
+                "est_minutes": est_minutes[i],
+            }
+            if self.extras is not None and self.extras[i]:
+                row.update(self.extras[i])
+            if score is not None:
+                row["score"] = score[i]
+            rows.append(row)
+        return rows
+
+    def row(self, i):
+        """Return row `i` as a dict."""
+        row = {
+            "title": self.title[i],
+            "importance": self.importance[i].item(),
+            "urgency": self.urgency[i].item(),
+            "desire": self.desire[i].item(),
+            "est_minutes": self.est_minutes[i].item(),
+        }
+        if self.extras is not None and self.extras[i]:
+            row.update(self.extras[i])
+        if self.score is not None:
+            row["score"] = self.score[i].item()
+        return row
+
+    # ---- Column operations ----
+
+    def take(self, indices):
+        """Return a new table with the rows at `indices`, in that order."""
+        indices = np.asarray(indices, dtype=np.intp)
+        index_list = indices.tolist()
+        return TaskTable._from_columns(
+            title=[self.title[i] for i in index_list],
+            importance=self.importance[indices],
+            urgency=self.urgency[indices],
+            desire=self.desire[indices],
+            est_minutes=self.est_minutes[indices],
+            score=None if self.score is None else self.score[indices],
+            extras=None if self.extras is None else [self.extras[i] for i in index_list],
+        )
+
+    def with_score(self, score):
+        """Return a table sharing these columns with `score` attached."""
+        return TaskTable._from_columns(
+            title=self.title,
+            importance=self.importance,
+            urgency=self.urgency,
+            desire=self.desire,
+            est_minutes=self.est_minutes,
+            score=np.asarray(score, dtype=np.float64),
+            extras=self.extras,
+        )
+
+    # ---- Sequence protocol (row dicts, for existing callers) ----
+
+    def __len__(self):
+        return len(self.title)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __repr__(self):
+        scored = "scored" if self.score is not None else "unscored"
+        return f"TaskTable({len(self)} tasks, {scored})"
@@ -0,0 +1,77 @@
+"""Shared fixtures for the test suite."""
+
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from src.llm_cache import reset_caches
+
+DEFAULT_EST_CHOICES = (5, 10, 15, 20, 30, 45, 60, 90)
+
+
+@pytest.fixture
+def make_tasks():
+    """
+    Factory for reproducible random task lists:
+    make_tasks(n, seed=0, est_choices=..., ratings=(1, 2, 3), prefix="task").
+    """
+
+    def make(n, seed=0, est_choices=DEFAULT_EST_CHOICES, ratings=(1, 2, 3), prefix="task"):
+        rng = random.Random(seed)
+        return [
+            {
+                "title": f"{prefix} {i}",
+                "importance": rng.choice(ratings),
+                "urgency": rng.choice(ratings),
+                "desire": rng.choice(ratings),
+                "est_minutes": rng.choice(est_choices),
+            }
+            for i in range(n)
+        ]
+
+    return make
+
+
+@pytest.fixture
+def fresh_caches(monkeypatch):
+    """Memory-only shared response caches, emptied before and after the test."""
+    for name in ("DIR", "MAX_BYTES", "TTL", "ENTRIES"):
+        monkeypatch.delenv(f"TASK_ADVISOR_CACHE_{name}", raising=False)
+    reset_caches()
+    yield
+    reset_caches()
+
+
+class FakeModels:
+    """Stands in for client.models: answers every request with respond(contents)."""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        self.calls.append(contents)
+        return SimpleNamespace(text=self.respond(contents), usage_metadata=None)
+
+
+class FakeAsyncModels(FakeModels):
+    """Stands in for client.aio.models."""
+
+    async def generate_content(self, model, contents, config=None):
+        return FakeModels.generate_content(self, model, contents, config)
+
+
+@pytest.fixture
+def fake_client():
+    """
+    Factory for offline genai clients: fake_client(respond) returns a client
+    whose models (and aio.models) call respond(contents) for the response
+    text and record each request in .calls.
+    """
+    def make(respond):
+        client = SimpleNamespace(models=FakeModels(respond))
+        client.aio = SimpleNamespace(models=FakeAsyncModels(respond))
+        return client
+
+    return make
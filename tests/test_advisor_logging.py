@@ -0,0 +1,91 @@
+"""Tests for advisor_logging's leveled, lazily formatted logging."""
+
+import asyncio
+import io
+import logging
+
+import pytest
+
+from src import advisor_logging
+from src.advisor_logging import (
+    configure_logging,
+    debug_enabled,
+    lazy_json,
+    log_debug,
+    log_warning,
+    request_log_level,
+)
+
+
+class _Counted:
+    """Log argument that counts how often it is formatted."""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "counted"
+
+
+@pytest.fixture(autouse=True)
+def _restore_logger(monkeypatch):
+    logger = advisor_logging.logger
+    level, handlers = logger.level, list(logger.handlers)
+    monkeypatch.setattr(advisor_logging, "_console_handler", None)
+    logger.setLevel(logging.NOTSET)
+    yield
+    logger.setLevel(level)
+    logger.handlers[:] = handlers
+
+
+def test_disabled_calls_are_silent_and_never_format(capsys):
+    arg = _Counted()
+    log_debug("value %s", arg)
+    log_debug("payload %s", lazy_json({"x": arg}))
+    assert not debug_enabled()
+    assert arg.formatted == 0
+    assert capsys.readouterr() == ("", "")
+
+
+def test_request_level_applies_to_that_request_only(caplog):
+    with request_log_level("debug"):
+        assert debug_enabled()
+        log_debug("value %s", "counted")
+    log_debug("not emitted")
+
+    assert [r.getMessage() for r in caplog.records] == ["value counted"]
+
+
+def test_concurrent_requests_keep_their_own_level(caplog):
+    async def request(level, name):
+        with request_log_level(level):
+            await asyncio.sleep(0)
+            log_debug("request %s", name)
+
+    async def both():
+        await asyncio.gather(request("debug", "verbose"), request("warning", "quiet"))
+
+    asyncio.run(both())
+    assert [r.getMessage() for r in caplog.records] == ["request verbose"]
+
+
+def test_quieter_request_level_suppresses_warnings(caplog):
+    with request_log_level(logging.ERROR):
+        log_warning("hidden")
+    log_warning("shown")
+    assert [r.getMessage() for r in caplog.records] == ["shown"]
+
+
+def test_unknown_level_name_is_rejected():
+    with pytest.raises(ValueError):
+        with request_log_level("chatty"):
+            pass
+
+
+def test_configure_logging_writes_formatted_records():
+    stream = io.StringIO()
+    configure_logging("info", stream=stream)
+    log_debug("hidden")
+    log_warning("plan for %s min", 45)
+    assert stream.getvalue() == "==== plan for 45 min\n"
@@ -0,0 +1,107 @@
+"""Tests for advisor_metrics and the metrics run_task_advisor reports."""
+
+import asyncio
+import contextvars
+import json
+from types import SimpleNamespace
+
+from src import task_advisor
+from src.advisor_metrics import (
+    STAGES,
+    RequestMetrics,
+    current_metrics,
+    measure_request,
+    record_event,
+    record_model_call,
+    stage,
+)
+
+USAGE = SimpleNamespace(
+    prompt_token_count=120,
+    candidates_token_count=30,
+    cached_content_token_count=None,
+    total_token_count=150,
+)
+
+
+def test_reports_go_to_the_current_request_only():
+    record_model_call("planning", SimpleNamespace(usage_metadata=USAGE))
+    with stage("plan"):
+        pass
+    assert current_metrics() is None
+
+    with measure_request() as metrics:
+        with stage("plan"):
+            pass
+        with stage("plan"):
+            pass
+        record_model_call("planning", SimpleNamespace(usage_metadata=USAGE))
+        record_model_call("parse_tasks", cache_hit=True)
+        record_event("planning.retry", 2)
+
+    assert set(metrics.stages) == {"plan"} and metrics.finished
+    assert metrics.cache_hits == 1
+    assert metrics.token_totals() == {
+        "prompt_tokens": 120, "response_tokens": 30, "cached_tokens": 0, "total_tokens": 150,
+    }
+    assert metrics.events == {"planning.retry": 2}
+
+
+def test_finished_metrics_ignore_late_reports():
+    with measure_request() as metrics:
+        # e.g. the context a planner thread abandoned at the latency budget runs in
+        abandoned = contextvars.copy_context()
+    snapshot = metrics.to_dict()
+
+    abandoned.run(record_model_call, "planning", SimpleNamespace(usage_metadata=USAGE))
+    abandoned.run(record_event, "planning.retry")
+    assert metrics.to_dict() == snapshot
+
+
+def test_concurrent_requests_keep_separate_metrics():
+    async def request(name, calls):
+        with measure_request() as metrics:
+            for _ in range(calls):
+                await asyncio.sleep(0)
+                record_model_call(name)
+            return metrics
+
+    async def both():
+        return await asyncio.gather(request("a", 3), request("b", 5))
+
+    first, second = asyncio.run(both())
+    assert [c["agent"] for c in first.model_calls] == ["a"] * 3
+    assert [c["agent"] for c in second.model_calls] == ["b"] * 5
+
+
+def test_run_task_advisor_reports_stages_tokens_and_parse_path(make_tasks, monkeypatch):
+    def plan(plan_data):
+        record_model_call("planning", SimpleNamespace(usage_metadata=USAGE))
+        return {"shortlist": [], "nice_to_have": [], "summary": ""}
+
+    monkeypatch.setattr(task_advisor, "call_planning_agent", plan)
+    sunk = []
+
+    plan_json, metrics = task_advisor.run_task_advisor(
+        raw_tasks_str=json.dumps(make_tasks(10)),
+        print_plan=False,
+        return_metrics=True,
+        metrics_sink=sunk.append,
+    )
+
+    assert sunk == [metrics]
+    assert set(metrics.stages) == set(STAGES)
+    assert metrics.parse_path == "local"
+    assert metrics.token_totals()["total_tokens"] == 150
+    assert metrics.total_seconds >= sum(metrics.stages.values())
+
+
+def test_sink_errors_do_not_fail_the_request(make_tasks, monkeypatch):
+    monkeypatch.setattr(task_advisor, "call_planning_agent", lambda plan_data: {"summary": ""})
+
+    def broken_sink(metrics):
+        raise RuntimeError("sink down")
+
+    assert task_advisor.run_task_advisor(
+        tasks=make_tasks(5), print_plan=False, metrics_sink=broken_sink
+    ) == {"summary": ""}
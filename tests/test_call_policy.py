@@ -0,0 +1,220 @@
+"""Tests for call_policy: retry, deadlines, hedging and call_with_deadline."""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from google.genai import errors as genai_errors
+
+from src import call_policy
+from src.call_policy import (
+    CallDeadlineExceeded,
+    CallPolicy,
+    call_policy_stats,
+    call_with_deadline,
+    call_with_policy,
+    call_with_policy_async,
+    is_retryable,
+)
+from src.response_schemas import ModelResponseError
+
+FAST = dict(backoff_base=0.001, backoff_max=0.001)
+
+
+@pytest.fixture(autouse=True)
+def _reset_stats():
+    call_policy.reset_call_policy_stats()
+    yield
+    call_policy.reset_call_policy_stats()
+
+
+class Flaky:
+    """Fails with `error` for the first `failures` calls, then returns "ok"."""
+
+    def __init__(self, failures, error):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if call <= self.failures:
+            raise self.error
+        return "ok"
+
+
+def _api_error(code):
+    return genai_errors.APIError(code, {"error": {"message": "boom", "status": "X"}})
+
+
+def test_retryable_errors():
+    assert is_retryable(_api_error(503))
+    assert is_retryable(_api_error(429))
+    assert not is_retryable(_api_error(400))
+    assert is_retryable(httpx.ConnectError("reset"))
+    assert is_retryable(httpx.ReadTimeout("slow"))
+    assert is_retryable(ModelResponseError("bad json"))
+    assert is_retryable(CallDeadlineExceeded("slow"))
+    assert not is_retryable(ValueError("bug"))
+
+
+def test_transient_failures_are_retried():
+    fn = Flaky(2, _api_error(503))
+    assert call_with_policy(fn, CallPolicy(**FAST), "t") == "ok"
+    assert fn.calls == 3
+    assert call_policy_stats()["t"]["retries"] == 2
+
+
+def test_gives_up_after_max_attempts():
+    fn = Flaky(5, httpx.ConnectError("reset"))
+    with pytest.raises(httpx.ConnectError):
+        call_with_policy(fn, CallPolicy(max_attempts=3, **FAST), "t")
+    assert fn.calls == 3
+    assert call_policy_stats()["t"]["failures"] == 1
+
+
+def test_non_retryable_error_is_raised_at_once():
+    fn = Flaky(1, _api_error(400))
+    with pytest.raises(genai_errors.APIError):
+        call_with_policy(fn, CallPolicy(**FAST), "t")
+    assert fn.calls == 1
+
+
+def test_attempt_deadline_is_retried_and_recorded():
+    def slow():
+        time.sleep(0.3)
+        return "late"
+
+    policy = CallPolicy(timeout_seconds=0.05, max_attempts=2, **FAST)
+    with pytest.raises(CallDeadlineExceeded):
+        call_with_policy(slow, policy, "t")
+    stats = call_policy_stats()["t"]
+    assert stats["timeouts"] == 2
+    assert stats["retries"] == 1
+    # Timed-out attempts feed the hedge percentile too.
+    assert len(call_policy._latencies["t"]) == 2
+    assert min(call_policy._latencies["t"]) >= 0.05
+
+
+def test_overall_deadline_stops_retries():
+    def slow():
+        time.sleep(0.5)
+
+    policy = CallPolicy(
+        timeout_seconds=0.1, total_timeout_seconds=0.25, max_attempts=10, **FAST
+    )
+    start = time.monotonic()
+    with pytest.raises(CallDeadlineExceeded):
+        call_with_policy(slow, policy, "t")
+    assert time.monotonic() - start < 0.45
+    assert call_policy_stats()["t"]["timeouts"] <= 3
+
+
+def test_no_backoff_sleep_past_the_overall_deadline():
+    fn = Flaky(1, _api_error(503))
+    policy = CallPolicy(total_timeout_seconds=0.2, backoff_base=10.0, backoff_max=10.0)
+    policy.backoff = lambda retry_number: 5.0
+    start = time.monotonic()
+    with pytest.raises(genai_errors.APIError):
+        call_with_policy(fn, policy, "t")
+    assert time.monotonic() - start < 0.2
+    assert fn.calls == 1
+
+
+def test_hedge_beats_a_slow_primary():
+    calls = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            calls.append(None)
+            first = len(calls) == 1
+        if first:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    policy = CallPolicy(hedge_delay_seconds=0.05, **FAST)
+    start = time.monotonic()
+    assert call_with_policy(fn, policy, "t") == "hedge"
+    assert time.monotonic() - start < 0.4
+    stats = call_policy_stats()["t"]
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_hedge_delay_uses_latency_percentile():
+    policy = CallPolicy(hedge_percentile=0.9, hedge_delay_seconds=1.0)
+    assert policy.hedge_delay("t") == 1.0
+    for i in range(call_policy.HEDGE_MIN_SAMPLES):
+        call_policy._observe_latency("t", i / 100)
+    assert policy.hedge_delay("t") == pytest.approx(0.18)
+
+
+def test_saturated_pool_skips_hedges_and_fails_at_the_deadline():
+    release = threading.Event()
+    blockers = [
+        call_policy._submit_model_call(release.wait, None, block=True)
+        for _ in range(call_policy.MODEL_CALL_WORKERS)
+    ]
+    try:
+        with pytest.raises(CallDeadlineExceeded):
+            call_with_policy(lambda: "ok", CallPolicy(timeout_seconds=0.05, max_attempts=1), "t")
+    finally:
+        release.set()
+        for future in blockers:
+            future.result()
+
+    assert call_with_policy(lambda: "ok", CallPolicy(max_attempts=1), "t") == "ok"
+
+
+def test_async_retry_and_hedge():
+    attempts = []
+
+    async def flaky():
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise ModelResponseError("bad json")
+        if len(attempts) == 2:
+            await asyncio.sleep(0.5)
+            return "slow"
+        return "fast"
+
+    policy = CallPolicy(hedge_delay_seconds=0.05, **FAST)
+    assert asyncio.run(call_with_policy_async(flaky, policy, "t")) == "fast"
+    stats = call_policy_stats()["t"]
+    assert stats["retries"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_async_overall_deadline():
+    async def slow():
+        await asyncio.sleep(0.5)
+
+    policy = CallPolicy(
+        timeout_seconds=0.1, total_timeout_seconds=0.25, max_attempts=10, **FAST
+    )
+    start = time.monotonic()
+    with pytest.raises(CallDeadlineExceeded):
+        asyncio.run(call_with_policy_async(slow, policy, "t"))
+    assert time.monotonic() - start < 0.45
+
+
+def test_call_with_deadline_sets_cancelled_only_on_its_own_timeout():
+    cancelled = threading.Event()
+    with pytest.raises(CallDeadlineExceeded):
+        call_with_deadline(lambda: time.sleep(0.3), 0.05, "t", cancelled)
+    assert cancelled.is_set()
+
+    def inner_timeout():
+        raise CallDeadlineExceeded("planner's own deadline")
+
+    cancelled = threading.Event()
+    with pytest.raises(CallDeadlineExceeded, match="planner's own deadline"):
+        call_with_deadline(inner_timeout, 5.0, "t", cancelled)
+    assert not cancelled.is_set()
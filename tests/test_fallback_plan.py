@@ -0,0 +1,54 @@
+"""Tests for the deterministic fallback plan."""
+
+from src.fallback_plan import FALLBACK_NICE_TO_HAVE, build_fallback_plan
+from src.main import assemble_plan_data, choose_shortlist, score_tasks
+
+
+def _plan_data(available_minutes):
+    scored = score_tasks(
+        [
+            {"title": "Email accountant", "importance": 3, "urgency": 3, "desire": 1, "est_minutes": 20},
+            {"title": "Write tests", "importance": 2, "urgency": 2, "desire": 2, "est_minutes": 30},
+            {"title": "Tidy desk", "importance": 1, "urgency": 1, "desire": 2, "est_minutes": 10},
+            {"title": "Plan trip", "importance": 1, "urgency": 1, "desire": 3, "est_minutes": 60},
+        ]
+    )
+    return assemble_plan_data(
+        all_tasks=scored,
+        available_minutes=available_minutes,
+        energy_level="medium",
+        suggested_shortlist=choose_shortlist(scored, available_minutes),
+    )
+
+
+def test_shortlist_is_the_suggested_shortlist():
+    plan_data = _plan_data(30)
+    plan = build_fallback_plan(plan_data, "planner unavailable (APIError)")
+
+    assert plan["degraded"] is True
+    assert plan["degraded_reason"] == "planner unavailable (APIError)"
+    assert [e["title"] for e in plan["shortlist"]] == [
+        t["title"] for t in plan_data["suggested_shortlist"]
+    ]
+    for entry in plan["shortlist"] + plan["nice_to_have"]:
+        assert set(entry) == {"title", "reason", "est_minutes", "score"}
+        assert entry["reason"]
+    assert "planner unavailable" in plan["summary"]
+
+
+def test_nice_to_have_are_best_remaining_tasks():
+    plan_data = _plan_data(30)
+    plan = build_fallback_plan(plan_data, "timeout")
+    shortlisted = {e["title"] for e in plan["shortlist"]}
+    remaining = [t for t in plan_data["all_tasks"] if t["title"] not in shortlisted]
+
+    assert len(plan["nice_to_have"]) == min(FALLBACK_NICE_TO_HAVE, len(remaining))
+    assert [e["title"] for e in plan["nice_to_have"]] == [
+        t["title"] for t in remaining[:FALLBACK_NICE_TO_HAVE]
+    ]
+
+
+def test_nothing_fits():
+    plan = build_fallback_plan(_plan_data(5), "timeout")
+    assert plan["shortlist"] == []
+    assert "no task fits in 5 minutes" in plan["summary"]
@@ -0,0 +1,75 @@
+"""Tests for genai_clients' per-loop async clients and warm-up."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src import genai_clients
+
+
+class _FakeClient:
+    """genai.Client stand-in counting models.get calls on its aio side."""
+
+    instances = []
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.gets = []
+        self.fail = False
+
+        async def get(model):
+            if self.fail:
+                raise ConnectionError("offline")
+            self.gets.append(model)
+
+        self.aio = SimpleNamespace(models=SimpleNamespace(get=get))
+        _FakeClient.instances.append(self)
+
+
+@pytest.fixture(autouse=True)
+def fake_genai(monkeypatch):
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(genai_clients.genai, "Client", _FakeClient)
+    _FakeClient.instances = []
+    genai_clients.reset_clients()
+    yield
+    genai_clients.reset_clients()
+
+
+def test_async_client_is_shared_within_a_loop_and_rebuilt_per_loop():
+    async def clients():
+        return genai_clients.get_async_client(), genai_clients.get_async_client()
+
+    first, again = asyncio.run(clients())
+    assert first is again
+    other, _ = asyncio.run(clients())
+    assert other is not first
+    assert len(_FakeClient.instances) == 2
+
+
+def test_start_warm_up_runs_once_per_loop():
+    async def serve():
+        task = genai_clients.start_warm_up(model="planner")
+        assert genai_clients.start_warm_up(model="planner") is None
+        assert await task is True
+        return genai_clients.get_async_client()
+
+    aio = asyncio.run(serve())
+    assert _FakeClient.instances[0].aio is aio
+    assert _FakeClient.instances[0].gets == ["planner"]
+
+    asyncio.run(serve())
+    assert [c.gets for c in _FakeClient.instances] == [["planner"], ["planner"]]
+
+
+def test_warm_up_failure_is_reported_not_raised(monkeypatch):
+    async def warm():
+        genai_clients.get_async_client()
+        _FakeClient.instances[0].fail = True
+        return await genai_clients.warm_up_async(model="planner")
+
+    assert asyncio.run(warm()) is False
+    monkeypatch.delenv("GOOGLE_API_KEY")
+    monkeypatch.setattr(genai_clients, "load_env", lambda: None)
+    assert asyncio.run(genai_clients.warm_up_async()) is False
@@ -0,0 +1,110 @@
+"""Tests for llm_cache.ResponseCache and the shared get_cache() registry."""
+
+import os
+
+import pytest
+
+from src import llm_cache
+from src.llm_cache import ResponseCache, get_cache, make_cache_key
+
+
+pytestmark = pytest.mark.usefixtures("fresh_caches")
+
+
+def test_make_cache_key_separates_parts():
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+    assert make_cache_key("a", 1) == make_cache_key("a", "1")
+
+
+def test_memory_hits_return_copies():
+    cache = ResponseCache()
+    value = [{"title": "a"}]
+    cache.put("k", value)
+    value[0]["title"] = "changed"
+    hit = cache.get("k")
+    assert hit == [{"title": "a"}]
+    hit[0]["title"] = "changed"
+    assert cache.get("k") == [{"title": "a"}]
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["memory_hits"], stats["misses"]) == (2, 2, 1)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache = ResponseCache(ttl_seconds=10)
+    cache.put("k", "v")
+    now[0] += 5
+    assert cache.get("k") == "v"
+    now[0] += 10
+    assert cache.get("k") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    ResponseCache(disk_dir=str(tmp_path)).put("k", {"plan": [1, 2]})
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    assert cache.get("k") == {"plan": [1, 2]}
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted to memory: the next hit does not read the file.
+    os.remove(tmp_path / "k.json")
+    assert cache.get("k") == {"plan": [1, 2]}
+
+
+def test_disk_tier_evicts_oldest_files_past_the_byte_budget(tmp_path):
+    cache = ResponseCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=250)
+    for i in range(5):
+        cache.put(f"k{i}", "x" * 100)
+    files = sorted(os.listdir(tmp_path))
+    assert files == ["k3.json", "k4.json"]
+    assert cache.get("k0") is None
+
+    # A new instance indexes the files that are left and keeps the budget.
+    reopened = ResponseCache(max_entries=1, disk_dir=str(tmp_path), disk_max_bytes=250)
+    reopened.put("k5", "x" * 100)
+    assert sorted(os.listdir(tmp_path)) == ["k4.json", "k5.json"]
+
+
+def test_unwritable_values_stay_in_memory(tmp_path):
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    cache.put("k", {1, 2})
+    assert cache.get("k") == {1, 2}
+    assert os.listdir(tmp_path) == []
+
+
+def test_clear_drops_both_tiers(tmp_path):
+    cache = ResponseCache(disk_dir=str(tmp_path))
+    cache.put("k", "v")
+    cache.clear()
+    assert cache.get("k") is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_get_cache_is_shared_and_built_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("TASK_ADVISOR_CACHE_DIR", str(tmp_path))
+    monkeypatch.setenv("TASK_ADVISOR_CACHE_TTL", "0")
+    cache = get_cache("parse_tasks")
+    assert get_cache("parse_tasks") is cache
+    assert get_cache("planning") is not cache
+    assert cache.disk_dir == os.path.join(str(tmp_path), "parse_tasks")
+    assert cache.ttl_seconds is None
+
+
+def test_malformed_setting_fails_on_first_use_not_import(monkeypatch):
+    monkeypatch.setenv("TASK_ADVISOR_CACHE_ENTRIES", "lots")
+    with pytest.raises(ValueError):
+        get_cache("parse_tasks")
+    monkeypatch.setenv("TASK_ADVISOR_CACHE_ENTRIES", "8")
+    assert get_cache("parse_tasks").max_entries == 8
@@ -0,0 +1,95 @@
+"""Tests for the deterministic local task parser."""
+
+import json
+
+import pytest
+
+from src.local_parser import (
+    TEXT_DEFAULT_EST_MINUTES,
+    TEXT_DEFAULT_RATING,
+    coerce_minutes,
+    coerce_rating,
+    load_task_list,
+    normalize_task,
+    normalize_tasks_locally,
+)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(30, 30), ("30", 30), ("30 min", 30), ("1h", 60), ("1h 30m", 90), ("1.5 hours", 90)],
+)
+def test_coerce_minutes(value, expected):
+    assert coerce_minutes(value) == expected
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(3, 3), ("3", 3), (2.0, 2), ("low", 1), ("medium", 2), ("high", 3), (4, None), ("soon", None)],
+)
+def test_coerce_rating(value, expected):
+    assert coerce_rating(value) == expected
+
+
+def test_json_with_aliases_and_wrapper():
+    raw = json.dumps(
+        {
+            "tasks": [
+                {"name": "a", "importance": "3", "urgency": 2.0, "desire": "low", "duration": "1h"}
+            ]
+        }
+    )
+    assert normalize_tasks_locally(raw) == [
+        {"title": "a", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 60}
+    ]
+
+
+def test_bullet_text():
+    raw = (
+        "Tasks:\n"
+        "- email manager (importance 3, urgency 2, desire 1, 20 min)\n"
+        "- take a break (importance: low; urgency 1, desire 3, est 10)\n"
+    )
+    assert normalize_tasks_locally(raw) == [
+        {"title": "email manager", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 20},
+        {"title": "take a break", "importance": 1, "urgency": 1, "desire": 3, "est_minutes": 10},
+    ]
+
+
+def test_readme_demo_parses_locally_with_defaults():
+    raw = (
+        "I've got 30 minutes and low energy. Tasks:\n"
+        "- email manager (importance 3, urgency 2)\n"
+        "- take a break (desire 3)\n"
+        "- write unit test case (urgency 3)\n"
+    )
+    m, r = TEXT_DEFAULT_EST_MINUTES, TEXT_DEFAULT_RATING
+    assert normalize_tasks_locally(raw) == [
+        {"title": "email manager", "importance": 3, "urgency": 2, "desire": r, "est_minutes": m},
+        {"title": "take a break", "importance": r, "urgency": r, "desire": 3, "est_minutes": m},
+        {"title": "write unit test case", "importance": r, "urgency": 3, "desire": r, "est_minutes": m},
+    ]
+
+
+def test_text_defaults_do_not_hide_invalid_values():
+    assert normalize_tasks_locally("- gym (urgency soon)") is None
+    assert normalize_tasks_locally("- gym (importance 7)") is None
+
+
+def test_csv_with_header():
+    raw = "title,importance,urgency,desire,est_minutes\nEmail accountant,3,3,1,20\n"
+    assert normalize_tasks_locally(raw) == [
+        {"title": "Email accountant", "importance": 3, "urgency": 3, "desire": 1, "est_minutes": 20}
+    ]
+
+
+def test_unrecognized_text_falls_back():
+    assert load_task_list("- email manager (importance 3)\nsome stray sentence") is None
+    assert normalize_tasks_locally("please sort my day") is None
+
+
+def test_incomplete_task_is_not_guessed():
+    normalized, missing = normalize_task({"title": "x", "importance": 5})
+    assert normalized == {"title": "x"}
+    assert missing == ["importance", "urgency", "desire", "est_minutes"]
+    assert normalize_tasks_locally(json.dumps([{"title": "x", "importance": 2}])) is None
@@ -0,0 +1,56 @@
+"""Tests for the deterministic helpers in main.py."""
+
+import pytest
+
+from src.main import choose_shortlist, iter_scored_tasks, score_tasks, stream_shortlist
+from src.ranking import PriorityIndex
+
+
+def _titles(tasks):
+    return [t["title"] for t in tasks]
+
+
+@pytest.mark.parametrize("minutes", [0, 20, 60, 240])
+def test_stream_shortlist_matches_greedy(make_tasks, minutes):
+    tasks = make_tasks(300, seed=1)
+    expected = choose_shortlist(score_tasks(tasks), minutes)
+    for source in (
+        score_tasks(tasks, lazy=True),
+        PriorityIndex(tasks).ranked(),
+        iter_scored_tasks(score_tasks(tasks)),
+    ):
+        shortlist, _ = stream_shortlist(source, minutes, min_est_minutes=5)
+        assert _titles(shortlist) == _titles(expected)
+
+
+def test_stream_shortlist_keeps_best_runners_up(make_tasks):
+    scored = score_tasks(make_tasks(200, seed=2))
+    shortlist, runners_up = stream_shortlist(iter(scored), 45, runners_up=3, min_est_minutes=5)
+    picked = {t["title"] for t in shortlist}
+    skipped = [t for t in scored if t["title"] not in picked]
+    assert len(runners_up) == 3
+    assert [t["score"] for t in runners_up] == sorted((t["score"] for t in runners_up), reverse=True)
+    # The best skipped tasks among those read before the early stop.
+    assert runners_up[0] == skipped[0]
+
+
+def test_stream_shortlist_stops_pulling_once_budget_is_used(make_tasks):
+    scored = score_tasks(make_tasks(1000, seed=3))
+    pulled = []
+
+    def source():
+        for t in scored:
+            pulled.append(t)
+            yield t
+
+    stream_shortlist(source(), 30, min_est_minutes=5)
+    assert len(pulled) < len(scored)
+
+
+def test_stream_shortlist_rejects_unsorted_input():
+    tasks = [
+        {"title": "low", "importance": 1, "urgency": 1, "desire": 1, "est_minutes": 5},
+        {"title": "high", "importance": 3, "urgency": 3, "desire": 3, "est_minutes": 5},
+    ]
+    with pytest.raises(ValueError, match="descending score order"):
+        stream_shortlist(iter_scored_tasks(tasks), 60)
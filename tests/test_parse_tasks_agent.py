@@ -0,0 +1,162 @@
+"""Tests for parse_tasks_agent with an offline fake genai client."""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from src import parse_tasks_agent
+from src.llm_cache import ResponseCache
+from src.parse_tasks_agent import call_parse_tasks_agent, parse_cache_key
+
+pytestmark = pytest.mark.usefixtures("fresh_caches")
+
+PARSED = [
+    {"title": "email manager", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 15},
+    {"title": "gym", "importance": 2, "urgency": 1, "desire": 3, "est_minutes": 45},
+]
+
+
+@pytest.fixture
+def model(fake_client, monkeypatch):
+    client = fake_client(lambda contents: json.dumps(PARSED))
+    monkeypatch.setattr(parse_tasks_agent, "get_client", lambda: client)
+    monkeypatch.setattr(parse_tasks_agent, "get_async_client", lambda: client.aio)
+    return client
+
+
+def test_parse_cache_key_normalizes_input():
+    assert parse_cache_key('[{"a": 1, "b": 2}]') == parse_cache_key('[ {"b":2,"a":1} ]')
+    assert parse_cache_key("email  the\\nmanager") == parse_cache_key(" email the\\nmanager ")
+    assert parse_cache_key("x") != parse_cache_key("x", kind="partial")
+    assert parse_cache_key("x", structured=True) != parse_cache_key("x", structured=False)
+
+
+def test_identical_input_is_served_from_the_cache(model):
+    assert call_parse_tasks_agent('[{"t": "email manager"}, {"t": "gym"}]') == PARSED
+    assert call_parse_tasks_agent('[ {"t":"email manager"},{"t":"gym"} ]') == PARSED
+    assert len(model.models.calls) == 1
+
+    call_parse_tasks_agent('[{"t": "email manager"}, {"t": "gym"}]', use_cache=False)
+    assert len(model.models.calls) == 2
+
+
+def test_async_calls_share_the_cache(model):
+    call_parse_tasks_agent("email manager, gym")
+    tasks = asyncio.run(parse_tasks_agent.call_parse_tasks_agent_async("email manager, gym"))
+    assert tasks == PARSED
+    assert len(model.models.calls) == 1
+    assert model.aio.models.calls == []
+
+
+def _prompt(contents):
+    return contents[0]["parts"][0]["text"]
+
+
+def _partial_responder(index_shift=0):
+    """Answer partial requests by echoing each _task_index (+ index_shift), full ones with PARSED."""
+    def respond(contents):
+        prompt = _prompt(contents)
+        if parse_tasks_agent.TASK_INDEX_KEY not in prompt:
+            return json.dumps(PARSED)
+        sent = json.loads(prompt.split("Here is the raw task input:\n\n", 1)[1])
+        return json.dumps([
+            {
+                "title": task.get("title", "guessed"),
+                "importance": 2,
+                "urgency": 2,
+                "desire": 2,
+                "est_minutes": 30,
+                parse_tasks_agent.TASK_INDEX_KEY: task[parse_tasks_agent.TASK_INDEX_KEY] + index_shift,
+            }
+            for task in sent
+        ])
+    return respond
+
+
+INCOMPLETE = json.dumps([
+    {"title": "email manager", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 15},
+    {"title": "gym", "desire": 3},
+])
+
+
+@pytest.mark.parametrize("index_shift, path", [(0, "partial"), (5, "llm")])
+def test_parse_tasks_reports_the_path_taken(fake_client, monkeypatch, index_shift, path):
+    client = fake_client(_partial_responder(index_shift))
+    monkeypatch.setattr(parse_tasks_agent, "get_client", lambda: client)
+    monkeypatch.setattr(parse_tasks_agent, "get_async_client", lambda: client.aio)
+    monkeypatch.setattr(parse_tasks_agent, "PARSE_PATH_COUNTS", {"local": 0, "partial": 0, "llm": 0})
+
+    assert parse_tasks_agent.parse_tasks(INCOMPLETE, use_cache=False)[1] == path
+    assert asyncio.run(parse_tasks_agent.parse_tasks_async(INCOMPLETE, use_cache=False))[1] == path
+    assert parse_tasks_agent.PARSE_PATH_COUNTS[path] == 2
+
+
+def test_partial_call_sends_only_incomplete_tasks(fake_client, monkeypatch):
+    client = fake_client(_partial_responder())
+    monkeypatch.setattr(parse_tasks_agent, "get_client", lambda: client)
+    tasks = [
+        {"title": "a", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 15},
+        {"title": "b", "desire": 3},
+        {"title": "c", "importance": 1, "urgency": 1, "desire": 1, "est_minutes": 5},
+        {"title": "d", "est_minutes": 50},
+    ]
+
+    merged, path = call_parse_tasks_agent(
+        json.dumps(tasks), use_cache=False, partial=True, return_path=True
+    )
+
+    assert path == "partial"
+    assert len(client.models.calls) == 1
+    sent = json.loads(_prompt(client.models.calls[0]).split("Here is the raw task input:\n\n", 1)[1])
+    assert [(t["title"], t[parse_tasks_agent.TASK_INDEX_KEY]) for t in sent] == [("b", 1), ("d", 3)]
+    # Original order, complete tasks untouched, user-given values over model guesses.
+    assert [t["title"] for t in merged] == ["a", "b", "c", "d"]
+    assert merged[0] == tasks[0] and merged[2] == tasks[2]
+    assert merged[1]["desire"] == 3 and merged[3]["est_minutes"] == 50
+    assert all(parse_tasks_agent.TASK_INDEX_KEY not in t for t in merged)
+
+
+def test_complete_list_needs_no_model_call(fake_client, monkeypatch):
+    client = fake_client(_partial_responder())
+    monkeypatch.setattr(parse_tasks_agent, "get_client", lambda: client)
+    tasks = [{"title": "a", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 15}]
+    assert call_parse_tasks_agent(json.dumps(tasks), partial=True, return_path=True) == (
+        tasks,
+        "local",
+    )
+    assert client.models.calls == []
+
+
+def test_invalid_merged_task_falls_back_to_a_full_call():
+    incomplete = [(0, {"title": "gym", "desire": 3})]
+    model_tasks = [{"title": "gym", "importance": 7, "urgency": 2, "desire": 1,
+                    "est_minutes": 30, parse_tasks_agent.TASK_INDEX_KEY: 0}]
+    assert parse_tasks_agent._merge_partial([None], incomplete, model_tasks) is None
+
+    model_tasks[0]["importance"] = 2
+    assert parse_tasks_agent._merge_partial([None], incomplete, model_tasks) == [
+        {"title": "gym", "importance": 2, "urgency": 2, "desire": 3, "est_minutes": 30}
+    ]
+
+
+def test_async_cache_access_runs_off_the_event_loop(model, monkeypatch):
+    threads = []
+    for name in ("get", "put"):
+        original = getattr(ResponseCache, name)
+
+        def spy(self, *args, _original=original, _name=name):
+            threads.append((_name, threading.get_ident()))
+            return _original(self, *args)
+
+        monkeypatch.setattr(ResponseCache, name, spy)
+
+    async def run():
+        tasks = await parse_tasks_agent.call_parse_tasks_agent_async("email manager, gym")
+        return tasks, threading.get_ident()
+
+    tasks, loop_thread = asyncio.run(run())
+    assert tasks == PARSED
+    assert [name for name, _ in threads] == ["get", "put"]
+    assert all(ident != loop_thread for _, ident in threads)
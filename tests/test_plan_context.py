@@ -0,0 +1,84 @@
+"""Tests for plan_context.select_plan_context."""
+
+import pytest
+
+from src.main import assemble_plan_data, choose_shortlist, score_tasks
+from src.plan_context import estimate_tokens, select_plan_context
+from src.task_table import TaskTable
+
+
+@pytest.fixture
+def tasks(make_tasks):
+    """make_tasks with longer titles and some tasks that never fit an hour."""
+    def make(n, est_choices=(5, 10, 20, 45, 90, 240)):
+        return make_tasks(n, seed=7, est_choices=est_choices, prefix="task number")
+
+    return make
+
+
+def _plan_tokens(context, shortlist, summary):
+    plan_data = assemble_plan_data(
+        all_tasks=context,
+        available_minutes=60,
+        energy_level="medium",
+        suggested_shortlist=shortlist,
+    )
+    if summary is not None:
+        plan_data["omitted_tasks_summary"] = summary
+    return estimate_tokens(plan_data)
+
+
+def test_small_backlog_is_sent_whole(tasks):
+    scored = score_tasks(tasks(8))
+    shortlist = choose_shortlist(scored, 60)
+    context, kept, summary = select_plan_context(scored, shortlist, 60)
+    assert context == scored
+    assert kept == shortlist
+    assert summary is None
+
+
+def test_large_backlog_stays_within_budget(tasks):
+    scored = score_tasks(tasks(2000))
+    shortlist = choose_shortlist(scored, 60)
+    context, kept, summary = select_plan_context(scored, shortlist, 60, token_budget=1500)
+
+    assert kept == shortlist
+    assert all(t in context for t in shortlist)
+    assert len(context) + summary["count"] == len(scored)
+    assert _plan_tokens(context, kept, summary) <= 1500
+    assert [t["score"] for t in context] == sorted((t["score"] for t in context), reverse=True)
+
+
+def test_candidates_that_fit_come_first(tasks):
+    scored = score_tasks(tasks(500))
+    shortlist = choose_shortlist(scored, 60)
+    context, _, _ = select_plan_context(scored, shortlist, 60, token_budget=1000)
+    extra = [t for t in context if t not in shortlist]
+    assert extra and all(t["est_minutes"] <= 60 for t in extra)
+
+
+def test_oversized_shortlist_is_capped_and_summarized(tasks, caplog):
+    scored = score_tasks(tasks(100, est_choices=(1,)))
+    shortlist = choose_shortlist(scored, 100)
+    assert len(shortlist) == 100
+
+    with caplog.at_level("WARNING", logger="task_advisor"):
+        context, kept, summary = select_plan_context(scored, shortlist, 100, token_budget=2000)
+
+    assert 0 < len(kept) < len(shortlist)
+    assert min(t["score"] for t in kept) >= max(
+        t["score"] for t in shortlist if t not in kept
+    )
+    assert summary["count"] == len(scored) - len(context)
+    assert _plan_tokens(context, kept, summary) <= 2000
+    assert "exceeds" in caplog.text
+
+
+def test_task_table_input_matches_dicts(tasks):
+    backlog = tasks(300)
+    scored = score_tasks(backlog)
+    table = score_tasks(TaskTable.from_dicts(backlog))
+    by_dicts = select_plan_context(scored, choose_shortlist(scored, 60), 60, 800)
+    by_table = select_plan_context(table, choose_shortlist(table, 60), 60, 800)
+    assert [t["title"] for t in by_table[0]] == [t["title"] for t in by_dicts[0]]
+    assert by_table[2] == by_dicts[2]
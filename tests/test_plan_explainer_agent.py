@@ -0,0 +1,98 @@
+"""Tests for plan_explainer_agent's order-insensitive planning cache."""
+
+import asyncio
+import random
+import threading
+
+import pytest
+
+from src import plan_explainer_agent
+from src.llm_cache import ResponseCache, get_cache
+from src.main import assemble_plan_data, choose_shortlist, score_tasks
+from src.plan_explainer_agent import (
+    PLAN_CACHE_NAMESPACE,
+    call_planning_agent,
+    call_planning_agent_async,
+    canonical_plan_data,
+    plan_cache_key,
+    stream_planning_agent_async,
+)
+
+pytestmark = pytest.mark.usefixtures("fresh_caches")
+
+PLAN = {"shortlist": [], "nice_to_have": [], "summary": "cached"}
+
+
+def _plan_data(tasks, minutes=60, energy_level="medium"):
+    scored = score_tasks(tasks)
+    return assemble_plan_data(scored, minutes, energy_level, choose_shortlist(scored, minutes))
+
+
+def _shuffled(plan_data, seed):
+    rng = random.Random(seed)
+    shuffled = dict(plan_data)
+    for key in ("all_tasks", "suggested_shortlist"):
+        shuffled[key] = list(plan_data[key])
+        rng.shuffle(shuffled[key])
+    return shuffled
+
+
+def test_task_order_does_not_change_the_key(make_tasks):
+    plan_data = _plan_data(make_tasks(30, seed=1))
+    for seed in range(5):
+        assert plan_cache_key(_shuffled(plan_data, seed)) == plan_cache_key(plan_data)
+
+
+def test_equivalent_values_share_a_key(make_tasks):
+    plan_data = _plan_data(make_tasks(5, seed=2))
+    variant = _plan_data(make_tasks(5, seed=2), energy_level=" Medium")
+    variant["all_tasks"] = [dict(t, score=str(t["score"])) for t in variant["all_tasks"]]
+    assert canonical_plan_data(variant) == canonical_plan_data(plan_data)
+
+
+def test_request_changes_change_the_key(make_tasks):
+    tasks = make_tasks(10, seed=3)
+    key = plan_cache_key(_plan_data(tasks))
+    assert plan_cache_key(_plan_data(tasks, minutes=45)) != key
+    assert plan_cache_key(_plan_data(tasks, energy_level="low")) != key
+    assert plan_cache_key(_plan_data(tasks[1:])) != key
+    assert plan_cache_key(_plan_data(tasks), wire_format="json") != key
+    assert plan_cache_key(_plan_data(tasks), structured=False) != key
+
+
+def test_reordered_request_is_a_cache_hit(make_tasks, monkeypatch):
+    def no_model():
+        raise AssertionError("the model must not be called on a cache hit")
+
+    monkeypatch.setattr(plan_explainer_agent, "get_client", no_model)
+    monkeypatch.setattr(plan_explainer_agent, "get_async_client", no_model)
+    plan_data = _plan_data(make_tasks(20, seed=4))
+    get_cache(PLAN_CACHE_NAMESPACE).put(plan_cache_key(plan_data), PLAN)
+
+    assert call_planning_agent(_shuffled(plan_data, 1)) == PLAN
+    assert asyncio.run(call_planning_agent_async(_shuffled(plan_data, 2))) == PLAN
+    with pytest.raises(AssertionError):
+        call_planning_agent(plan_data, use_cache=False)
+
+
+def test_async_cache_access_runs_off_the_event_loop(make_tasks, monkeypatch):
+    monkeypatch.setattr(plan_explainer_agent, "get_async_client", lambda: None)
+    plan_data = _plan_data(make_tasks(5, seed=5))
+    get_cache(PLAN_CACHE_NAMESPACE).put(plan_cache_key(plan_data), PLAN)
+    threads = []
+    original = ResponseCache.get
+
+    def spy(self, key):
+        threads.append(threading.get_ident())
+        return original(self, key)
+
+    monkeypatch.setattr(ResponseCache, "get", spy)
+
+    async def run():
+        events = [e async for e in stream_planning_agent_async(plan_data)]
+        plan = await call_planning_agent_async(plan_data)
+        return events, plan, threading.get_ident()
+
+    events, plan, loop_thread = asyncio.run(run())
+    assert plan == PLAN and events == [("plan", PLAN)]
+    assert len(threads) == 2 and loop_thread not in threads
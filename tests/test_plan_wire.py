@@ -0,0 +1,79 @@
+"""Tests for the compact plan wire format and PlanStreamDecoder."""
+
+import json
+import random
+
+from src.main import assemble_plan_data, choose_shortlist, score_tasks
+from src.plan_wire import PlanStreamDecoder, decode_plan_response, encode_plan_data
+
+
+def _plan_data():
+    scored = score_tasks(
+        [
+            {
+                "title": f"task {i}",
+                "importance": 3 - i % 3,
+                "urgency": 2,
+                "desire": 1,
+                "est_minutes": 10 + i,
+            }
+            for i in range(6)
+        ]
+    )
+    return assemble_plan_data(
+        all_tasks=scored,
+        available_minutes=30,
+        energy_level="low",
+        suggested_shortlist=choose_shortlist(scored, 30),
+    )
+
+
+def _response():
+    return json.dumps(
+        {
+            "shortlist": [[0, "do it first"], [1, "quick \"win\" [fast]"]],
+            "nice_to_have": [{"id": 2, "reason": "if time allows"}, [99, "unknown id"]],
+            "summary": "two tasks, {then} more",
+        }
+    )
+
+
+def test_encode_references_tasks_by_id():
+    plan_data = _plan_data()
+    text, tasks = encode_plan_data(plan_data)
+    encoded = json.loads(text)
+    assert encoded["avail"] == 30
+    assert len(encoded["tasks"]) == len(tasks) == len(plan_data["all_tasks"])
+    assert [tasks[i]["title"] for i in encoded["suggested"]] == [
+        t["title"] for t in plan_data["suggested_shortlist"]
+    ]
+
+
+def test_decode_maps_ids_and_drops_unknown():
+    _, tasks = encode_plan_data(_plan_data())
+    decoded = decode_plan_response(json.loads(_response()), tasks)
+    assert [e["title"] for e in decoded["shortlist"]] == [tasks[0]["title"], tasks[1]["title"]]
+    assert decoded["shortlist"][0]["score"] == tasks[0]["score"]
+    assert [e["reason"] for e in decoded["nice_to_have"]] == ["if time allows"]
+    assert decoded["dropped_entries"] == [[99, "unknown id"]]
+
+
+def test_stream_decoder_matches_whole_response_for_any_chunking():
+    _, tasks = encode_plan_data(_plan_data())
+    text = "```json\n" + _response() + "\n```"
+    expected = decode_plan_response(json.loads(_response()), tasks)
+    expected_events = [("shortlist", e) for e in expected["shortlist"]] + [
+        ("nice_to_have", e) for e in expected["nice_to_have"]
+    ]
+
+    rng = random.Random(6)
+    for _ in range(200):
+        decoder = PlanStreamDecoder(tasks)
+        events = []
+        pos = 0
+        while pos < len(text):
+            step = rng.randint(1, 8)
+            events.extend(decoder.feed(text[pos : pos + step]))
+            pos += step
+        assert events == expected_events
+        assert decoder.text == text
@@ -0,0 +1,126 @@
+"""Tests for ranking.RankedTasks and ranking.PriorityIndex."""
+
+import random
+
+import pytest
+
+from src.main import choose_shortlist, score_tasks
+from src.ranking import PriorityIndex, RankedTasks
+from src.scoring_engine import ScoringPolicy
+from src.task_table import TaskTable
+
+
+def _task(title, importance=2, urgency=2, desire=2, est_minutes=30):
+    return {
+        "title": title,
+        "importance": importance,
+        "urgency": urgency,
+        "desire": desire,
+        "est_minutes": est_minutes,
+    }
+
+
+def _titles(tasks):
+    return [t["title"] for t in tasks]
+
+
+def test_ranked_tasks_match_score_tasks(make_tasks):
+    tasks = make_tasks(200, seed=1)
+    ranked = list(RankedTasks(tasks))
+    assert ranked == score_tasks(tasks)
+    assert list(score_tasks(tasks, lazy=True)) == ranked
+
+
+def test_ranked_tasks_from_task_table(make_tasks):
+    tasks = make_tasks(50, seed=2)
+    ranked = RankedTasks(TaskTable.from_dicts(tasks))
+    assert ranked.min_est_minutes == min(t["est_minutes"] for t in tasks)
+    assert _titles(ranked) == _titles(score_tasks(tasks))
+
+
+def test_ranked_tasks_keep_input_order_on_ties():
+    tasks = [_task("a"), _task("b", importance=3), _task("c"), _task("d")]
+    assert _titles(RankedTasks(tasks)) == ["b", "a", "c", "d"]
+
+
+def test_ranked_tasks_with_policy(make_tasks):
+    policy = ScoringPolicy([(2.0, ["desire"]), (1.0, ["urgency"])], name="fun")
+    tasks = make_tasks(60, seed=3)
+    assert list(RankedTasks(tasks, policy=policy)) == score_tasks(tasks, policy=policy)
+
+
+def test_lazy_shortlist_matches_eager_and_stops_early(make_tasks):
+    tasks = make_tasks(500, seed=4)
+    for minutes in (0, 25, 60, 240):
+        ranked = RankedTasks(tasks)
+        assert choose_shortlist(ranked, minutes) == choose_shortlist(score_tasks(tasks), minutes)
+    # A small budget leaves most of the heap unpopped.
+    ranked = RankedTasks(tasks)
+    choose_shortlist(ranked, 20)
+    assert len(ranked._heap) > 400
+
+
+def test_empty_ranked_tasks():
+    ranked = RankedTasks([])
+    assert ranked.min_est_minutes is None
+    assert list(ranked) == []
+
+
+def test_priority_index_matches_score_tasks(make_tasks):
+    tasks = make_tasks(50, seed=1)
+    index = PriorityIndex(tasks)
+    assert _titles(index.ranked()) == _titles(score_tasks(tasks))
+
+
+def test_add_remove_churn_keeps_index_consistent(make_tasks):
+    rng = random.Random(2)
+    new_tasks = iter(make_tasks(2000, seed=2))
+    index = PriorityIndex()
+    live = {}
+    for _ in range(2000):
+        if live and rng.random() < 0.5:
+            title = rng.choice(sorted(live))
+            index.remove(title)
+            del live[title]
+        else:
+            task = next(new_tasks)
+            index.add(task)
+            live[task["title"]] = task
+
+        assert len(index) == len(live)
+        expected_min = min((t["est_minutes"] for t in live.values()), default=None)
+        assert index.min_est_minutes == expected_min
+
+    assert sorted(_titles(index.ranked())) == sorted(live)
+
+
+def test_update_keeps_tie_position():
+    index = PriorityIndex([_task("a"), _task("b"), _task("c")])
+    index.update("a", _task("a", est_minutes=10))
+    assert _titles(index.ranked()) == ["a", "b", "c"]
+    assert index.get("a")["est_minutes"] == 10
+    assert index.min_est_minutes == 10
+
+
+def test_invalid_update_leaves_index_unchanged():
+    index = PriorityIndex([_task("a", est_minutes=10), _task("b", importance=3)])
+    before = list(index.ranked())
+
+    with pytest.raises(KeyError):
+        index.update("a", {"title": "a", "importance": 3, "urgency": 3, "desire": 3})
+    with pytest.raises(ValueError):
+        index.update("a", _task("b"))
+
+    assert list(index.ranked()) == before
+    assert index.min_est_minutes == 10
+    index.remove("a")
+    assert _titles(index.ranked()) == ["b"]
+
+
+def test_duplicate_add_and_missing_remove_raise():
+    index = PriorityIndex([_task("a")])
+    with pytest.raises(ValueError):
+        index.add(_task("a"))
+    with pytest.raises(KeyError):
+        index.remove("missing")
+    assert len(index) == 1
@@ -0,0 +1,53 @@
+"""Tests for response schema validation."""
+
+import json
+
+import pytest
+
+from src.response_schemas import (
+    COMPACT_PLAN_SCHEMA,
+    INDEXED_TASK_LIST_SCHEMA,
+    TASK_INDEX_KEY,
+    TASK_LIST_SCHEMA,
+    ModelResponseError,
+    validate,
+    validate_response,
+)
+
+TASK = {"title": "a", "importance": 3, "urgency": 2, "desire": 1, "est_minutes": 20}
+
+
+def test_valid_task_list():
+    assert validate_response(json.dumps([TASK]), TASK_LIST_SCHEMA) == [TASK]
+
+
+def test_errors_name_the_path():
+    bad = dict(TASK, importance=5, est_minutes="20")
+    del bad["title"]
+    errors = validate([TASK, bad], TASK_LIST_SCHEMA)
+    assert "$[1]: missing 'title'" in errors
+    assert any(e.startswith("$[1].importance") for e in errors)
+    assert "$[1].est_minutes: expected integer, got str" in errors
+
+
+def test_booleans_are_not_numbers():
+    assert validate(dict(TASK, urgency=True), TASK_LIST_SCHEMA["items"])
+
+
+def test_indexed_schema_requires_reserved_key():
+    assert validate([TASK], INDEXED_TASK_LIST_SCHEMA) == [f"$[0]: missing '{TASK_INDEX_KEY}'"]
+    assert validate([dict(TASK, **{TASK_INDEX_KEY: 0})], INDEXED_TASK_LIST_SCHEMA) == []
+
+
+def test_invalid_json_raises_model_response_error():
+    with pytest.raises(ModelResponseError) as info:
+        validate_response('{"shortlist": [', COMPACT_PLAN_SCHEMA)
+    assert info.value.raw_text == '{"shortlist": ['
+
+
+def test_schema_mismatch_raises_with_errors():
+    raw = json.dumps({"shortlist": [{"id": "x", "reason": "r"}], "nice_to_have": []})
+    with pytest.raises(ModelResponseError) as info:
+        validate_response(raw, COMPACT_PLAN_SCHEMA)
+    assert "$: missing 'summary'" in info.value.errors
+    assert "$.shortlist[0].id: expected integer, got str" in info.value.errors
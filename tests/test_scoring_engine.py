@@ -0,0 +1,105 @@
+"""Tests for the vectorized scoring engine against compute_priority_score."""
+
+import pytest
+
+from src.main import BATCH_SCORING_MIN_TASKS, compute_priority_score, score_tasks
+from src.scoring_engine import (
+    DEFAULT_POLICY,
+    ScoringPolicy,
+    bucket_rank,
+    compute_priority_scores,
+    rank_by_score,
+    score_columns,
+)
+
+
+def _reference(tasks):
+    """The original per-task loop: score, then a stable descending sort."""
+    scored = [dict(t, score=compute_priority_score(t)) for t in tasks]
+    scored.sort(key=lambda t: t["score"], reverse=True)
+    return scored
+
+
+def test_vectorized_scores_are_bit_identical(make_tasks):
+    tasks = make_tasks(500, ratings=(1, 1.5, 2, 2.25, 3))
+    scores = compute_priority_scores(
+        [t["importance"] for t in tasks],
+        [t["urgency"] for t in tasks],
+        [t["desire"] for t in tasks],
+    )
+    assert scores.tolist() == [compute_priority_score(t) for t in tasks]
+
+
+def test_rank_by_score_is_stable_descending():
+    order = rank_by_score([2.0, 5.0, 2.0, 5.0, 1.0])
+    assert order.tolist() == [1, 3, 0, 2, 4]
+
+
+def test_batch_path_matches_reference(make_tasks):
+    tasks = make_tasks(BATCH_SCORING_MIN_TASKS * 4, seed=1, ratings=(1, 1.5, 2, 3))
+    assert score_tasks(tasks) == _reference(tasks)
+
+
+def test_small_and_large_lists_agree(make_tasks):
+    tasks = make_tasks(BATCH_SCORING_MIN_TASKS - 1, seed=2)
+    assert score_tasks(tasks) == _reference(tasks)
+
+
+def test_score_columns_aligned_with_input(make_tasks):
+    tasks = make_tasks(200, seed=3)
+    scores, order = score_columns(tasks)
+    assert scores.tolist() == [compute_priority_score(t) for t in tasks]
+    assert [tasks[i]["title"] for i in order.tolist()] == [t["title"] for t in _reference(tasks)]
+
+
+
+def _columns(tasks):
+    return (
+        [t["importance"] for t in tasks],
+        [t["urgency"] for t in tasks],
+        [t["desire"] for t in tasks],
+    )
+
+
+def test_bucket_rank_matches_general_path(make_tasks):
+    tasks = make_tasks(1000, seed=5)
+    scores, order = bucket_rank(*_columns(tasks))
+    general = compute_priority_scores(*_columns(tasks))
+    assert scores.tolist() == general.tolist()
+    assert order.tolist() == rank_by_score(general).tolist()
+
+
+def test_bucket_rank_declines_ratings_outside_1_to_3(make_tasks):
+    assert bucket_rank(*_columns(make_tasks(10, ratings=(1, 2.5, 3)))) is None
+    assert bucket_rank(*_columns(make_tasks(10, ratings=(0, 1, 2)))) is None
+    assert bucket_rank(*_columns(make_tasks(10, ratings=(1, 4)))) is None
+
+
+def test_default_policy_reproduces_the_reference(make_tasks):
+    tasks = make_tasks(100, seed=6, ratings=(1, 1.5, 2, 3))
+    assert [DEFAULT_POLICY.score(t) for t in tasks] == [compute_priority_score(t) for t in tasks]
+    assert DEFAULT_POLICY.scores(*_columns(tasks)).tolist() == [
+        compute_priority_score(t) for t in tasks
+    ]
+
+
+@pytest.mark.parametrize("ratings", [(1, 2, 3), (1, 1.5, 2, 3)])
+def test_custom_policy_paths_agree(make_tasks, ratings):
+    policy = ScoringPolicy([(2.0, ["importance"]), (0.5, ["urgency", "desire"])], name="ops")
+    small = make_tasks(BATCH_SCORING_MIN_TASKS - 1, seed=7, ratings=ratings)
+    large = make_tasks(BATCH_SCORING_MIN_TASKS * 4, seed=8, ratings=ratings)
+
+    for tasks in (small, large):
+        expected = [dict(t, score=policy.score(t)) for t in tasks]
+        expected.sort(key=lambda t: t["score"], reverse=True)
+        assert score_tasks(tasks, policy=policy) == expected
+        assert [t["title"] for t in score_tasks(tasks, lazy=True, policy=policy)] == [
+            t["title"] for t in expected
+        ]
+
+
+def test_policy_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        ScoringPolicy([(1.0, ["effort"])])
+    with pytest.raises(ValueError):
+        ScoringPolicy([])
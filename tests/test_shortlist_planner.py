@@ -0,0 +1,103 @@
+"""Tests for the knapsack shortlist planner and BudgetShortlistTable."""
+
+import itertools
+import math
+import random
+
+import pytest
+
+from src import shortlist_planner
+from src.main import choose_shortlist, score_tasks
+from src.shortlist_planner import BudgetShortlistTable, knapsack_pick
+from src.task_table import TaskTable
+
+
+def _brute_force_best(est_minutes, scores, budget):
+    """Highest total score of any subset whose (rounded-up) minutes fit."""
+    best = 0.0
+    indices = range(len(scores))
+    for size in range(len(scores) + 1):
+        for subset in itertools.combinations(indices, size):
+            if sum(math.ceil(est_minutes[i]) for i in subset) <= budget:
+                best = max(best, sum(scores[i] for i in subset))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_knapsack_matches_brute_force(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 10)
+    est = [rng.choice([0, 3, 7.5, 10, 15, 25, 40]) for _ in range(n)]
+    scores = [rng.choice([0.0, 1.0, 2.5, 4.0, 7.5, 13.5]) for _ in range(n)]
+    budget = rng.randint(0, 60)
+
+    picked = knapsack_pick(est, scores, budget)
+    assert picked == sorted(set(picked))
+    assert sum(math.ceil(est[i]) for i in picked) <= budget
+    assert sum(scores[i] for i in picked) == pytest.approx(_brute_force_best(est, scores, budget))
+
+
+def test_optimal_mode_beats_or_ties_greedy(make_tasks):
+    for seed in range(10):
+        scored = score_tasks(make_tasks(30, seed=seed))
+        greedy = choose_shortlist(scored, 60, mode="greedy")
+        optimal = choose_shortlist(scored, 60, mode="optimal")
+        assert sum(t["est_minutes"] for t in optimal) <= 60
+        assert sum(t["score"] for t in optimal) >= sum(t["score"] for t in greedy)
+        # Picks keep the score order of the input.
+        assert [t["score"] for t in optimal] == sorted(
+            (t["score"] for t in optimal), reverse=True
+        )
+
+
+def test_knapsack_rejects_oversized_tables(monkeypatch):
+    monkeypatch.setattr(shortlist_planner, "KNAPSACK_MAX_CELLS", 100)
+    with pytest.raises(ValueError):
+        knapsack_pick([1] * 20, [1.0] * 20, 60)
+
+
+def test_negative_budget_picks_nothing():
+    assert knapsack_pick([5], [3.0], -1) == []
+
+
+@pytest.mark.parametrize("mode", ["greedy", "optimal"])
+@pytest.mark.parametrize("seed", range(4))
+def test_table_matches_choose_shortlist(make_tasks, mode, seed):
+    # Zero-minute and never-fitting tasks exercise the skipped columns.
+    tasks = make_tasks(25, seed=seed, est_choices=(0, 5, 10, 20, 25, 45, 60, 500))
+    scored = score_tasks(tasks)
+    table = BudgetShortlistTable(scored, 120, mode=mode)
+    for budget in range(121):
+        expected = choose_shortlist(scored, budget, mode=mode)
+        assert table.shortlist(budget) == expected
+        assert table.best_score(budget) == pytest.approx(sum(t["score"] for t in expected))
+
+
+def test_table_accepts_task_table(make_tasks):
+    tasks = make_tasks(15, seed=4)
+    table = BudgetShortlistTable(score_tasks(TaskTable.from_dicts(tasks)), 60)
+    by_list = BudgetShortlistTable(score_tasks(tasks), 60)
+    for budget in (0, 15, 30, 60):
+        assert table.best_score(budget) == pytest.approx(by_list.best_score(budget))
+        assert table.shortlist(budget).title == [t["title"] for t in by_list.shortlist(budget)]
+
+
+def test_empty_table():
+    table = BudgetShortlistTable([], 30, mode="greedy")
+    assert table.shortlist(30) == []
+    assert table.best_score(30) == 0.0
+
+
+def test_budget_outside_range_raises(make_tasks):
+    table = BudgetShortlistTable(score_tasks(make_tasks(5, seed=5)), 30)
+    with pytest.raises(ValueError):
+        table.shortlist(31)
+    with pytest.raises(ValueError):
+        table.shortlist(-1)
+
+
+@pytest.mark.parametrize("mode", ["greedy", "optimal"])
+def test_table_respects_cell_cap(make_tasks, monkeypatch, mode):
+    monkeypatch.setattr(shortlist_planner, "KNAPSACK_MAX_CELLS", 100)
+    with pytest.raises(ValueError, match="KNAPSACK_MAX_CELLS"):
+        BudgetShortlistTable(score_tasks(make_tasks(50, seed=6)), 120, mode=mode)
@@ -0,0 +1,215 @@
+"""Tests for the task_advisor orchestration helpers (no model calls)."""
+
+import asyncio
+import json
+
+import pytest
+
+from src import shortlist_planner, task_advisor
+from src.main import choose_shortlist, score_tasks
+from src.task_advisor import WhatIfTables
+
+
+def test_what_if_table_is_built_on_the_first_follow_up(make_tasks):
+    tasks = make_tasks(20, seed=1)
+    raw = json.dumps(tasks)
+    tables = WhatIfTables(max_minutes=120)
+
+    assert tables.get(raw, 60) is None
+    # First sighting only records the list.
+    assert tables.observe(raw, tasks, 60) is None
+    assert tables.get(raw, 60) is None
+
+    table = tables.observe(raw, tasks, 45)
+    assert table is not None and table.max_minutes == 120
+    assert tables.get(raw, 45) is table
+    scored = score_tasks(tasks)
+    assert [t["title"] for t in table.shortlist(45)] == [
+        t["title"] for t in choose_shortlist(scored, 45)
+    ]
+
+
+def test_what_if_widens_for_larger_budgets(make_tasks):
+    tasks = make_tasks(10, seed=2)
+    tables = WhatIfTables(max_minutes=60)
+    tables.observe("raw", tasks, 30)
+    tables.observe("raw", tasks, 30)
+    assert tables.get("raw", 90) is None
+    assert tables.observe("raw", tasks, 90).max_minutes == 90
+    assert tables.get("raw", 90).max_minutes == 90
+
+
+def test_what_if_keys_on_mode_and_evicts_oldest(make_tasks):
+    tasks = make_tasks(5, seed=3)
+    tables = WhatIfTables(max_entries=2, max_minutes=30)
+    tables.observe("a", tasks, 30)
+    tables.observe("a", tasks, 30)
+    assert tables.get("a", 30, shortlist_mode="optimal") is None
+    tables.observe("b", tasks, 30)
+    tables.observe("c", tasks, 30)
+    assert len(tables) == 2
+    assert tables.get("a", 30) is None
+
+
+def test_what_if_skips_tables_over_the_cell_cap(make_tasks, monkeypatch):
+    monkeypatch.setattr(shortlist_planner, "KNAPSACK_MAX_CELLS", 10)
+    tasks = make_tasks(20, seed=4)
+    tables = WhatIfTables(max_minutes=120)
+    tables.observe("raw", tasks, 60)
+    assert tables.observe("raw", tasks, 60) is None
+    assert tables.get("raw", 60) is None
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_run_task_advisor_reuses_what_if_table(make_tasks, monkeypatch, stream):
+    tasks = make_tasks(12, seed=5)
+    raw = json.dumps(tasks)
+    parsed = []
+
+    def parse(raw_tasks_str):
+        parsed.append(raw_tasks_str)
+        return json.loads(raw_tasks_str), "local"
+
+    monkeypatch.setattr(task_advisor, "parse_tasks", parse)
+    monkeypatch.setattr(task_advisor, "call_planning_agent", lambda plan_data: plan_data)
+    tables = WhatIfTables(max_minutes=120)
+
+    def run(minutes):
+        return task_advisor.run_task_advisor(
+            raw_tasks_str=raw, available_minutes=minutes, what_if_tables=tables,
+            stream=stream, print_plan=False, context_token_budget=None,
+        )
+
+    first = run(60)
+    follow_up = run(45)
+    again = run(30)
+    if stream:
+        assert len(parsed) == 3 and len(tables) == 0
+    else:
+        assert len(parsed) == 2
+        assert tables.get(raw, 30) is not None
+    for plan, minutes in ((first, 60), (follow_up, 45), (again, 30)):
+        expected = choose_shortlist(score_tasks(tasks), minutes)
+        assert [t["title"] for t in plan["suggested_shortlist"]] == [t["title"] for t in expected]
+
+
+def test_presorted_stream_is_read_lazily(make_tasks, monkeypatch):
+    monkeypatch.setattr(task_advisor, "call_planning_agent", lambda plan_data: plan_data)
+    tasks = [
+        {k: t[k] for k in ("title", "importance", "urgency", "desire", "est_minutes")}
+        for t in score_tasks(make_tasks(1000, seed=6))
+    ]
+    pulled = []
+
+    def feed():
+        for t in tasks:
+            pulled.append(t)
+            yield t
+
+    plan = task_advisor.run_task_advisor(
+        tasks=feed(), available_minutes=60, stream=True, presorted=True,
+        print_plan=False, context_token_budget=None,
+    )
+    expected = choose_shortlist(score_tasks(tasks), 60)
+    assert [t["title"] for t in plan["suggested_shortlist"]] == [t["title"] for t in expected]
+    assert len(pulled) < len(tasks)
+
+
+def test_presorted_stream_rejects_unsorted_feed(make_tasks, monkeypatch):
+    monkeypatch.setattr(task_advisor, "call_planning_agent", lambda plan_data: plan_data)
+    tasks = list(reversed(score_tasks(make_tasks(50, seed=7))))
+    with pytest.raises(ValueError):
+        task_advisor.run_task_advisor(
+            tasks=iter(tasks), available_minutes=600, stream=True, presorted=True,
+            print_plan=False,
+        )
+
+
+def _batch_planner(monkeypatch, delays):
+    """Planner stub that sleeps delays[available_minutes] and tracks concurrency."""
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    async def plan(plan_data):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            delay = delays.get(plan_data["available_minutes"], 0)
+            if isinstance(delay, Exception):
+                raise delay
+            await asyncio.sleep(delay)
+            return {"minutes": plan_data["available_minutes"]}
+        finally:
+            state["in_flight"] -= 1
+
+    monkeypatch.setattr(task_advisor, "call_planning_agent_async", plan)
+    return state
+
+
+def test_batch_keeps_request_order_and_bounds_concurrency(make_tasks, monkeypatch):
+    # Later requests finish first.
+    delays = {minutes: 0.05 - minutes / 1000 for minutes in range(10, 50)}
+    state = _batch_planner(monkeypatch, delays)
+    requests = [{"tasks": make_tasks(5, seed=i), "available_minutes": 10 + i} for i in range(12)]
+
+    results = task_advisor.run_task_advisor_batch(requests, max_concurrency=3)
+
+    assert [r["index"] for r in results] == list(range(12))
+    assert [r["plan"]["minutes"] for r in results] == [10 + i for i in range(12)]
+    assert all(r["error"] is None and r["metrics"]["total_seconds"] > 0 for r in results)
+    assert state["max_in_flight"] == 3
+
+
+def test_batch_isolates_timeouts_and_failures(make_tasks, monkeypatch):
+    _batch_planner(monkeypatch, {20: 5.0, 30: RuntimeError("boom")})
+    requests = [
+        {"tasks": make_tasks(5, seed=i), "available_minutes": minutes}
+        for i, minutes in enumerate((10, 20, 30, 40))
+    ]
+
+    results = task_advisor.run_task_advisor_batch(requests, timeout_seconds=0.2)
+
+    assert [r["plan"] for r in results] == [{"minutes": 10}, None, None, {"minutes": 40}]
+    assert results[1]["error"] == "timed out after 0.2s"
+    assert results[2]["error"] == "RuntimeError: boom"
+    assert results[1]["metrics"] is None
+
+
+def _run_async(tasks, budget):
+    return asyncio.run(task_advisor.run_task_advisor_async(
+        tasks=tasks, print_plan=False, latency_budget_seconds=budget,
+    ))
+
+
+def test_async_budget_expiry_cancels_the_planner(make_tasks, monkeypatch):
+    state = {"cancelled": False}
+
+    async def slow_plan(plan_data):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    monkeypatch.setattr(task_advisor, "call_planning_agent_async", slow_plan)
+    plan = _run_async(make_tasks(8), 0.1)
+    assert plan["degraded"] is True
+    assert "latency budget" in plan["degraded_reason"]
+    assert state["cancelled"]
+
+
+@pytest.mark.parametrize("error", [TimeoutError("read timed out"), task_advisor.CallDeadlineExceeded("own")])
+def test_planner_timeouts_are_not_reported_as_budget_expiry(make_tasks, monkeypatch, error):
+    async def failing_plan(plan_data):
+        raise error
+
+    def failing_sync_plan(plan_data):
+        raise error
+
+    monkeypatch.setattr(task_advisor, "call_planning_agent_async", failing_plan)
+    monkeypatch.setattr(task_advisor, "call_planning_agent", failing_sync_plan)
+    for plan in (
+        _run_async(make_tasks(8), 30),
+        task_advisor.run_task_advisor(tasks=make_tasks(8), print_plan=False, latency_budget_seconds=30),
+    ):
+        assert plan["degraded"] is True
+        assert plan["degraded_reason"] == f"planner unavailable ({type(error).__name__})"